@@ -0,0 +1,285 @@
+"""量化资产配置回测：滚动协方差、风险平价权重、波动率目标与定期再平衡。
+
+所有计算都以日期为向量化维度：协方差用累计和一次算出全部窗口，风险平价
+权重在所有再平衡日上同时迭代求解，净值按"再平衡区间"分段累乘得到。
+
+命令行用法（参数扫描，多进程并行）::
+
+    python asset_allocation.py --window 60,120,250 --rebalance M,Q \\
+        --target-vol 0.03,0.06 --processes 8 --publish 低波组合
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import itertools
+import json
+
+import numpy as np
+import pandas as pd
+
+from nav_analytics import PERIODS_PER_YEAR, summarize_nav
+
+
+def rolling_covariance(returns, window):
+    """Rolling sample covariance for every date, shape (T, N, N); NaN before ``window``."""
+    r = np.nan_to_num(np.asarray(returns, dtype=float))
+    T, N = r.shape
+    cov = np.full((T, N, N), np.nan)
+    if T < window:
+        return cov
+
+    # 一阶、二阶累计和，任意窗口的和都可以由两次相减得到
+    s1 = np.zeros((T + 1, N))
+    s2 = np.zeros((T + 1, N, N))
+    np.cumsum(r, axis=0, out=s1[1:])
+    np.cumsum(r[:, :, None] * r[:, None, :], axis=0, out=s2[1:])
+
+    d1 = s1[window:] - s1[:-window]
+    d2 = s2[window:] - s2[:-window]
+    mean = d1 / window
+    cov[window - 1:] = (d2 - window * mean[:, :, None] * mean[:, None, :]) / (window - 1)
+    return cov
+
+
+def risk_parity_weights(cov, budgets=None, max_iter=100, tol=1e-10):
+    """Equal-risk-contribution weights for a stack of covariance matrices (K, N, N).
+
+    Uses cyclical coordinate descent on ``0.5·xᵀΣx − Σ b·log x``; every
+    coordinate update is a closed-form quadratic root and is applied to all K
+    dates at once, so the cost scales with N·iterations, not with K.
+    """
+    cov = np.asarray(cov, dtype=float)
+    K, N = cov.shape[:2]
+    b = np.full(N, 1.0 / N) if budgets is None else np.asarray(budgets, dtype=float) / np.sum(budgets)
+
+    diag = np.einsum("kii->ki", cov)
+    # 以逆波动率权重为初值，收敛更快
+    x = 1.0 / np.sqrt(diag)
+    x /= x.sum(axis=1, keepdims=True)
+
+    for _ in range(max_iter):
+        x_prev = x.copy()
+        for i in range(N):
+            c = np.einsum("kj,kj->k", cov[:, i, :], x) - diag[:, i] * x[:, i]
+            x[:, i] = (-c + np.sqrt(c * c + 4.0 * diag[:, i] * b[i])) / (2.0 * diag[:, i])
+        if np.max(np.abs(x - x_prev)) < tol:
+            break
+
+    return x / x.sum(axis=1, keepdims=True)
+
+
+def vol_target_leverage(weights, cov, target_vol, max_leverage=1.0, periods=PERIODS_PER_YEAR):
+    """Scale factor per date so that the predicted annual volatility hits ``target_vol``."""
+    port_var = np.einsum("ki,kij,kj->k", weights, cov, weights) * periods
+    with np.errstate(divide="ignore"):
+        leverage = target_vol / np.sqrt(port_var)
+    return np.clip(leverage, 0.0, max_leverage)
+
+
+def rebalance_mask(dates, freq):
+    """Boolean mask of rebalance dates.
+
+    ``freq`` is a pandas period alias ('W', 'M', 'Q', 'Y') meaning the last
+    trading day of each period, or an int meaning every N trading days.
+    """
+    idx = pd.DatetimeIndex(dates)
+    mask = np.zeros(len(idx), dtype=bool)
+    if isinstance(freq, (int, np.integer)):
+        mask[::freq] = True
+        return mask
+    periods = idx.to_period(freq).asi8
+    mask[:-1] = periods[1:] != periods[:-1]
+    mask[-1] = True
+    return mask
+
+
+def backtest(returns, weights, rebalance, cost=0.0):
+    """Simulate a drifting portfolio that resets to ``weights`` on rebalance dates.
+
+    ``weights[t]`` is decided at the close of ``t`` and held from ``t+1``;
+    rows where ``rebalance`` is False are ignored. Any weight not invested
+    (Σw < 1) sits in cash with zero return. ``cost`` is charged on one-way
+    turnover at every rebalance. Returns ``(nav, turnover)`` where ``nav``
+    starts at 1.0 on the first usable rebalance date.
+    """
+    r = np.nan_to_num(np.asarray(returns, dtype=float))
+    w_all = np.asarray(weights, dtype=float)
+    T = r.shape[0]
+
+    reb = np.flatnonzero(np.asarray(rebalance) & np.isfinite(w_all).all(axis=1))
+    reb = reb[reb < T - 1]
+    if len(reb) == 0:
+        raise ValueError("没有可用的再平衡日期（协方差窗口可能长于样本）")
+    start = reb[0]
+
+    growth = np.cumprod(1.0 + r, axis=0)
+    t = np.arange(start + 1, T)
+    seg = np.searchsorted(reb, t, side="left") - 1
+    s = reb[seg]
+    w = w_all[s]
+    rel = growth[t] / growth[s]
+    port = (w * rel).sum(axis=1) + (1.0 - w.sum(axis=1))
+
+    # 每段期末的组合增长；最后一段以样本末尾为期末
+    seg_end = np.append(reb[1:], T - 1)
+    end_growth = port[seg_end - start - 1]
+
+    # 换手：期初目标权重 vs 上一段漂移后的权重
+    w_reb = w_all[reb]
+    drifted = np.zeros_like(w_reb)
+    prev_rel = growth[reb[1:]] / growth[reb[:-1]]
+    drifted[1:] = w_reb[:-1] * prev_rel / end_growth[:-1, None]
+    turnover = np.abs(w_reb - drifted).sum(axis=1)
+
+    # 第 k 段的起点净值 = 之前各段（扣费后）增长的累乘 × 本次再平衡的费用
+    base = np.cumprod(1.0 - cost * turnover) * np.concatenate([[1.0], np.cumprod(end_growth)[:-1]])
+
+    nav = np.empty(T - start)
+    nav[0] = 1.0
+    nav[1:] = base[seg] * port
+    return nav, turnover
+
+
+def run_strategy(returns, dates, window=120, rebalance="M", target_vol=None,
+                 max_leverage=1.0, cost=0.0, budgets=None):
+    """Risk-parity strategy (optionally volatility-targeted); returns a NAV Series."""
+    r = np.asarray(returns, dtype=float)
+    cov = rolling_covariance(r, window)
+
+    mask = rebalance_mask(dates, rebalance) & np.isfinite(cov).all(axis=(1, 2))
+    k = np.flatnonzero(mask)
+    weights = np.full(r.shape, np.nan)
+    if len(k):
+        weights[k] = risk_parity_weights(cov[k], budgets=budgets)
+        if target_vol:
+            weights[k] *= vol_target_leverage(weights[k], cov[k], target_vol, max_leverage)[:, None]
+
+    nav, _ = backtest(r, weights, mask, cost=cost)
+    return pd.Series(nav, index=pd.DatetimeIndex(dates)[len(dates) - len(nav):])
+
+
+def build_allocation_frame(prices, strategies):
+    """Run every configured strategy on a price table and return a 资产配置净值-style frame.
+
+    ``prices`` has the date in its first column and one price column per asset.
+    """
+    frame = prices.set_index(prices.columns[0]).sort_index()
+    returns = frame.pct_change().iloc[1:]
+    dates = returns.index
+
+    navs = {
+        name: run_strategy(returns.to_numpy(), dates, **params)
+        for name, params in strategies.items()
+    }
+    # 各策略起点可能不同，统一从最晚的起点开始并重新归一
+    start = max(nav.index[0] for nav in navs.values())
+    out = pd.DataFrame({name: nav.loc[start:] / nav.loc[start] for name, nav in navs.items()})
+    out.index.name = "date"
+    return out.reset_index()
+
+
+def expand_grid(**axes):
+    """Cartesian product of parameter lists -> list of parameter dicts."""
+    keys = list(axes)
+    return [dict(zip(keys, values)) for values in itertools.product(*axes.values())]
+
+
+# 参数扫描时每个子进程只接收一次收益率矩阵，任务本身只传参数字典
+_SWEEP_RETURNS = None
+_SWEEP_DATES = None
+
+
+def _init_sweep_worker(returns, dates):
+    global _SWEEP_RETURNS, _SWEEP_DATES
+    _SWEEP_RETURNS = returns
+    _SWEEP_DATES = dates
+
+
+def _run_sweep_config(params):
+    nav = run_strategy(_SWEEP_RETURNS, _SWEEP_DATES, **params)
+    return {**params, **summarize_nav(nav.to_numpy())}
+
+
+def sweep(returns, dates, grid, processes=None):
+    """Evaluate every parameter dict in ``grid`` in a process pool; returns a DataFrame."""
+    returns = np.asarray(returns, dtype=float)
+    dates = pd.DatetimeIndex(dates)
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_sweep_worker,
+        initargs=(returns, dates),
+    ) as pool:
+        rows = list(pool.map(_run_sweep_config, grid, chunksize=max(1, len(grid) // 64)))
+    return pd.DataFrame(rows)
+
+
+def load_strategies(defaults, params_path):
+    """Default strategy configs overridden by the published JSON file, if any."""
+    strategies = {name: dict(params) for name, params in defaults.items()}
+    if params_path.exists():
+        published = json.loads(params_path.read_text(encoding="utf-8"))
+        for name, params in published.items():
+            strategies.setdefault(name, {}).update(params)
+    return strategies
+
+
+def _parse_list(text, cast):
+    return [cast(v) for v in text.split(",") if v != ""]
+
+
+def _parse_rebalance(value):
+    return int(value) if value.isdigit() else value
+
+
+def main(argv=None):
+    from generate_dashboard import (
+        ALLOCATION_PARAMS_PATH,
+        ALLOCATION_PRICE_PATH,
+        ALLOCATION_PRICE_SHEET,
+    )
+
+    parser = argparse.ArgumentParser(description="风险平价 / 波动率目标参数扫描")
+    parser.add_argument("--window", default="60,120,250", help="协方差窗口，逗号分隔")
+    parser.add_argument("--rebalance", default="M,Q", help="再平衡频率（W/M/Q 或交易日数）")
+    parser.add_argument("--target-vol", default="0,0.03,0.06", help="目标年化波动，0 表示不做波动率目标")
+    parser.add_argument("--max-leverage", default="1.0", help="最大杠杆")
+    parser.add_argument("--cost", type=float, default=0.0, help="单边换手成本")
+    parser.add_argument("--processes", type=int, default=None, help="并行进程数")
+    parser.add_argument("--output", default="资产配置参数扫描.csv", help="扫描结果输出文件")
+    parser.add_argument("--metric", default="夏普比率", help="选优指标")
+    parser.add_argument("--publish", default=None, help="将最优参数发布为该组合名称")
+    args = parser.parse_args(argv)
+
+    prices = pd.read_excel(ALLOCATION_PRICE_PATH, sheet_name=ALLOCATION_PRICE_SHEET)
+    frame = prices.set_index(prices.columns[0]).sort_index()
+    returns = frame.pct_change().iloc[1:]
+
+    grid = expand_grid(
+        window=_parse_list(args.window, int),
+        rebalance=_parse_list(args.rebalance, _parse_rebalance),
+        target_vol=[v or None for v in _parse_list(args.target_vol, float)],
+        max_leverage=_parse_list(args.max_leverage, float),
+        cost=[args.cost],
+    )
+    results = sweep(returns.to_numpy(), returns.index, grid, processes=args.processes)
+    results = results.sort_values(args.metric, ascending=False)
+    results.to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(f"共扫描 {len(results)} 组参数，结果已写入: {args.output}")
+
+    if args.publish:
+        best = results.iloc[0]
+        params = {k: best[k] for k in ("window", "rebalance", "target_vol", "max_leverage", "cost")}
+        params = {k: (v.item() if hasattr(v, "item") else v) for k, v in params.items()}
+        if params["target_vol"] is not None and pd.isna(params["target_vol"]):
+            params["target_vol"] = None
+        published = {}
+        if ALLOCATION_PARAMS_PATH.exists():
+            published = json.loads(ALLOCATION_PARAMS_PATH.read_text(encoding="utf-8"))
+        published[args.publish] = params
+        ALLOCATION_PARAMS_PATH.write_text(
+            json.dumps(published, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        print(f"已发布 {args.publish}: {params}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""构建流程基准测试：按真实 sheet 结构生成放大的合成工作簿，逐阶段计时。
+
+每个规模（默认 1×、10×、100×、1000× 当前行数）生成一套与上游工作簿同名、
+同列结构的合成数据（随机数种子固定，结果可复现），缓存在 ``基准测试数据/``
+下，再依次测量：
+
+    read_excel             逐个 sheet 读入 DataFrame
+    sheet_to_records       DataFrame 转为行记录
+    build_data_and_config  完整的数据与图表配置构建（含读取）
+    json_dumps             页面数据序列化
+    page_payload           日期编码 + 序列化 + 构建哈希
+    build_html             生成完整页面
+
+每个阶段记录最短耗时（``--repeat`` 次中的最小值）和 tracemalloc 峰值内存
+（单独一轮，避免追踪开销影响计时）。结果写成 JSON（默认
+``基准测试结果/<commit>.json``），``--compare`` 与另一份结果逐项对比。全程
+离线运行，只依赖 pandas / openpyxl。
+
+xlsx 单个 sheet 最多 1,048,576 行，超出的规模按上限截断，实际行数记录在结果中。
+
+``--readers`` 改为在真实输入工作簿上对比各读取后端：每个 sheet 分别用已安装的
+各 xlsx 引擎读取，并导出为 parquet / feather / csv（缺少依赖的格式跳过）后
+再读取，逐项列出耗时与峰值内存，用于决定哪些 sheet 值得迁移到列式格式
+（见 input_readers.py）。
+
+命令行用法::
+
+    python benchmark.py --scales 1 10 100 --repeat 3
+    python benchmark.py --compare 基准测试结果/<旧 commit>.json
+    python benchmark.py --readers --repeat 3
+"""
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+import generate_dashboard as gd
+from input_readers import FORMAT_MODULES, available_xlsx_engines, export_sheets, installed, read_table
+
+
+BENCH_DATA_DIR = gd.ROOT / "基准测试数据"
+RESULTS_DIR = gd.ROOT / "基准测试结果"
+SCALES = [1, 10, 100, 1000]
+# xlsx 每个 sheet 的行数上限（含表头）
+MAX_SHEET_ROWS = 1_048_576
+SEED = 20240101
+LAST_DAY = date(2025, 11, 28)
+FIRST_DAY = date(1900, 1, 1)
+
+# 与上游工作簿一致的 sheet 结构：(列名, 生成方式)；列名为 None 表示表头留空
+# （pandas 读出为 "Unnamed: N"）。行数为当前数据的行数，按规模放大。
+WORKBOOKS = {
+    gd.EXCEL_PATH.name: {
+        "风险图1-新高个股占比": (451, [
+            ("date", "day"), ("占比", "ratio"), ("上证综指(右)", "index"),
+        ]),
+        "资金图1": (936, [
+            (None, "day"), ("重仓股主力净买入(亿元)", "flow"),
+            ("主力累计净买入(亿元)", "cumflow"), ("万得全A(右轴)", "index"),
+        ]),
+        "资金图2": (2018, [
+            (None, "day"), ("保证金余额估计值", "index"), ("成交额", "index"),
+            ("wind全A收盘价(右)", "index"), ("上轨80分位数", "ratio"),
+            ("下轨20分位数", "ratio"), ("博弈/存量", "ratio"),
+        ]),
+        "因子图1": (2067, [
+            ("trade_dt", "day"), ("外币资金占货币资金比", "nav"), ("基准", "nav"),
+        ]),
+        "因子图2": (2067, [
+            ("trade_dt", "day"), ("主要客户占比稳定性", "nav"), ("基准", "nav"),
+        ]),
+    },
+    gd.PBROE_PATH.name: {
+        "PB-ROE": (36, [
+            ("Code", "code"), (None, "name"), ("预测PB", "pb"), ("预测ROE", "roe"),
+        ]),
+        "资产配置净值": (2408, [
+            ("date", "day"), ("低波组合", "nav"), ("中波组合", "nav"), ("资产风险平价", "nav"),
+        ]),
+    },
+    gd.FUND_PATH.name: {
+        "规模变化(单位 亿)": (51, [
+            (None, "month"), ("普通股票型", "index"), ("偏股混合型", "index"),
+            ("灵活配置型", "index"), ("指数增强型", "index"), ("合计规模(右)", "index"),
+        ]),
+        "份额变化(单位 亿)": (51, [
+            (None, "month"), ("普通股票型", "index"), ("偏股混合型", "index"),
+            ("灵活配置型", "index"), ("指数增强型", "index"), ("合计份额(右)", "index"),
+            ("份额变化", "flow"),
+        ]),
+    },
+}
+
+# 基准测试只使用合成的三本工作簿，其余可选输入指向不存在的路径
+OPTIONAL_INPUTS = [
+    "PBROE_STOCK_PATH",
+    "ALLOCATION_PRICE_PATH",
+    "ALLOCATION_PARAMS_PATH",
+    "FACTOR_PANEL_DIR",
+    "FLOW_TRADE_DIR",
+]
+
+
+def synthetic_column(kind, n, rng):
+    """``n`` values of one synthetic column; dates ascend and end at ``LAST_DAY``.
+
+    When ``n`` exceeds the days (months) between ``FIRST_DAY`` and ``LAST_DAY``,
+    each date repeats on consecutive rows so the range still ends at ``LAST_DAY``.
+    """
+    if kind == "day":
+        span = min(n, (LAST_DAY - FIRST_DAY).days + 1)
+        last = datetime(LAST_DAY.year, LAST_DAY.month, LAST_DAY.day)
+        return [last - timedelta(days=span - 1 - i * span // n) for i in range(n)]
+    if kind == "month":
+        last = LAST_DAY.year * 12 + LAST_DAY.month - 1
+        span = min(n, last - (FIRST_DAY.year * 12 + FIRST_DAY.month - 1) + 1)
+        months = (last - span + 1 + i * span // n for i in range(n))
+        return [f"{m // 12:04d}-{m % 12 + 1:02d}" for m in months]
+    if kind == "code":
+        return [f"{801010 + i:06d}.SI" for i in range(n)]
+    if kind == "name":
+        return [f"板块{i + 1}" for i in range(n)]
+    if kind == "nav":
+        return np.cumprod(1 + rng.normal(0.0003, 0.01, n)).tolist()
+    if kind == "index":
+        return (3000 * np.cumprod(1 + rng.normal(0.0002, 0.012, n))).tolist()
+    if kind == "flow":
+        return rng.normal(0, 50, n).tolist()
+    if kind == "cumflow":
+        return np.cumsum(rng.normal(0, 50, n)).tolist()
+    if kind == "ratio":
+        return rng.uniform(0, 1, n).tolist()
+    if kind == "pb":
+        return rng.uniform(0.5, 6, n).tolist()
+    if kind == "roe":
+        return rng.uniform(2, 25, n).tolist()
+    raise ValueError(f"未知的列类型: {kind}")
+
+
+def sheet_rows(base_rows, scale):
+    return min(base_rows * scale, MAX_SHEET_ROWS - 1)
+
+
+def write_workbooks(folder, scale):
+    """Write the synthetic workbooks for ``scale`` into ``folder``; returns rows per sheet."""
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(SEED + scale)
+    rows = {}
+    for filename, sheets in WORKBOOKS.items():
+        # 只写模式逐行流式写出，百万行的 sheet 也不需要在内存中保留整张表
+        wb = Workbook(write_only=True)
+        for sheet, (base_rows, columns) in sheets.items():
+            n = sheet_rows(base_rows, scale)
+            ws = wb.create_sheet(sheet)
+            ws.append([name for name, _ in columns])
+            for row in zip(*(synthetic_column(kind, n, rng) for _, kind in columns)):
+                ws.append(row)
+            rows[sheet] = n
+        tmp = folder / f"{filename}.tmp"
+        wb.save(tmp)
+        tmp.replace(folder / filename)
+    (folder / "rows.json").write_text(json.dumps(rows, ensure_ascii=False, indent=1), encoding="utf-8")
+    return rows
+
+
+def prepare_workbooks(scale, regenerate=False):
+    """Synthetic workbooks for ``scale``, generated once and reused across runs."""
+    folder = BENCH_DATA_DIR / f"x{scale}"
+    rows_path = folder / "rows.json"
+    if not regenerate and rows_path.exists() and all((folder / f).exists() for f in WORKBOOKS):
+        return folder, json.loads(rows_path.read_text(encoding="utf-8"))
+    start = time.perf_counter()
+    rows = write_workbooks(folder, scale)
+    print(f"已生成 {scale}× 合成工作簿（{time.perf_counter() - start:.1f}s）: {folder}")
+    return folder, rows
+
+
+@contextmanager
+def synthetic_inputs(folder):
+    """Point the build's input paths at the synthetic workbooks in ``folder``."""
+    names = ["EXCEL_PATH", "PBROE_PATH", "FUND_PATH"] + OPTIONAL_INPUTS
+    saved = {name: getattr(gd, name) for name in names}
+    try:
+        for name in names:
+            setattr(gd, name, folder / saved[name].name)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(gd, name, value)
+
+
+def measure(fn, repeat):
+    """``(result, best seconds, tracemalloc peak bytes)`` of ``fn()``."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    # 峰值内存单独测一轮：tracemalloc 会显著拖慢执行
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def run_scale(scale, repeat=1, regenerate=False):
+    """Benchmark every stage of the build on the ``scale``× synthetic workbooks."""
+    folder, rows = prepare_workbooks(scale, regenerate)
+    reader = gd.WorkbookReader()
+    sheets = [
+        (folder / filename, sheet)
+        for filename, book in WORKBOOKS.items()
+        for sheet in book
+    ]
+    stages = {}
+
+    def record(name, fn):
+        result, seconds, peak = measure(fn, repeat)
+        stages[name] = {"seconds": round(seconds, 6), "peak_bytes": peak}
+        print(f"  {scale:>5}× {name:<22} {seconds:9.3f}s  峰值 {peak / 2**20:9.1f} MiB")
+        return result
+
+    with synthetic_inputs(folder):
+        frames = record("read_excel", lambda: [reader.read(path, sheet) for path, sheet in sheets])
+        record("sheet_to_records", lambda: [gd.sheet_to_records(df) for df in frames])
+        data_by_sheet, chart_configs = record("build_data_and_config", gd.build_data_and_config)
+        record("json_dumps", lambda: json.dumps(data_by_sheet, ensure_ascii=False))
+        record("page_payload", lambda: gd.page_payload(data_by_sheet, chart_configs))
+        html = record("build_html", lambda: gd.build_html(data_by_sheet, chart_configs))
+
+    return {
+        "rows": rows,
+        "total_rows": sum(rows.values()),
+        "input_bytes": sum((folder / f).stat().st_size for f in WORKBOOKS),
+        "html_bytes": len(html.encode("utf-8")),
+        "stages": stages,
+    }
+
+
+def input_workbooks():
+    """The build's input workbooks that exist, with their sheet names."""
+    paths = [gd.EXCEL_PATH, gd.PBROE_PATH, gd.FUND_PATH, gd.PBROE_STOCK_PATH, gd.ALLOCATION_PRICE_PATH]
+    return {path: pd.ExcelFile(path).sheet_names for path in paths if path.exists()}
+
+
+def run_readers(repeat=1):
+    """``[{file, sheet, reader, rows, seconds, peak_bytes}]`` for every reader on every input sheet."""
+    rows = []
+
+    def record(path, sheet, reader, fn):
+        df, seconds, peak = measure(fn, repeat)
+        rows.append({
+            "file": path.name, "sheet": sheet, "reader": reader, "rows": len(df),
+            "seconds": round(seconds, 6), "peak_bytes": peak,
+        })
+        print(f"  {sheet:<24} {reader:<16} {len(df):>9} 行 {seconds:9.4f}s  峰值 {peak / 2**20:8.1f} MiB")
+
+    formats = [suffix[1:] for suffix, module in FORMAT_MODULES.items() if installed(module)]
+    with tempfile.TemporaryDirectory() as folder:
+        for path, sheets in input_workbooks().items():
+            for sheet in sheets:
+                for engine in available_xlsx_engines():
+                    record(path, sheet, f"xlsx/{engine}", lambda: read_table(path, sheet, engine))
+                for fmt in formats:
+                    (table,) = export_sheets(path, [sheet], Path(folder) / fmt, fmt)
+                    record(path, sheet, fmt, lambda: read_table(table))
+    return rows
+
+
+def git_revision():
+    """``(commit, dirty)`` of the working tree; ``(None, None)`` outside a git checkout."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=gd.ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=gd.ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+def run_benchmarks(scales=SCALES, repeat=1, regenerate=False):
+    """Machine-readable results for all ``scales``, tagged with the commit and environment."""
+    commit, dirty = git_revision()
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "scales": {
+            str(scale): run_scale(scale, repeat, regenerate) for scale in scales
+        },
+    }
+
+
+def compare(baseline, current):
+    """Print per-stage time and peak-memory ratios (current / baseline) for shared scales and stages."""
+    print(f"对比基准: {baseline.get('commit') or '未知'} -> {current.get('commit') or '未知'}")
+    print(f"{'规模':>6} {'阶段':<22} {'耗时比':>8} {'峰值比':>8}")
+    for scale, result in current["scales"].items():
+        base = baseline["scales"].get(scale)
+        if base is None:
+            continue
+        for stage, now in result["stages"].items():
+            before = base["stages"].get(stage)
+            if before is None:
+                continue
+            time_ratio = now["seconds"] / before["seconds"] if before["seconds"] else float("nan")
+            peak_ratio = now["peak_bytes"] / before["peak_bytes"] if before["peak_bytes"] else float("nan")
+            print(f"{scale + '×':>6} {stage:<22} {time_ratio:8.2f} {peak_ratio:8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="看板构建流程基准测试")
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=SCALES, help="相对当前行数的放大倍数",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="每个阶段计时的重复次数（取最小值）")
+    parser.add_argument("--output", type=Path, default=None, help="结果 JSON 路径")
+    parser.add_argument("--compare", type=Path, default=None, help="与之对比的历史结果 JSON")
+    parser.add_argument("--regenerate", action="store_true", help="重新生成合成工作簿")
+    parser.add_argument(
+        "--readers", action="store_true", help="在真实输入上对比各读取后端（xlsx 引擎、parquet、feather、csv）",
+    )
+    args = parser.parse_args(argv)
+
+    if args.readers:
+        rows = run_readers(max(1, args.repeat))
+        if args.output is not None:
+            args.output.parent.mkdir(parents=True, exist_ok=True)
+            args.output.write_text(json.dumps(rows, ensure_ascii=False, indent=1), encoding="utf-8")
+            print(f"已写入读取后端对比结果: {args.output}")
+        return
+
+    results = run_benchmarks(args.scales, max(1, args.repeat), args.regenerate)
+    output = args.output
+    if output is None:
+        name = (results["commit"] or "local")[:12] + ("-dirty" if results["dirty"] else "")
+        output = RESULTS_DIR / f"{name}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, ensure_ascii=False, indent=1), encoding="utf-8")
+    print(f"已写入基准测试结果: {output}")
+
+    if args.compare is not None:
+        compare(json.loads(args.compare.read_text(encoding="utf-8")), results)
+
+
+if __name__ == "__main__":
+    main()
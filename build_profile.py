@@ -0,0 +1,205 @@
+"""构建过程的轻量计时：各阶段用 ``span`` 标出自己的范围，开启 ``--profile`` 时才记录。
+
+未开启时 ``span`` 只是一个空的上下文管理器，几乎没有开销；开启后每个 span
+记录墙钟时间、CPU 时间、结束时的进程峰值 RSS 以及阶段自己报告的输出字节数，
+可汇总打印、导出 Chrome trace-event JSON（chrome://tracing 或 Perfetto 打开），
+并可同时用 cProfile 采样整个构建。
+
+用法::
+
+    with span("read_excel", detail=sheet):
+        df = pd.read_excel(...)
+
+    with span("write_outputs") as s:
+        s.add_bytes(len(payload))
+"""
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，不记录峰值 RSS
+    resource = None
+
+
+_active = None
+
+
+class Span:
+    """One timed region; stages report what they wrote through ``add_bytes``."""
+
+    __slots__ = ("name", "detail", "bytes")
+
+    def __init__(self, name, detail=None):
+        self.name = name
+        self.detail = detail
+        self.bytes = 0
+
+    def add_bytes(self, n):
+        self.bytes += n
+
+
+class _NullSpan(Span):
+    __slots__ = ()
+
+    def add_bytes(self, n):
+        pass
+
+
+_NULL_SPAN = _NullSpan("")
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KiB 为单位，macOS 以字节为单位
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class BuildProfile:
+    """Collected spans of one profiled run."""
+
+    def __init__(self):
+        self.events = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, detail=None):
+        record = Span(name, detail)
+        start = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            event = {
+                "name": name,
+                "detail": detail,
+                "start": start - self._origin,
+                "wall": time.perf_counter() - start,
+                "cpu": time.process_time() - cpu,
+                "peak_rss": peak_rss(),
+                "bytes": record.bytes,
+                "tid": threading.get_ident(),
+            }
+            with self._lock:
+                self.events.append(event)
+
+    def summary(self):
+        """Per (stage, detail) totals in order of first appearance."""
+        rows = {}
+        for event in sorted(self.events, key=lambda e: e["start"]):
+            row = rows.setdefault(
+                (event["name"], event["detail"]),
+                {"name": event["name"], "detail": event["detail"], "calls": 0,
+                 "wall": 0.0, "cpu": 0.0, "peak_rss": None, "bytes": 0},
+            )
+            row["calls"] += 1
+            row["wall"] += event["wall"]
+            row["cpu"] += event["cpu"]
+            row["bytes"] += event["bytes"]
+            if event["peak_rss"] is not None:
+                row["peak_rss"] = max(row["peak_rss"] or 0, event["peak_rss"])
+        return list(rows.values())
+
+    def print_summary(self):
+        print(f"{'阶段':<24} {'对象':<24} {'墙钟(ms)':>10} {'CPU(ms)':>10} {'峰值RSS(MiB)':>13} {'输出字节':>12}")
+        for row in self.summary():
+            rss = f"{row['peak_rss'] / 2**20:.1f}" if row["peak_rss"] is not None else "-"
+            detail = str(row["detail"]) if row["detail"] is not None else ""
+            print(
+                f"{row['name']:<24} {detail:<24} {row['wall'] * 1000:>10.1f} "
+                f"{row['cpu'] * 1000:>10.1f} {rss:>13} {row['bytes'] or '':>12}"
+            )
+
+    def write_trace(self, path):
+        """Write the spans as Chrome trace-event JSON (complete "X" events, microseconds)."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": e["name"] if e["detail"] is None else f"{e['name']} {e['detail']}",
+                "cat": e["name"],
+                "ph": "X",
+                "ts": round(e["start"] * 1e6, 1),
+                "dur": round(e["wall"] * 1e6, 1),
+                "pid": pid,
+                "tid": e["tid"],
+                "args": {
+                    "cpu_ms": round(e["cpu"] * 1000, 3),
+                    "peak_rss": e["peak_rss"],
+                    "bytes": e["bytes"],
+                },
+            }
+            for e in self.events
+        ]
+        Path(path).write_text(
+            json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+
+
+def enabled():
+    """True while a profiled run is recording spans."""
+    return _active is not None
+
+
+@contextmanager
+def span(name, detail=None):
+    """Time the enclosed stage when profiling is enabled; a no-op otherwise."""
+    profile = _active
+    if profile is None:
+        yield _NULL_SPAN
+        return
+    with profile.span(name, detail) as record:
+        yield record
+
+
+def traced(name):
+    """Decorator running the function inside ``span(name)``; a ``str`` result counts as its output bytes."""
+
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name) as record:
+                result = fn(*args, **kwargs)
+                if _active is not None and isinstance(result, str):
+                    record.add_bytes(len(result.encode("utf-8")))
+                return result
+
+        return wrapper
+
+    return decorate
+
+
+@contextmanager
+def profiling(trace_path=None, cprofile_path=None):
+    """Enable span recording (and optionally cProfile) for the enclosed run."""
+    global _active
+    profile = BuildProfile()
+    profiler = cProfile.Profile() if cprofile_path else None
+    _active = profile
+    if profiler is not None:
+        profiler.enable()
+    try:
+        with profile.span("build"):
+            yield profile
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(cprofile_path)
+        _active = None
+        profile.print_summary()
+        if trace_path:
+            profile.write_trace(trace_path)
+            print(f"已写入 trace: {trace_path}")
+        if cprofile_path:
+            print(f"已写入 cProfile 统计: {cprofile_path}")
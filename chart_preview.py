@@ -0,0 +1,309 @@
+"""构建时为每个图表生成静态 SVG 预览，Plotly 加载并挂载前先显示。
+
+预览使用抽稀后的数据，颜色、坐标轴标题、双轴布局与页面中的 Plotly 图表一致：
+折线图按日期轴绘制（右轴线单独缩放），柱状图为堆叠柱，散点图为点。绘图区
+用 ``preserveAspectRatio="none"`` 的 SVG 撑满 Plotly 相同的边距区域，线宽不随
+缩放变化；刻度与标题是绝对定位的文字，随容器尺寸自适应。页面在创建图表时
+移除预览。
+"""
+from html import escape
+import math
+
+import numpy as np
+import pandas as pd
+
+from build_profile import traced
+from column_store import decimate, sheet_frame
+from page_shell import line_color
+from partition_store import PAGE_KEY as PARTITION_KEY
+
+
+# 预览中每个折线图最多保留的点数（各线合计按桶取极值）
+PREVIEW_POINTS = 320
+# 绘图区坐标范围；SVG 拉伸到实际尺寸
+VIEW = 1000
+GRID_COLOR = "#ecf0f1"
+BAR_FIELD_ORDER = ["普通股票型", "偏股混合型", "灵活配置型", "指数增强型"]
+DATE_X_TITLE_CHARTS = {"factor1", "factor2", "fund1", "fund2", "risk1", "asset1"}
+Y_TITLES = {
+    "factor1": "净值",
+    "factor2": "净值",
+    "fund1": "主力累计净买入(亿元)",
+    "fund2": "博弈/存量",
+    "risk1": "新高个股占比",
+    "asset1": "净值",
+    "fund_market1": "规模（亿）",
+    "fund_market2": "份额（亿）",
+}
+Y2_TITLES = {"fund1": "Wind全A收盘价", "fund2": "Wind全A收盘价", "risk1": "上证综指"}
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def trace_color(cfg, line):
+    """Color of a line trace, following the page's createChart rules."""
+    name = line["name"]
+    if (cfg["id"], name) in (("fund2", "上轨80分位数"), ("fund2", "下轨20分位数"),
+                             ("asset1", "低波组合"), ("asset1", "中波组合")):
+        return line_color(cfg, name)
+    if name in ("基准", "Wind全A收盘价（右轴）", "Wind全A收盘价") or line.get("axis") == "y2":
+        return "#FFCB05"
+    return "#005bac"
+
+
+def nice_ticks(lo, hi, count=5):
+    """Round tick values covering [lo, hi] with about ``count`` steps, and the step."""
+    span = hi - lo
+    if not span > 0:
+        return [lo], 1.0
+    raw = span / count
+    mag = 10 ** math.floor(math.log10(raw))
+    step = next(m * mag for m in (1, 2, 2.5, 5, 10) if m * mag >= raw)
+    first = math.ceil(lo / step - 1e-9) * step
+    n = int(math.floor((hi - first) / step + 1e-9)) + 1
+    return [round(first + i * step, 12) for i in range(n)], step
+
+
+def format_tick(value, step):
+    """Tick label like Plotly's default: ``k`` / ``M`` suffixes, just enough decimals."""
+    for div, suffix in ((1e6, "M"), (1e3, "k")):
+        if step >= div and abs(value) >= 10 * div:
+            return f"{value / div:g}{suffix}"
+    decimals = 0
+    while decimals < 6 and abs(round(step, decimals) - step) > step * 1e-6:
+        decimals += 1
+    return f"{value:.{decimals}f}"
+
+
+def date_ticks(t0, t1, count=6):
+    """``[(ms, label)]`` at whole years, months or days between two timestamps (ms)."""
+    start, end = pd.Timestamp(t0, unit="ms").normalize(), pd.Timestamp(t1, unit="ms")
+    days = (t1 - t0) / 86_400_000
+    if days / 365.25 >= 2:
+        years = next((y for y in (1, 2, 5, 10) if days / 365.25 / y <= count), 20)
+        stamps = pd.date_range(start, end, freq=f"{years}YS")
+        labels = [str(s.year) for s in stamps]
+    elif days >= 60:
+        months = next((m for m in (1, 2, 3, 6) if days / 30.44 / m <= count), 12)
+        stamps = pd.date_range(start, end, freq=f"{months}MS")
+        labels = [f"{MONTHS[s.month - 1]} {s.year}" for s in stamps]
+    else:
+        stamps = pd.date_range(start, end, freq=f"{max(1, math.ceil(days / count))}D")
+        labels = [f"{MONTHS[s.month - 1]} {s.day}" for s in stamps]
+    return [(s.value / 1e6, label) for s, label in zip(stamps, labels) if t0 <= s.value / 1e6 <= t1]
+
+
+def _scale(lo, hi):
+    span = hi - lo if hi > lo else 1.0
+    return lambda v: VIEW - (v - lo) / span * VIEW
+
+
+def _line_path(xs, ys):
+    # NaN 处断开，与 Plotly 默认不连接缺口一致
+    parts = []
+    pen = "M"
+    for x, y in zip(xs, ys):
+        if math.isnan(y):
+            pen = "M"
+            continue
+        parts.append(f"{pen}{x:.0f} {y:.0f}")
+        pen = "L"
+    return "".join(parts)
+
+
+def _y_axis(values, side, pad=0.0):
+    """(scale, tick labels, grid positions) for one value axis; ``pad`` leaves room around markers."""
+    values = values[~np.isnan(values)]
+    lo, hi = (float(values.min()), float(values.max())) if len(values) else (0.0, 1.0)
+    if pad and hi > lo:
+        lo, hi = lo - (hi - lo) * pad, hi + (hi - lo) * pad
+    return _y_axis_range(lo, hi, side)
+
+
+def _y_axis_range(lo, hi, side):
+    if not hi > lo:
+        lo, hi = lo - 1, hi + 1
+    scale = _scale(lo, hi)
+    ticks, step = nice_ticks(lo, hi)
+    spans = [
+        f'<span class="chart-preview-tick {side}" style="top: {scale(t) / VIEW * 100:.1f}%">{format_tick(t, step)}</span>'
+        for t in ticks
+    ]
+    grid = [scale(t) for t in ticks]
+    return scale, spans, grid
+
+
+def _frame(margin, body, ticks, grid_y, grid_x, titles):
+    grid = "".join(f"M0 {y:.0f}H{VIEW}" for y in grid_y) + "".join(f"M{x:.0f} 0V{VIEW}" for x in grid_x)
+    top, right, bottom, left = margin
+    return (
+        '<div class="chart-preview" aria-hidden="true">'
+        f'<div class="chart-preview-plot" style="top: {top}px; right: {right}px; bottom: {bottom}px; left: {left}px">'
+        f'<svg viewBox="0 0 {VIEW} {VIEW}" preserveAspectRatio="none">'
+        f'<path d="{grid}" stroke="{GRID_COLOR}" fill="none" vector-effect="non-scaling-stroke"/>'
+        f'<rect width="{VIEW}" height="{VIEW}" stroke="{GRID_COLOR}" fill="none" vector-effect="non-scaling-stroke"/>'
+        f"{body}</svg>{''.join(ticks)}</div>"
+        + "".join(
+            f'<span class="chart-preview-title {side}">{escape(text)}</span>' for side, text in titles if text
+        )
+        + "</div>"
+    )
+
+
+def line_preview(cfg, df):
+    """Preview of a date-axis line chart, or None when its columns are missing."""
+    lines = [line for line in cfg.get("lines", []) if line["field"] in df.columns]
+    if cfg["x"] not in df.columns or not lines:
+        return None
+    x = pd.to_datetime(df[cfg["x"]], errors="coerce")
+    keep = x.notna().to_numpy()
+    if not keep.any():
+        return None
+    times = x[keep].to_numpy("datetime64[ms]").astype(np.int64).astype(np.float64)
+    order = np.argsort(times, kind="stable")
+    times = times[order]
+    columns = [
+        pd.to_numeric(df[line["field"]], errors="coerce").to_numpy(dtype=np.float64)[keep][order]
+        for line in lines
+    ]
+    idx = decimate(times, columns, PREVIEW_POINTS)
+    t0, t1 = times[0], times[-1]
+    xs = (times[idx] - t0) / max(t1 - t0, 1) * VIEW
+
+    has_y2 = any(line.get("axis") == "y2" for line in cfg.get("lines", []))
+    ticks, grid_y = [], []
+    scales = {}
+    for axis, side in (("y1", "y"), ("y2", "y2")):
+        values = [c for line, c in zip(lines, columns) if (line.get("axis") == "y2") == (axis == "y2")]
+        if not values:
+            continue
+        scale, spans, grid = _y_axis(np.concatenate(values), side)
+        scales[axis] = scale
+        ticks += spans
+        # 右轴不画网格线，与页面一致
+        if axis == "y1":
+            grid_y = grid
+    paths = []
+    for line, values in zip(lines, columns):
+        scale = scales["y2" if line.get("axis") == "y2" else "y1"]
+        d = _line_path(xs, [scale(v) for v in values[idx]])
+        paths.append(
+            f'<path d="{d}" stroke="{trace_color(cfg, line)}" stroke-width="2" fill="none" '
+            'vector-effect="non-scaling-stroke"/>'
+        )
+    grid_x = []
+    for t, label in date_ticks(t0, t1):
+        pos = (t - t0) / max(t1 - t0, 1) * VIEW
+        grid_x.append(pos)
+        ticks.append(f'<span class="chart-preview-tick x" style="left: {pos / VIEW * 100:.1f}%">{label}</span>')
+
+    x_title = cfg.get("xTitle") or ("日期" if cfg["id"] in DATE_X_TITLE_CHARTS else cfg["x"])
+    y_title = cfg.get("yTitle") or Y_TITLES.get(cfg["id"], "")
+    titles = [("x", x_title), ("y", y_title)]
+    if has_y2:
+        titles.append(("y2", Y2_TITLES.get(cfg["id"], "")))
+    margin = (30, 70 if has_y2 else 15, 80, 70)
+    return _frame(margin, "".join(paths), ticks, grid_y, grid_x, titles)
+
+
+def _bar_fields(cfg, df):
+    """(stacked fields bottom-up, total field) detected the way the page does."""
+    headers = [h for h in df.columns if h != cfg["x"]]
+    total = next((h for h in headers if "合计" in h or "总计" in h), None)
+    exclude = {"份额变化"} if cfg["id"] == "fund_market2" else set()
+    fields = [h for h in headers if h != total and h not in exclude]
+    rank = {name: i for i, name in enumerate(BAR_FIELD_ORDER)}
+    fields.sort(key=lambda h: rank.get(h, len(rank)))
+    return fields, total
+
+
+def bar_preview(cfg, df):
+    """Preview of a stacked bar chart with category x axis."""
+    if cfg["x"] not in df.columns or df.empty:
+        return None
+    fields, total = _bar_fields(cfg, df)
+    if not fields:
+        return None
+    values = np.column_stack([
+        pd.to_numeric(df[f], errors="coerce").fillna(0).to_numpy(dtype=np.float64) for f in fields
+    ])
+    totals = (
+        pd.to_numeric(df[total], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+        if total else values.sum(axis=1)
+    )
+    top = totals.max() * 1.02 if len(totals) and totals.max() > 0 else 100.0
+    scale, ticks, grid_y = _y_axis_range(0.0, top, "y")
+
+    n = len(df)
+    # 与页面相同的类目轴范围 [-0.3, n - 0.7]，柱宽为类目宽度的 80%
+    width = VIEW / (n - 0.4)
+    centers = (np.arange(n) + 0.3) * width
+    rects = []
+    base = np.zeros(n)
+    for j, field in enumerate(fields):
+        color = line_color(cfg, field)
+        for i in range(n):
+            y0, y1 = scale(base[i]), scale(base[i] + values[i, j])
+            rects.append(
+                f'<rect x="{centers[i] - width * 0.4:.1f}" y="{min(y0, y1):.1f}" '
+                f'width="{width * 0.8:.1f}" height="{abs(y0 - y1):.1f}" fill="{color}"/>'
+            )
+        base += values[:, j]
+
+    labels = df[cfg["x"]].astype(str).tolist()
+    every = max(1, math.ceil(n / 8))
+    grid_x = []
+    for i in range(0, n, every):
+        grid_x.append(centers[i])
+        ticks.append(
+            f'<span class="chart-preview-tick x" style="left: {centers[i] / VIEW * 100:.1f}%">{escape(labels[i])}</span>'
+        )
+    titles = [("x", "日期"), ("y", Y_TITLES.get(cfg["id"]) or fields[0])]
+    return _frame((30, 15, 80, 70), "".join(rects), ticks, grid_y, grid_x, titles)
+
+
+def scatter_preview(cfg, df):
+    """Preview of a scatter chart; points drawn as round dots that keep their size when stretched."""
+    if cfg["x"] not in df.columns or cfg["y"] not in df.columns or df.empty:
+        return None
+    x = pd.to_numeric(df[cfg["x"]], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+    y = pd.to_numeric(df[cfg["y"]], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+    y_scale, ticks, grid_y = _y_axis(y, "y", pad=0.05)
+    x_lo, x_hi = float(x.min()), float(x.max())
+    pad = (x_hi - x_lo) * 0.05 or 1.0
+    x_lo, x_hi = x_lo - pad, x_hi + pad
+    xs = (x - x_lo) / (x_hi - x_lo) * VIEW
+    dots = "".join(f"M{a:.0f} {y_scale(b):.0f}h0" for a, b in zip(xs, y))
+    body = (
+        f'<path d="{dots}" stroke="#005bac" stroke-width="8" stroke-linecap="round" fill="none" '
+        'vector-effect="non-scaling-stroke"/>'
+    )
+    x_ticks, step = nice_ticks(x_lo, x_hi)
+    grid_x = [(t - x_lo) / (x_hi - x_lo) * VIEW for t in x_ticks]
+    ticks += [
+        f'<span class="chart-preview-tick x" style="left: {g / VIEW * 100:.1f}%">{format_tick(t, step)}</span>'
+        for t, g in zip(x_ticks, grid_x)
+    ]
+    titles = [("x", cfg.get("x") or "预测ROE"), ("y", cfg.get("y") or "预测PB")]
+    return _frame((20, 15, 60, 60), body, ticks, grid_y, grid_x, titles)
+
+
+@traced("build_previews")
+def build_previews(data_by_sheet, chart_configs):
+    """``{chart id: preview markup}`` for every chart whose data is embedded (not partitioned)."""
+    previews = {}
+    frames = {}
+    for cfgs in chart_configs.values():
+        for cfg in cfgs:
+            data = data_by_sheet.get(cfg["sheet"])
+            if not data or (isinstance(data, dict) and PARTITION_KEY in data):
+                continue
+            # 多个图表共用一张 sheet 时只构建一次 DataFrame
+            df = frames.get(cfg["sheet"])
+            if df is None:
+                df = frames[cfg["sheet"]] = sheet_frame(data)
+            kind = cfg.get("type")
+            render = scatter_preview if kind == "scatter" else bar_preview if kind == "bar" else line_preview
+            markup = render(cfg, df)
+            if markup:
+                previews[cfg["id"]] = markup
+    return previews
@@ -0,0 +1,225 @@
+"""时间序列列存：每个 sheet 一个目录，每列一个 float64 二进制文件。
+
+--watch 与 --serve 模式每次重建时由 ``write_column_store`` 写出，看板服务用
+``ColumnStore`` 以内存映射方式读取，按 ``[start, end]`` 在有序日期索引上二分
+查找，只取窗口内的数据，并抽稀到不超过 ``max_points`` 个点（每个桶保留最小值
+与最大值，保留形态）。
+
+目录结构::
+
+    列存数据/
+        manifest.json            # {sheet: {"folder": 目录名, "version": 数据版本}}
+        s0/meta.json             # {"sheet", "x", "length", "columns": {列名: 文件名}, "version"}
+        s0/x.f64                 # 日期，epoch 毫秒，升序
+        s0/c0.f64 ...            # 数值列，缺失为 NaN
+"""
+from pathlib import Path
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from build_profile import span
+
+
+MANIFEST = "manifest.json"
+META = "meta.json"
+X_FILE = "x.f64"
+
+
+def sheet_frame(data):
+    """DataFrame from either the records or the column-oriented sheet layout."""
+    return pd.DataFrame(data) if isinstance(data, dict) else pd.DataFrame.from_records(data)
+
+
+def time_series_sheets(chart_configs):
+    """``{sheet: x field}`` for every sheet drawn on a date axis (line charts and their views)."""
+    sheets = {}
+    for cfgs in chart_configs.values():
+        for cfg in cfgs:
+            if cfg.get("type") in ("scatter", "bar"):
+                continue
+            sheets.setdefault(cfg["sheet"], cfg["x"])
+            for view in cfg.get("views", []):
+                if view.get("sheet"):
+                    sheets.setdefault(view["sheet"], cfg["x"])
+    return sheets
+
+
+def _write_if_changed(path, payload):
+    # 内容不变不重写，服务端已映射的文件保持有效；变化时先写临时文件再原子替换
+    if path.exists() and path.stat().st_size == len(payload) and path.read_bytes() == payload:
+        return False
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(payload)
+    os.replace(tmp, path)
+    return True
+
+
+def write_column_store(data_by_sheet, chart_configs, root):
+    """Write every time-series sheet as memory-mappable column files under ``root``."""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for i, (sheet, x_field) in enumerate(time_series_sheets(chart_configs).items()):
+        if sheet not in data_by_sheet:
+            continue
+        with span("write_column_store", detail=sheet) as record:
+            written = _write_sheet(root / f"s{i}", data_by_sheet[sheet], sheet, x_field)
+            if written is None:
+                continue
+            version, size = written
+            record.add_bytes(size)
+        # 版本写进清单：只有数据变化的重建也会改写清单，服务端据此重新映射
+        manifest[sheet] = {"folder": f"s{i}", "version": version}
+    _write_if_changed(root / MANIFEST, json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))
+    return manifest
+
+
+def _write_sheet(folder, data, sheet, x_field):
+    """Write one sheet's column files; returns ``(version, column bytes)``, or None without an x column."""
+    df = sheet_frame(data)
+    if x_field not in df.columns:
+        return None
+    x = pd.to_datetime(df[x_field], errors="coerce")
+    df = df.loc[x.notna()].assign(**{x_field: x[x.notna()]}).sort_values(x_field, kind="stable")
+
+    folder.mkdir(exist_ok=True)
+    digest = hashlib.sha1()
+    payload = (df[x_field].to_numpy("datetime64[ms]").astype(np.int64).astype(np.float64)).tobytes()
+    digest.update(payload)
+    _write_if_changed(folder / X_FILE, payload)
+    size = len(payload)
+
+    columns = {}
+    for j, col in enumerate(c for c in df.columns if c != x_field):
+        values = pd.to_numeric(df[col], errors="coerce")
+        if values.isna().all():
+            continue
+        payload = values.to_numpy(dtype=np.float64).tobytes()
+        digest.update(str(col).encode("utf-8") + payload)
+        columns[str(col)] = f"c{j}.f64"
+        _write_if_changed(folder / columns[str(col)], payload)
+        size += len(payload)
+
+    meta = {
+        "sheet": sheet,
+        "x": x_field,
+        "length": len(df),
+        "columns": columns,
+        "version": digest.hexdigest()[:16],
+    }
+    _write_if_changed(folder / META, json.dumps(meta, ensure_ascii=False, indent=1).encode("utf-8"))
+    return meta["version"], size
+
+
+def decimate(x, columns, max_points):
+    """Indices keeping the min and max of every column per bucket; at most ``max_points`` of them."""
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+    per_bucket = 2 * max(1, len(columns))
+    buckets = max(1, max_points // per_bucket)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    keep = [edges[:-1], np.maximum(edges[1:] - 1, edges[:-1])]
+    for values in columns:
+        # 桶长度不一，补齐成矩阵后按行取极值；NaN 不参与
+        width = int(np.max(np.diff(edges)))
+        idx = edges[:-1, None] + np.arange(width)[None, :]
+        valid = idx < edges[1:, None]
+        block = np.where(valid, values[np.minimum(idx, n - 1)], np.nan)
+        has = ~np.all(np.isnan(block), axis=1)
+        lo = np.where(np.isnan(block), np.inf, block).argmin(axis=1)
+        hi = np.where(np.isnan(block), -np.inf, block).argmax(axis=1)
+        keep.append((edges[:-1] + lo)[has])
+        keep.append((edges[:-1] + hi)[has])
+    out = np.unique(np.concatenate(keep))
+    if len(out) > max_points:
+        out = out[np.linspace(0, len(out) - 1, max_points).astype(np.int64)]
+    return out
+
+
+def _format_dates(ms):
+    stamps = ms.astype(np.int64).astype("datetime64[ms]")
+    # 日频数据只输出日期，与页面内嵌数据保持一致
+    if np.all(ms % 86_400_000 == 0):
+        return np.datetime_as_string(stamps, unit="D").tolist()
+    return np.datetime_as_string(stamps, unit="s").tolist()
+
+
+def _parse_bound(value, default):
+    if value in (None, ""):
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return float(pd.Timestamp(value).value // 1_000_000)
+
+
+class ColumnStore:
+    """Read side of the column store; files are memory-mapped and re-opened when a sheet's version changes."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._sheets = {}
+
+    def _refresh(self):
+        # 清单很小，按内容比较：同一时间戳内的两次重建也能察觉
+        manifest_path = self.root / MANIFEST
+        manifest = manifest_path.read_bytes() if manifest_path.exists() else None
+        with self._lock:
+            if manifest == self._manifest:
+                return
+            sheets = {}
+            if manifest is not None:
+                for sheet, entry in json.loads(manifest).items():
+                    old = self._sheets.get(sheet)
+                    if old is not None and old[0]["version"] == entry["version"]:
+                        sheets[sheet] = old
+                        continue
+                    base = self.root / entry["folder"]
+                    meta = json.loads((base / META).read_text(encoding="utf-8"))
+                    # 空文件无法映射，长度为 0 的 sheet 不打开文件
+                    files = {"": X_FILE, **meta["columns"]} if meta["length"] else {}
+                    arrays = {
+                        name: np.memmap(base / file, dtype=np.float64, mode="r")
+                        for name, file in files.items()
+                    }
+                    sheets[sheet] = (meta, arrays)
+            self._sheets = sheets
+            self._manifest = manifest
+
+    def version(self, sheet):
+        self._refresh()
+        entry = self._sheets.get(sheet)
+        return entry[0]["version"] if entry else None
+
+    def window(self, sheet, start=None, end=None, max_points=2000, fields=None):
+        """Columns of ``sheet`` within ``[start, end]`` (ISO dates or epoch ms), decimated to ``max_points``."""
+        self._refresh()
+        entry = self._sheets.get(sheet)
+        if entry is None:
+            raise KeyError(sheet)
+        meta, arrays = entry
+        names = [f for f in (fields or meta["columns"]) if f in meta["columns"]]
+        if not meta["length"]:
+            return {"sheet": sheet, "total": 0, "decimated": False, "columns": {meta["x"]: [], **{n: [] for n in names}}}
+
+        x = arrays[""]
+        lo = int(np.searchsorted(x, _parse_bound(start, -np.inf), side="left"))
+        hi = int(np.searchsorted(x, _parse_bound(end, np.inf), side="right"))
+        # 多带窗口外两侧各一个点，折线能画到坐标轴边缘
+        lo, hi = max(lo - 1, 0), min(hi + 1, len(x))
+        values = [np.asarray(arrays[n][lo:hi]) for n in names]
+        keep = decimate(x[lo:hi], values, max(2, int(max_points)))
+
+        columns = {meta["x"]: _format_dates(np.asarray(x[lo:hi])[keep])}
+        for name, col in zip(names, values):
+            col = col[keep]
+            columns[name] = np.where(np.isnan(col), None, col).tolist()
+        return {"sheet": sheet, "total": hi - lo, "decimated": len(keep) < hi - lo, "columns": columns}
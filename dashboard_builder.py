@@ -0,0 +1,115 @@
+"""内存数据直接生成看板：不经过 Excel 写出与读回。
+
+上游研究任务手中已有各 sheet 的 DataFrame，以前需要先写入
+``作图数据整理.xlsx`` 再由 ``build_data_and_config`` 读回。``DashboardBuilder``
+直接接收按 sheet 名组织的 DataFrame、NumPy 数组或列字典，配合图表配置
+（默认为标准看板的 ``default_chart_configs()``），生成与文件构建相同的页面
+与分区文件::
+
+    from dashboard_builder import DashboardBuilder
+
+    builder = DashboardBuilder({"因子图1": factor_df, "资金图1": fund_df})
+    builder.add_sheet("风险图1-新高个股占比", values, columns=["date", "占比", "上证综指(右)"])
+    builder.write()                       # dashboard.html + index.html
+    html = builder.html(title="因子周报")  # 只要页面文本
+
+命令行的一次性构建也是先读取输入文件，再交给 ``DashboardBuilder.from_data``。
+"""
+from collections.abc import Mapping
+import copy
+
+import numpy as np
+import pandas as pd
+
+from build_profile import span
+import generate_dashboard as gd
+
+
+def as_frame(table, columns=None):
+    """DataFrame view of a DataFrame, structured or 2-D NumPy array, or ``{column: values}`` mapping."""
+    if isinstance(table, pd.DataFrame):
+        return table
+    if isinstance(table, np.ndarray):
+        if table.dtype.names:
+            return pd.DataFrame(table)
+        if table.ndim != 2 or columns is None:
+            raise ValueError("二维数组需要通过 columns 指定列名")
+        return pd.DataFrame(table, columns=columns)
+    if isinstance(table, Mapping):
+        return pd.DataFrame(dict(table))
+    raise TypeError(f"不支持的数据类型: {type(table).__name__}")
+
+
+class DashboardBuilder:
+    """Builds the dashboard from in-memory sheets.
+
+    ``sheets`` maps sheet names to tables accepted by ``as_frame``;
+    ``chart_configs`` (copied, never modified) defaults to the standard charts.
+    Charts flagged ``analytics`` get their drawdown / rolling views in ``prepare``.
+    """
+
+    def __init__(self, sheets=None, chart_configs=None):
+        self.data_by_sheet = {}
+        self.chart_configs = gd.default_chart_configs() if chart_configs is None else copy.deepcopy(chart_configs)
+        self._analytics = True
+        self._prepared = None
+        for name, table in (sheets or {}).items():
+            self.add_sheet(name, table)
+
+    @classmethod
+    def from_data(cls, data_by_sheet, chart_configs):
+        """Builder over data and configs already prepared by ``build_data_and_config``."""
+        builder = cls(chart_configs={})
+        builder.data_by_sheet = data_by_sheet
+        builder.chart_configs = chart_configs
+        builder._analytics = False
+        return builder
+
+    def add_sheet(self, name, table, columns=None):
+        """Add or replace one sheet; returns the builder."""
+        with span("sheet_to_columns", detail=name):
+            self.data_by_sheet[name] = gd.sheet_to_columns(as_frame(table, columns))
+        self._prepared = None
+        return self
+
+    def prepare(self):
+        """``(data_by_sheet, chart_configs)`` as the page consumes them, with analytics views attached."""
+        if self._prepared is None:
+            data_by_sheet, chart_configs = self.data_by_sheet, self.chart_configs
+            if self._analytics:
+                # 分析视图会扩展配置并新增 sheet，在副本上计算，之后仍可继续 add_sheet
+                data_by_sheet, chart_configs = dict(data_by_sheet), copy.deepcopy(chart_configs)
+                with span("nav_analytics"):
+                    gd.add_nav_analytics(data_by_sheet, chart_configs)
+            self._prepared = (data_by_sheet, chart_configs)
+        return self._prepared
+
+    def chunks(self, rum_endpoint=None, page_data=None, **branding):
+        """The page as a stream of text chunks (``page_chunks``); ``page_data`` replaces the
+        embedded data (e.g. partition indexes). ``branding`` is passed on (``title``,
+        ``subtitle``, ``logo_path``)."""
+        data_by_sheet, chart_configs = self.prepare()
+        return gd.page_chunks(
+            data_by_sheet if page_data is None else page_data, chart_configs, rum_endpoint=rum_endpoint,
+            overviews=gd.build_overviews(data_by_sheet, chart_configs),
+            previews=gd.build_previews(data_by_sheet, chart_configs),
+            **branding,
+        )
+
+    def html(self, rum_endpoint=None, page_data=None, **branding):
+        """The page text; same arguments as ``chunks``."""
+        return "".join(self.chunks(rum_endpoint, page_data, **branding))
+
+    def write(self, paths=(gd.DASHBOARD_HTML, gd.INDEX_HTML), partition=None, rum_endpoint=None,
+              column_store=None, **branding):
+        """Publish like the command line build: the page streamed to the first of ``paths`` and
+        linked to the others, and partition files when ``partition`` is ``"Y"``/``"M"``. The
+        memory-mapped column store, read only by ``--serve``, is written to ``column_store``
+        when one is given."""
+        data_by_sheet, chart_configs = self.prepare()
+        page_data = None
+        if partition:
+            page_data = gd.publish_partitions(data_by_sheet, chart_configs, partition)
+        gd.write_outputs(self.chunks(rum_endpoint, page_data, **branding), paths)
+        if column_store is not None:
+            gd.write_column_store(data_by_sheet, chart_configs, column_store)
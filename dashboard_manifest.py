@@ -0,0 +1,181 @@
+"""按清单一次构建多个看板：共享解析，多进程渲染，数据分区按内容哈希去重。
+
+清单是一个 JSON 文件，每个看板可以只包含部分板块或图表，并有各自的标题、
+logo 与输出路径（相对路径均相对清单文件所在目录）::
+
+    {
+      "partition": "Y",
+      "shared_dir": "分区数据",
+      "dashboards": [
+        {"name": "完整版", "outputs": ["dashboard.html", "index.html"]},
+        {
+          "name": "资金面",
+          "outputs": ["资金面/index.html"],
+          "categories": ["资金"],
+          "charts": ["risk1"],
+          "title": "资金面监控",
+          "subtitle": "Fund Flow Monitor",
+          "logo": "资金面/logo.png"
+        }
+      ]
+    }
+
+所有输入文件只解析一次；各看板只内嵌自己用到的 sheet，渲染与写出分发到
+进程池中并行。时间序列按 ``partition``（``"Y"``/``"M"``）切成以内容哈希命名
+的分区文件，统一写入 ``shared_dir``，各看板引用同一份文件，多个看板共用的
+数据在磁盘上（以及浏览器缓存中）只有一份；``"partition": null`` 时每个页面
+自包含地内嵌全部数据。
+
+命令行用法::
+
+    python generate_dashboard.py --manifest 看板清单.json [--processes 4]
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import json
+import os
+
+from build_profile import span
+from partition_store import PAGE_KEY, write_partitions
+import generate_dashboard as gd
+
+
+_WORKER_SHARED = None
+
+
+def load_manifest(path):
+    """Parsed manifest with every output, logo and shared directory resolved against its folder."""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"未找到看板清单: {path}")
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    base = path.resolve().parent
+    dashboards = manifest.get("dashboards") or []
+    if not dashboards:
+        raise ValueError(f"看板清单中没有看板: {path}")
+    for index, board in enumerate(dashboards):
+        board.setdefault("name", f"看板{index + 1}")
+        outputs = board.get("outputs") or board.get("output")
+        if not outputs:
+            raise ValueError(f"看板 {board['name']} 未指定输出路径")
+        if isinstance(outputs, str):
+            outputs = [outputs]
+        board["outputs"] = [(base / p).resolve() for p in outputs]
+        if board.get("logo"):
+            board["logo"] = (base / board["logo"]).resolve()
+    manifest["dashboards"] = dashboards
+    shared_dir = manifest.get("shared_dir")
+    manifest["shared_dir"] = (base / shared_dir).resolve() if shared_dir else gd.PARTITION_DIR
+    return manifest
+
+
+def select_charts(chart_configs, categories=None, charts=None):
+    """Whole ``categories`` plus single ``charts`` (by id), in the original order; everything when both are empty."""
+    if not categories and not charts:
+        return chart_configs
+    categories, charts = set(categories or ()), set(charts or ())
+    missing = (categories - set(chart_configs)) | (
+        charts - {cfg["id"] for cfgs in chart_configs.values() for cfg in cfgs}
+    )
+    if missing:
+        raise ValueError(f"看板清单中的板块或图表不存在: {', '.join(sorted(missing))}")
+    selected = {}
+    for category, cfgs in chart_configs.items():
+        kept = [cfg for cfg in cfgs if category in categories or cfg["id"] in charts]
+        if kept:
+            selected[category] = kept
+    return selected
+
+
+def sheets_used(chart_configs):
+    """Names of the sheets the charts (and their alternative views) draw from."""
+    sheets = set()
+    for cfgs in chart_configs.values():
+        for cfg in cfgs:
+            sheets.add(cfg["sheet"])
+            sheets.update(view["sheet"] for view in cfg.get("views", []) if view.get("sheet"))
+    return sheets
+
+
+def relocate_partitions(data, folder, shared_root):
+    """Partition index of one sheet with its URLs made relative to the page's ``folder``."""
+    parts = []
+    for part in data[PAGE_KEY]:
+        target = shared_root.parent / part["url"]
+        parts.append({**part, "url": Path(os.path.relpath(target, folder)).as_posix()})
+    return {PAGE_KEY: parts}
+
+
+def _init_worker(shared):
+    global _WORKER_SHARED
+    _WORKER_SHARED = shared
+
+
+def _render_dashboard(job):
+    """Render one dashboard and write its outputs; returns ``(name, [(path, bytes), ...])``."""
+    page_data, overviews, previews, rum_endpoint, shared_root = _WORKER_SHARED
+    board, configs = job
+    used = sheets_used(configs)
+    data = {sheet: value for sheet, value in page_data.items() if sheet in used}
+    ids = {cfg["id"] for cfgs in configs.values() for cfg in cfgs}
+
+    # 分区 URL 相对页面解析，输出在不同目录时各自换算一次
+    folders = {}
+    for path in board["outputs"]:
+        folders.setdefault(path.parent, []).append(path)
+    written = []
+    for folder, paths in folders.items():
+        folder_data = {
+            sheet: relocate_partitions(value, folder, shared_root)
+            if isinstance(value, dict) and PAGE_KEY in value else value
+            for sheet, value in data.items()
+        }
+        page = gd.page_chunks(
+            folder_data, configs, rum_endpoint=rum_endpoint,
+            overviews={k: v for k, v in overviews.items() if k in ids},
+            previews={k: v for k, v in previews.items() if k in ids},
+            title=board.get("title") or gd.DASHBOARD_TITLE,
+            subtitle=board.get("subtitle") or gd.DASHBOARD_SUBTITLE,
+            logo_path=board.get("logo"),
+        )
+        folder.mkdir(parents=True, exist_ok=True)
+        gd.write_outputs(page, paths)
+        written += [(path, path.stat().st_size) for path in paths]
+    return board["name"], written
+
+
+def build_manifest(path, processes=None, partition=None, rum_endpoint=None):
+    """Build every dashboard of the manifest at ``path``; ``partition`` overrides the manifest's setting."""
+    manifest = load_manifest(path)
+    data_by_sheet, chart_configs = gd.build_data_and_config()
+    jobs = [
+        (board, select_charts(chart_configs, board.get("categories"), board.get("charts")))
+        for board in manifest["dashboards"]
+    ]
+
+    # 概览与静态预览按图表计算，各看板共用同一份
+    overviews = gd.build_overviews(data_by_sheet, chart_configs)
+    previews = gd.build_previews(data_by_sheet, chart_configs)
+    freq = partition or manifest.get("partition", "Y")
+    shared_root = Path(manifest["shared_dir"])
+    page_data = data_by_sheet
+    if freq:
+        with span("write_partitions"):
+            page_data, report = write_partitions(data_by_sheet, chart_configs, shared_root, freq)
+        print(f"共享分区数据: {len(report)} 个 sheet -> {shared_root}")
+
+    shared = (page_data, overviews, previews, rum_endpoint, shared_root)
+    with span("render_dashboards"):
+        if processes == 1 or len(jobs) <= 1:
+            _init_worker(shared)
+            results = list(map(_render_dashboard, jobs))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=processes, initializer=_init_worker, initargs=(shared,)
+            ) as pool:
+                results = list(pool.map(_render_dashboard, jobs))
+
+    for name, written in results:
+        for out, size in written:
+            print(f"已生成看板 {name}: {out} ({size / 1024:.0f} KB)")
+    return results
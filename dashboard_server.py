@@ -0,0 +1,228 @@
+"""实时推送服务：监视模式 + 本地 HTTP 服务。
+
+页面由本服务提供；输入文件变化并重建后，只把变化的 sheet 与图表配置通过
+Server-Sent Events 推送给已打开的页面，页面原地更新受影响的图表，保留
+用户当前的时间范围与归一化。图表结构（板块、图表增删）变化时通知页面整体
+刷新。
+
+``/api/series?sheet=…&start=…&end=…&max_points=…[&fields=a,b]`` 从内存映射的
+列存中返回窗口内抽稀后的数据（列式 JSON），带 ETag，支持条件请求。
+``--partition`` 发布的分区文件同样由本服务提供（文件名含内容哈希，可长期缓存）。
+
+命令行用法::
+
+    python generate_dashboard.py --serve --port 8000
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+import hashlib
+import json
+import queue
+import threading
+
+from column_store import ColumnStore
+import generate_dashboard as gd
+from dashboard_watch import watch
+from page_shell import description_html
+from partition_store import sheet_columns
+
+
+EVENTS_PATH = "/events"
+SERIES_PATH = "/api/series"
+PAGE_PATHS = ("/", f"/{gd.INDEX_HTML.name}", f"/{gd.DASHBOARD_HTML.name}")
+# 空闲连接的心跳间隔（秒），便于及时发现已断开的页面
+HEARTBEAT = 15
+LIVE_SNIPPET = (
+    f"<script>enableRangeQueries('{SERIES_PATH}'); connectLiveUpdates('{EVENTS_PATH}');</script>\n</body>"
+)
+
+
+def _join_json(parts):
+    """JSON object text from ``{key: already-serialized JSON value}``."""
+    return "{%s}" % ", ".join(
+        f"{json.dumps(key, ensure_ascii=False)}: {value}" for key, value in parts.items()
+    )
+
+
+class LiveHub:
+    """Latest page plus the per-sheet / per-chart JSON it was built from; fans updates out to subscribers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = set()
+        self.page = None
+        self.build = None
+        self._sheets = {}
+        self._configs = {}
+        self._layout = None
+
+    def publish(self, data_by_sheet, chart_configs, html, build):
+        # 页面用 JSON.parse 解析推送，NaN / Infinity 须先转为 null
+        sheets = {
+            name: json.dumps(sheet_columns(data), ensure_ascii=False, allow_nan=False)
+            for name, data in data_by_sheet.items()
+        }
+        configs = {
+            cfg["id"]: json.dumps(cfg, ensure_ascii=False)
+            for cfgs in chart_configs.values()
+            for cfg in cfgs
+        }
+        layout = [(category, [cfg["id"] for cfg in cfgs]) for category, cfgs in chart_configs.items()]
+
+        message = None
+        if self.build is not None:
+            if layout != self._layout:
+                message = ("reload", json.dumps({"build": build}))
+            else:
+                changed = {n: v for n, v in sheets.items() if self._sheets.get(n) != v}
+                changed.update({n: "null" for n in self._sheets if n not in sheets})
+                changed_cfgs = {i: v for i, v in configs.items() if self._configs.get(i) != v}
+                # 各 sheet 已是 JSON 文本，直接拼接，避免再次序列化
+                # 说明面板在服务端渲染，页面直接替换
+                panels = {i: json.dumps(description_html(json.loads(v)), ensure_ascii=False) for i, v in changed_cfgs.items()}
+                message = ("update", '{"build": %s, "sheets": %s, "configs": %s, "panels": %s}' % (
+                    json.dumps(build), _join_json(changed), _join_json(changed_cfgs), _join_json(panels),
+                ))
+
+        with self._lock:
+            self.page = html.replace("</body>", LIVE_SNIPPET, 1).encode("utf-8")
+            self.build = build
+            self._sheets, self._configs, self._layout = sheets, configs, layout
+            if message is not None:
+                for client in self._clients:
+                    client.put((build, *message))
+
+    def subscribe(self):
+        client = queue.Queue()
+        with self._lock:
+            self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+
+def make_handler(hub, store):
+    class LiveHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path in PAGE_PATHS:
+                self._send_page()
+            elif url.path == EVENTS_PATH:
+                self._stream_events(parse_qs(url.query).get("build", [None])[0])
+            elif url.path == SERIES_PATH:
+                self._send_series(url.query)
+            elif unquote(url.path).startswith(f"/{gd.PARTITION_DIR.name}/"):
+                self._send_partition(unquote(url.path))
+            else:
+                self.send_error(404)
+
+        def _send_page(self):
+            page = hub.page
+            if page is None:
+                self.send_error(503, "Dashboard not built yet")
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(page)))
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(page)
+
+        def _send_partition(self, path):
+            target = (gd.PARTITION_DIR.parent / path.lstrip("/")).resolve()
+            if target.parent.parent != gd.PARTITION_DIR.resolve() or not target.is_file():
+                self.send_error(404)
+                return
+            body = target.read_bytes()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_series(self, query):
+            params = {k: v[0] for k, v in parse_qs(query).items()}
+            sheet = params.get("sheet")
+            version = store.version(sheet)
+            if version is None:
+                self.send_error(404, "Unknown sheet")
+                return
+            # 同一数据版本下同一查询的结果不变
+            etag = '"%s-%s"' % (version, hashlib.sha1(query.encode("utf-8")).hexdigest()[:12])
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            try:
+                fields = params.get("fields")
+                result = store.window(
+                    sheet,
+                    start=params.get("start"),
+                    end=params.get("end"),
+                    max_points=int(params.get("max_points", 2000)),
+                    fields=fields.split(",") if fields else None,
+                )
+            except ValueError as exc:
+                self.send_error(400, "Bad query", str(exc))
+                return
+            body = json.dumps(result, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _event(self, build, name, data):
+            self.wfile.write(f"id: {build}\nevent: {name}\ndata: {data}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        def _stream_events(self, build):
+            client = hub.subscribe()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "keep-alive")
+            self.end_headers()
+            try:
+                # 重连时浏览器带上最后收到的版本；与当前版本不一致说明错过了更新，整页刷新
+                seen = self.headers.get("Last-Event-ID") or build
+                if hub.build is not None and seen != hub.build:
+                    self._event(hub.build, "reload", json.dumps({"build": hub.build}))
+                while True:
+                    try:
+                        self._event(*client.get(timeout=HEARTBEAT))
+                    except queue.Empty:
+                        self.wfile.write(b": ping\n\n")
+                        self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                hub.unsubscribe(client)
+                self.close_connection = True
+
+    return LiveHandler
+
+
+def serve(host="127.0.0.1", port=8000, partition=None, rum_endpoint=None):
+    """Serve the dashboard with live updates while watching the inputs for changes."""
+    hub = LiveHub()
+    store = ColumnStore(gd.COLUMN_STORE_DIR)
+    server = ThreadingHTTPServer((host, port), make_handler(hub, store))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"看板服务已启动: http://{host}:{port}/")
+    try:
+        watch(on_rebuild=hub.publish, partition=partition, rum_endpoint=rum_endpoint)
+    finally:
+        server.shutdown()
@@ -0,0 +1,183 @@
+"""监视模式：输入文件变化后增量重建看板。
+
+xlsx 是 zip 包，每个 sheet 对应包内一个 XML 部件，zip 目录中记录了各部件
+的 CRC。只比较这些 CRC 就能知道保存后哪些 sheet 真正变了（无需解压），
+未变化的 sheet 直接复用内存中已解析的 DataFrame / records；共享字符串表或
+样式表变化时，该工作簿的所有 sheet 视为已变化。派生计算（资产配置回测、
+行业 PB-ROE 聚合、因子回测）按输入文件指纹缓存。
+
+命令行用法::
+
+    python generate_dashboard.py --watch
+"""
+from pathlib import Path
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+
+from build_profile import span
+import generate_dashboard as gd
+
+
+# 所有 sheet 共用的部件：变化时整本工作簿重读
+SHARED_PARTS = ("xl/sharedStrings.xml", "xl/styles.xml", "xl/workbook.xml")
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def workbook_parts(path):
+    """Sheet names (in order) with the zip CRC of each sheet's XML part and of the shared parts."""
+    with zipfile.ZipFile(path) as zf:
+        crcs = {info.filename: info.CRC for info in zf.infolist()}
+        workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+        rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(f"{PKG_REL_NS}Relationship")}
+    shared = tuple(crcs.get(part) for part in SHARED_PARTS)
+    sheets = {}
+    for sheet in workbook.iter(f"{MAIN_NS}sheet"):
+        target = targets.get(sheet.get(f"{REL_NS}id"), "")
+        part = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+        sheets[sheet.get("name")] = (crcs.get(part), shared)
+    return sheets
+
+
+class CachingWorkbookReader(gd.WorkbookReader):
+    """WorkbookReader that re-parses only sheets whose content changed since the last build."""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self._parts = {}
+        self._frames = {}
+        self._records = {}
+        self._memo = {}
+        self.reloaded = []
+
+    def _sheets(self, path):
+        stamp = gd.path_fingerprint(path)
+        cached = self._parts.get(path)
+        if cached is None or cached[0] != stamp:
+            try:
+                sheets = workbook_parts(path)
+            except (zipfile.BadZipFile, KeyError, ET.ParseError):
+                # 非标准 xlsx：退化为按整个文件的修改时间判断
+                sheets = None
+            cached = (stamp, sheets)
+            self._parts[path] = cached
+        return cached[1]
+
+    def signature(self, path, sheet):
+        source = self.source(sheet)
+        if source is not None:
+            return gd.path_fingerprint(source)
+        sheets = self._sheets(path)
+        if sheets is None:
+            return gd.path_fingerprint(path)
+        return sheets.get(sheet)
+
+    def sheet_names(self, path):
+        sheets = self._sheets(path)
+        if sheets is None:
+            return super().sheet_names(path)
+        return list(sheets) + [sheet for sheet in gd.table_files(self.input_dir) if sheet not in sheets]
+
+    def read(self, path, sheet):
+        key = (path, sheet)
+        signature = self.signature(path, sheet)
+        cached = self._frames.get(key)
+        if cached is None or cached[0] != signature:
+            self.reloaded.append(f"{Path(path).name}/{sheet}")
+            cached = (signature, super().read(path, sheet))
+            self._frames[key] = cached
+        return cached[1]
+
+    def records(self, path, sheet, rename=None):
+        key = (path, sheet, tuple(sorted((rename or {}).items())))
+        signature = self.signature(path, sheet)
+        cached = self._records.get(key)
+        if cached is None or cached[0] != signature:
+            cached = (signature, super().records(path, sheet, rename))
+            self._records[key] = cached
+        return cached[1]
+
+    def memo(self, key, fingerprint, compute):
+        cached = self._memo.get(key)
+        if cached is None or cached[0] != fingerprint:
+            self.reloaded.append(key)
+            with span("derive", detail=key):
+                cached = (fingerprint, compute())
+            self._memo[key] = cached
+        return cached[1]
+
+
+def snapshot(paths):
+    return tuple(map(gd.path_fingerprint, paths))
+
+
+def rebuild(reader, previous_html=None, on_rebuild=None, partition=None, rum_endpoint=None):
+    """Run one build through ``reader``; writes outputs only when the page changed.
+
+    ``on_rebuild(page_data, chart_configs, html, build)`` is called after every
+    build whose page changed (e.g. to push the new data to open pages), with
+    the same sheet data the page embeds and the build hash written into it.
+    ``partition`` ("Y"/"M") publishes time series as partition files;
+    ``rum_endpoint`` enables the page's performance beacons.
+    """
+    reader.reloaded = []
+    data_by_sheet, chart_configs = gd.build_data_and_config(reader)
+    page_data = data_by_sheet
+    if partition:
+        page_data = gd.publish_partitions(data_by_sheet, chart_configs, partition)
+    html, build = gd.build_page(
+        page_data, chart_configs, rum_endpoint=rum_endpoint,
+        overviews=gd.build_overviews(data_by_sheet, chart_configs),
+        previews=gd.build_previews(data_by_sheet, chart_configs),
+    )
+    if html != previous_html:
+        gd.write_outputs(html)
+        gd.write_column_store(data_by_sheet, chart_configs, gd.COLUMN_STORE_DIR)
+        if on_rebuild is not None:
+            on_rebuild(page_data, chart_configs, html, build)
+    return html
+
+
+def watch(interval=0.2, debounce=0.3, on_rebuild=None, partition=None, rum_endpoint=None):
+    """Poll the inputs and rebuild after each burst of changes settles for ``debounce`` seconds."""
+    reader = CachingWorkbookReader()
+    paths = gd.input_paths()
+
+    start = time.perf_counter()
+    html = rebuild(reader, on_rebuild=on_rebuild, partition=partition, rum_endpoint=rum_endpoint)
+    print(f"已生成网页文件: {gd.DASHBOARD_HTML}（{time.perf_counter() - start:.2f}s）")
+    print("正在监视输入文件变化，按 Ctrl+C 退出")
+
+    state = snapshot(paths)
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot(paths)
+            if current == state:
+                continue
+            # 等待保存完成：指纹在 debounce 时间内不再变化才重建
+            while True:
+                time.sleep(debounce)
+                settled = snapshot(paths)
+                if settled == current:
+                    break
+                current = settled
+            state = current
+
+            start = time.perf_counter()
+            try:
+                new_html = rebuild(reader, html, on_rebuild, partition, rum_endpoint)
+            except Exception as exc:  # noqa: BLE001 - 保存过程中文件可能暂时不可读，等下一次变化
+                print(f"重建失败: {exc}")
+                continue
+            elapsed = time.perf_counter() - start
+            changed = "、".join(reader.reloaded) or "无内容变化"
+            status = "已更新" if new_html != html else "页面未变化"
+            print(f"[{time.strftime('%H:%M:%S')}] {status}（{elapsed:.2f}s）：{changed}")
+            html = new_html
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,189 @@
+"""截面因子回测：分组 / 多空组合净值、Rank IC 与换手率。
+
+输入为宽表面板（行=日期，列=股票）：因子面板与收益率面板。
+t 日的因子值与 t+1 日的收益率配对，组合按等权、每期再平衡计算。
+排序按日期向量化，日期按块处理，内存占用只与块大小有关。
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+BENCHMARK_COL = "基准"
+LONG_SHORT_COL = "多空"
+IC_COL = "IC"
+TURNOVER_COL = "换手率"
+# 面板文件支持的格式，按后缀选择读取方式
+PANEL_SUFFIXES = (".parquet", ".feather", ".pkl", ".csv")
+
+
+def read_panel(path):
+    """Read a wide date × stock panel; the date is the first column or the index."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        panel = pd.read_parquet(path)
+    elif path.suffix == ".feather":
+        panel = pd.read_feather(path)
+    elif path.suffix == ".pkl":
+        panel = pd.read_pickle(path)
+    else:
+        panel = pd.read_csv(path)
+    if not isinstance(panel.index, pd.DatetimeIndex):
+        panel = panel.set_index(panel.columns[0])
+        panel.index = pd.to_datetime(panel.index)
+    return panel.sort_index().astype(float)
+
+
+def _rank_pct(values):
+    """Row-wise percentile rank (ties averaged), NaN preserved."""
+    return pd.DataFrame(values).rank(axis=1, pct=True).to_numpy()
+
+
+def _row_corr(a, b):
+    """Row-wise Pearson correlation of two equally masked (D, S) arrays."""
+    n = np.sum(np.isfinite(a), axis=1)
+    am = a - np.nanmean(a, axis=1, keepdims=True)
+    bm = b - np.nanmean(b, axis=1, keepdims=True)
+    cov = np.nansum(am * bm, axis=1)
+    den = np.sqrt(np.nansum(am * am, axis=1) * np.nansum(bm * bm, axis=1))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = cov / den
+    corr[n < 3] = np.nan
+    return corr
+
+
+def factor_backtest(factor, returns, quantiles=5, direction=1, block_size=250):
+    """Backtest one factor panel against a returns panel.
+
+    ``factor`` is aligned onto ``returns`` (lower-frequency factors are
+    forward-filled). Group ``quantiles`` holds the highest factor values after
+    applying ``direction``. Returns a DataFrame indexed like ``returns`` with
+    one column per group (1..quantiles), 多空, 基准, IC and 换手率 (top group);
+    values on date t+1 come from factor values on date t, so the first row is
+    the formation date and is empty.
+    """
+    factor = factor.reindex(columns=returns.columns)
+    factor = factor.reindex(factor.index.union(returns.index)).ffill().reindex(returns.index)
+    f_all = factor.to_numpy(dtype=float) * direction
+    r_all = returns.to_numpy(dtype=float)
+    D = len(returns.index) - 1
+
+    group_rets = np.full((D, quantiles), np.nan)
+    bench = np.full(D, np.nan)
+    ic = np.full(D, np.nan)
+    turnover = np.full(D, np.nan)
+    prev_top = None
+
+    for lo in range(0, D, block_size):
+        hi = min(lo + block_size, D)
+        f = f_all[lo:hi]
+        r = r_all[lo + 1:hi + 1]
+        valid = np.isfinite(f) & np.isfinite(r)
+        f = np.where(valid, f, np.nan)
+        r = np.where(valid, r, np.nan)
+
+        f_rank = _rank_pct(f)
+        ic[lo:hi] = _row_corr(f_rank, _rank_pct(r))
+
+        groups = np.ceil(f_rank * quantiles)
+        r0 = np.where(valid, r, 0.0)
+        for q in range(quantiles):
+            member = groups == q + 1
+            count = member.sum(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                group_rets[lo:hi, q] = (r0 * member).sum(axis=1) / count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            bench[lo:hi] = r0.sum(axis=1) / valid.sum(axis=1)
+
+        # 换手率：头部组合中新调入股票的比例，跨块时衔接上一块的最后一期
+        top = groups == quantiles
+        first = prev_top[None, :] if prev_top is not None else np.zeros_like(top[:1])
+        prior = np.vstack([first, top[:-1]])
+        size = top.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            turnover[lo:hi] = 1.0 - (top & prior).sum(axis=1) / size
+        if prev_top is None:
+            turnover[lo] = np.nan
+        prev_top = top[-1]
+
+    out = pd.DataFrame(group_rets, index=returns.index[1:], columns=range(1, quantiles + 1))
+    out[LONG_SHORT_COL] = out[quantiles] - out[1]
+    out[BENCHMARK_COL] = bench
+    out[IC_COL] = ic
+    out[TURNOVER_COL] = turnover
+    return out.reindex(returns.index)
+
+
+def factor_nav_frame(result, name, mode="top", date_col="trade_dt"):
+    """Turn a backtest result into the 因子图 sheet layout: date, factor NAV, 基准 NAV.
+
+    ``mode`` is "top" (highest group) or "long_short" (highest minus lowest).
+    """
+    top = max(c for c in result.columns if isinstance(c, (int, np.integer)))
+    series = result[LONG_SHORT_COL] if mode == "long_short" else result[top]
+    # 建仓日收益为空，净值从 1 开始
+    rets = pd.DataFrame({name: series, BENCHMARK_COL: result[BENCHMARK_COL]}).fillna(0.0)
+    nav = (1.0 + rets).cumprod()
+    nav.index.name = date_col
+    return nav.reset_index()
+
+
+def factor_summary(result):
+    """Headline statistics shown in the chart info panel."""
+    ic = result[IC_COL].dropna()
+    ic_std = ic.std(ddof=1)
+    return {
+        "IC均值": ic.mean(),
+        "ICIR": ic.mean() / ic_std if ic_std else np.nan,
+        "IC胜率": (ic > 0).mean(),
+        "平均换手率": result[TURNOVER_COL].mean(),
+    }
+
+
+def find_factor_panels(panel_dir, returns_name):
+    """All panel files in ``panel_dir`` except the returns panel, keyed by factor name."""
+    panels = {}
+    for path in sorted(Path(panel_dir).iterdir()):
+        if path.suffix in PANEL_SUFFIXES and path.stem != returns_name:
+            panels.setdefault(path.stem, path)
+    return panels
+
+
+# 多因子并行时，收益率面板在每个子进程中只传一次
+_RETURNS = None
+
+
+def _init_worker(returns):
+    global _RETURNS
+    _RETURNS = returns
+
+
+def _run_panel(task):
+    name, path, settings = task
+    result = factor_backtest(
+        read_panel(path),
+        _RETURNS,
+        quantiles=settings.get("quantiles", 5),
+        direction=settings.get("direction", 1),
+        block_size=settings.get("block_size", 250),
+    )
+    nav = factor_nav_frame(result, name, mode=settings.get("mode", "top"))
+    return name, nav, factor_summary(result)
+
+
+def run_factor_panels(panels, returns, settings=None, processes=None):
+    """Backtest every ``{name: path}`` panel; yields ``(name, nav_frame, summary)``.
+
+    Panels are loaded inside the workers one at a time, so hundreds of
+    factors never sit in memory together.
+    """
+    settings = settings or {}
+    tasks = [(name, path, settings.get(name, {})) for name, path in panels.items()]
+    if processes == 1 or len(tasks) <= 1:
+        _init_worker(returns)
+        yield from map(_run_panel, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(returns,)) as pool:
+        yield from pool.map(_run_panel, tasks)
@@ -0,0 +1,196 @@
+"""逐笔成交 -> 主力净买入（日度、分股票与全市场）及累计序列。
+
+成交文件按块流式读取，每块只保留"日期×股票"的部分和，内存占用与输入
+文件大小无关。已封存的交易日及结果文件在该日的大小记录在状态文件中，
+再次运行时先把结果截回记录的大小，再只追加新的交易日；最新文件所在的
+交易日可能仍在写入，每次运行重新计算、不封存。主力阈值变化时自动全量重算。
+
+命令行用法::
+
+    python fund_flow.py            # 增量更新
+    python fund_flow.py --full     # 全量重算
+"""
+from pathlib import Path
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+DATE_COL = "日期"
+CODE_COL = "代码"
+AMOUNT_COL = "成交额"
+SIDE_COL = "方向"
+NET_COL = "主力净买入"
+DAILY_COL = "主力净买入(亿元)"
+CUM_COL = "主力累计净买入(亿元)"
+# 主动买/卖方向的取值，其余（如集合竞价、未知方向）不计入净买入
+BUY_SIDES = {"B", "BUY", "买", "买入", "1"}
+SELL_SIDES = {"S", "SELL", "卖", "卖出", "-1"}
+TRADE_SUFFIXES = (".csv", ".gz", ".zip", ".bz2", ".xz")
+YI = 1e8
+
+
+def _date_key(values):
+    """Normalize '2024-01-02 09:30:00' / '20240102…' strings to an int YYYYMMDD."""
+    text = values.astype(str).str.replace("-", "", regex=False).str.replace("/", "", regex=False)
+    return text.str[:8].astype(np.int64)
+
+
+def aggregate_chunk(chunk, threshold, after=None, universe=None):
+    """Signed main-force amount per (date, code) for one chunk of trades."""
+    amount = pd.to_numeric(chunk[AMOUNT_COL], errors="coerce").to_numpy(dtype=float)
+    side = chunk[SIDE_COL].astype(str).str.strip().str.upper()
+    sign = np.where(side.isin(BUY_SIDES), 1.0, np.where(side.isin(SELL_SIDES), -1.0, 0.0))
+    dates = _date_key(chunk[DATE_COL]).to_numpy()
+
+    keep = (amount >= threshold) & (sign != 0)
+    if after is not None:
+        keep &= dates > after
+    if universe is not None:
+        keep &= chunk[CODE_COL].isin(universe).to_numpy()
+    if not keep.any():
+        return None
+
+    part = pd.DataFrame(
+        {DATE_COL: dates[keep], CODE_COL: chunk[CODE_COL].to_numpy()[keep], NET_COL: (amount * sign)[keep]}
+    )
+    return part.groupby([DATE_COL, CODE_COL], sort=False)[NET_COL].sum()
+
+
+def aggregate_trade_file(path, threshold, after=None, universe=None, chunksize=1_000_000):
+    """Stream one trade file and return its (date, code) -> net amount Series."""
+    acc = None
+    reader = pd.read_csv(
+        path,
+        usecols=[DATE_COL, CODE_COL, AMOUNT_COL, SIDE_COL],
+        dtype={DATE_COL: str, CODE_COL: str, SIDE_COL: str},
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        part = aggregate_chunk(chunk, threshold, after=after, universe=universe)
+        if part is None:
+            continue
+        # 部分和立即合并，累积结果的规模只取决于"日期×股票"数
+        acc = part if acc is None else pd.concat([acc, part]).groupby(level=[0, 1], sort=False).sum()
+    return acc
+
+
+def _file_date(path):
+    """Trading date encoded in a file name such as 20240102.csv, else None."""
+    stem = path.name.split(".")[0]
+    return int(stem) if stem.isdigit() and len(stem) == 8 else None
+
+
+def _truncate(path, size):
+    """Cut ``path`` back to ``size`` bytes (a missing file counts as empty)."""
+    if path.exists():
+        with open(path, "r+b") as f:
+            f.truncate(size)
+
+
+def _append(frame, path):
+    frame.to_csv(path, mode="a", header=not path.exists() or path.stat().st_size == 0, index=False, encoding="utf-8")
+
+
+def update_flow(trade_dir, daily_path, total_path, state_path, threshold,
+                universe=None, full=False, chunksize=1_000_000):
+    """Append newly traded days to the per-stock and total net-buy files.
+
+    Only days before the newest trade file's date are sealed; the newest day may
+    still be written to and is recomputed on every run. The state file is the
+    source of truth: it records the last sealed day and the sizes of both
+    output files up to it, and each run first cuts the files back to those
+    sizes, so an interrupted run never double counts.
+
+    Returns the number of trading days written.
+    """
+    state = {}
+    if state_path.exists() and not full:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+        if state.get("threshold") != threshold or "sizes" not in state:
+            state = {}
+    last = state.get("last_date")
+    sizes = state.get("sizes", {})
+    for key, path in (("daily", daily_path), ("total", total_path)):
+        # 去掉未封存的最新一日，以及中断的运行写到一半的结果
+        _truncate(path, sizes.get(key, 0))
+
+    files = sorted(p for p in Path(trade_dir).iterdir() if p.name.endswith(TRADE_SUFFIXES))
+    parts = []
+    newest = None
+    for path in files:
+        file_date = _file_date(path)
+        if last is not None and file_date is not None and file_date <= last:
+            continue
+        if file_date is not None:
+            newest = max(newest or 0, file_date)
+        acc = aggregate_trade_file(path, threshold, after=last, universe=universe, chunksize=chunksize)
+        if acc is not None:
+            parts.append(acc)
+
+    sealed_to = last
+    days = 0
+    if parts:
+        acc = pd.concat(parts).groupby(level=[0, 1], sort=False).sum()
+        daily = acc.reset_index().sort_values([DATE_COL, CODE_COL])
+        totals = daily.groupby(DATE_COL)[NET_COL].sum().reset_index()
+        days = len(totals)
+        # 最新文件所在交易日可能仍在写入，不封存
+        open_from = newest if newest is not None else totals[DATE_COL].max()
+        for frame, path in ((daily, daily_path), (totals, total_path)):
+            _append(frame[frame[DATE_COL] < open_from], path)
+        sealed = totals.loc[totals[DATE_COL] < open_from, DATE_COL]
+        if len(sealed):
+            sealed_to = int(sealed.max())
+        sizes = {
+            key: path.stat().st_size if path.exists() else 0
+            for key, path in (("daily", daily_path), ("total", total_path))
+        }
+        for frame, path in ((daily, daily_path), (totals, total_path)):
+            _append(frame[frame[DATE_COL] >= open_from], path)
+
+    new_state = {"threshold": threshold, "last_date": sealed_to, "sizes": sizes}
+    if new_state != state:
+        tmp = state_path.with_name(state_path.name + ".tmp")
+        tmp.write_text(json.dumps(new_state, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, state_path)
+    return days
+
+
+def flow_series(total_path):
+    """Daily and cumulative main-force net buys (亿元) indexed by trading date."""
+    totals = pd.read_csv(total_path)
+    # 同一交易日可能跨多个文件写入，先按日合并
+    daily = totals.groupby(DATE_COL)[NET_COL].sum() / YI
+    out = pd.DataFrame({DAILY_COL: daily, CUM_COL: daily.cumsum()})
+    out.index = pd.to_datetime(out.index.astype(str), format="%Y%m%d")
+    return out
+
+
+def main(argv=None):
+    from generate_dashboard import (
+        FLOW_DAILY_PATH,
+        FLOW_MAIN_THRESHOLD,
+        FLOW_STATE_PATH,
+        FLOW_TOTAL_PATH,
+        FLOW_TRADE_DIR,
+    )
+
+    parser = argparse.ArgumentParser(description="主力净买入增量更新")
+    parser.add_argument("--full", action="store_true", help="忽略已有结果，全量重算")
+    parser.add_argument("--threshold", type=float, default=FLOW_MAIN_THRESHOLD, help="主力单笔成交额阈值（元）")
+    parser.add_argument("--chunksize", type=int, default=1_000_000, help="每块读取的成交笔数")
+    args = parser.parse_args(argv)
+
+    added = update_flow(
+        FLOW_TRADE_DIR, FLOW_DAILY_PATH, FLOW_TOTAL_PATH, FLOW_STATE_PATH,
+        args.threshold, full=args.full, chunksize=args.chunksize,
+    )
+    print(f"新增 {added} 个交易日，结果已写入: {FLOW_TOTAL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
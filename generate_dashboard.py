@@ -1,8 +1,37 @@
+from html import escape
 from pathlib import Path
+import argparse
 import json
 import base64
+import hashlib
+import os
+import shutil
+import time
 
-import pandas as pd
+from lazy_modules import lazy_import
+
+# pandas / numpy 在首次使用时才导入（各模块的 import 拿到的也是延迟模块），
+# 输入未变化的构建因此无需加载它们
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+# 回测模块带进程池依赖，只在对应输入存在时才用到
+asset_allocation = lazy_import("asset_allocation")
+factor_backtest = lazy_import("factor_backtest")
+
+from build_profile import enabled as profiling_enabled, profiling, span, traced
+from chart_preview import build_previews
+from column_store import sheet_frame, time_series_sheets, write_column_store
+from partition_store import PAGE_KEY as PARTITION_KEY, write_partitions
+from sector_pbroe import build_pbroe_views, STOCK_VIEW
+from numeric_codec import encode_page_numbers
+from input_readers import column_spec, pick_xlsx_engine, read_table, table_files
+from fund_flow import CUM_COL as FLOW_CUM_COL, flow_series, update_flow
+from nav_analytics import drawdown, excess_nav, rolling_vol_sharpe, summarize_nav
+from page_shell import (
+    NAV_ICONS, NAV_ITEM_HEIGHT, NAV_TITLE_HEIGHT, category_chunks_html, description_panels, nav_html,
+    nav_index, sections_html, sidebar_footer_html,
+)
+from search_index import build_search_index
 
 
 ROOT = Path(__file__).resolve().parent
@@ -10,105 +39,366 @@ EXCEL_PATH = ROOT / "作图数据整理.xlsx"
 PBROE_PATH = ROOT / "PB-ROE和资产组合净值.xlsx"
 FUND_PATH = ROOT / "公募主动权益基金规模和份额变化.xlsx"
 LOGO_PATH = ROOT / "logo.png"
+DASHBOARD_TITLE = "量化分析监控看板"
+DASHBOARD_SUBTITLE = "Quant Analysis Dashboard"
+# 个股一致预期（可选）：存在时由个股数据聚合板块 PB-ROE
+PBROE_STOCK_PATH = ROOT / "个股一致预期.xlsx"
+PBROE_STOCK_SHEET = "个股一致预期"
+# 需要聚合的行业分类层级（列名），文件中不存在的层级会被跳过
+PBROE_SECTOR_LEVELS = ["申万一级", "申万二级", "申万三级"]
+# 大类资产价格（可选）：存在时由回测引擎重建"资产配置净值"
+ALLOCATION_PRICE_PATH = ROOT / "大类资产价格.xlsx"
+ALLOCATION_PRICE_SHEET = "大类资产价格"
+# 参数扫描后发布的组合参数，覆盖下面的默认值
+ALLOCATION_PARAMS_PATH = ROOT / "资产配置参数.json"
+ALLOCATION_STRATEGIES = {
+    "低波组合": {"window": 120, "rebalance": "M", "target_vol": 0.03},
+    "中波组合": {"window": 120, "rebalance": "M", "target_vol": 0.06},
+    "资产风险平价": {"window": 120, "rebalance": "M"},
+}
+# 因子面板目录（可选）：每个因子一个宽表文件（行=日期，列=股票），另有收益率面板
+FACTOR_PANEL_DIR = ROOT / "因子面板"
+FACTOR_RETURNS_NAME = "收益率"
+# 单个因子的回测设置：quantiles / direction / mode("top" 或 "long_short") / description
+FACTOR_SETTINGS = {}
+# 因子回测的并行进程数，None 表示使用全部 CPU
+FACTOR_PROCESSES = None
+# 逐笔成交目录（可选）：存在时由成交数据增量计算"资金图1"的主力净买入
+FLOW_TRADE_DIR = ROOT / "逐笔成交"
+FLOW_DAILY_PATH = ROOT / "主力净买入_个股日度.csv"
+FLOW_TOTAL_PATH = ROOT / "主力净买入_日度汇总.csv"
+FLOW_STATE_PATH = ROOT / "主力净买入_状态.json"
+# 主力单笔成交额阈值（元）
+FLOW_MAIN_THRESHOLD = 1_000_000
+# 净值分析（滚动波动率 / 滚动夏普）的窗口长度（交易日）
+ANALYTICS_WINDOW = 60
+# 图表下方概览条的时间分桶数：每条线每桶只保留最小值和最大值
+OVERVIEW_BUCKETS = 240
+# 输入读取：xlsx 引擎（None 为自动选择已安装的最快引擎）；目录中与 sheet 同名的
+# parquet / feather / csv 文件优先于工作簿。折线图的 sheet 默认只读取日期列与图中
+# 用到的列（chart_columns），SHEET_COLUMNS 按 sheet 覆盖：列表、{列名: dtype}，
+# 或 None 读取全部列，见 input_readers.py
+XLSX_ENGINE = None
+INPUT_DIR = ROOT / "输入数据"
+SHEET_COLUMNS = {
+    # 逐笔成交接续主力累计列时保留工作簿中的其余列
+    "资金图1": None,
+}
 # 输出的主页面文件名（GitHub Pages 默认会使用 index.html 作为首页）
 DASHBOARD_HTML = ROOT / "dashboard.html"
 INDEX_HTML = ROOT / "index.html"
+# 时间序列列存（内存映射），供 --serve 模式按可见范围查询
+COLUMN_STORE_DIR = ROOT / "列存数据"
+# 时间序列分区发布目录（--partition 开启）；index.html 引用其中的文件，目录需随页面一同提交发布
+PARTITION_DIR = ROOT / "分区数据"
+# 流式写出页面数据时每批序列化的列表元素数，内存占用与数据总量无关
+STREAM_BATCH = 2048
+# 页面写出的缓冲区大小（字节）
+WRITE_BUFFER = 1 << 20
+# Linux 写时复制克隆文件的 ioctl（FICLONE）
+FICLONE = 0x40049409
+# 上次构建的输入、脚本与输出指纹；一致时一次性构建直接退出
+BUILD_STATE_PATH = ROOT / "构建指纹.json"
 
 
-def sheet_to_records(df):
-    """Convert DataFrame to plain Python records with JSON‑friendly values."""
+def json_cell(v):
+    """One cell as the page embeds it: dates and ISO datetime strings become ``YYYY-MM-DD``."""
+    # Convert timestamps / dates to string, only keep date part (YYYY-MM-DD)
+    if hasattr(v, "isoformat"):
+        # 如果是日期/时间类型，只返回日期部分，不包含时间
+        if hasattr(v, "date"):
+            # datetime 类型，只取日期部分
+            return v.date().isoformat()
+        else:
+            # date 类型，直接格式化
+            return v.isoformat()
+    
+    # 处理字符串格式的日期（包含时间部分的情况）
+    if isinstance(v, str):
+        # 如果字符串是 ISO 格式日期时间（如 "2016-01-04T00:00:00"），只保留日期部分
+        if "T" in v and len(v) > 10:
+            # 提取日期部分（YYYY-MM-DD）
+            date_part = v.split("T")[0]
+            # 验证是否是有效的日期格式
+            try:
+                from datetime import datetime
+                datetime.strptime(date_part, "%Y-%m-%d")
+                return date_part
+            except ValueError:
+                pass
+    
+    return v
 
-    def convert_value(v):
-        # Convert timestamps / dates to string, only keep date part (YYYY-MM-DD)
-        if hasattr(v, "isoformat"):
-            # 如果是日期/时间类型，只返回日期部分，不包含时间
-            if hasattr(v, "date"):
-                # datetime 类型，只取日期部分
-                return v.date().isoformat()
-            else:
-                # date 类型，直接格式化
-                return v.isoformat()
-        
-        # 处理字符串格式的日期（包含时间部分的情况）
-        if isinstance(v, str):
-            # 如果字符串是 ISO 格式日期时间（如 "2016-01-04T00:00:00"），只保留日期部分
-            if "T" in v and len(v) > 10:
-                # 提取日期部分（YYYY-MM-DD）
-                date_part = v.split("T")[0]
-                # 验证是否是有效的日期格式
-                try:
-                    from datetime import datetime
-                    datetime.strptime(date_part, "%Y-%m-%d")
-                    return date_part
-                except ValueError:
-                    pass
-        
-        return v
 
+def sheet_to_records(df):
+    """Convert DataFrame to plain Python records with JSON‑friendly values."""
     records = []
     for _, row in df.iterrows():
         rec = {}
         for k, v in row.items():
-            rec[str(k)] = convert_value(v)
+            rec[str(k)] = json_cell(v)
         records.append(rec)
     return records
 
 
-def build_data_and_config():
-    if not EXCEL_PATH.exists():
-        raise FileNotFoundError(f"未找到文件: {EXCEL_PATH}")
+def sheet_to_columns(df):
+    """Column-oriented variant of ``sheet_to_records``: one vectorized conversion per column."""
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            columns[str(col)] = series.dt.strftime("%Y-%m-%d").tolist()
+        elif pd.api.types.is_numeric_dtype(series):
+            columns[str(col)] = series.tolist()
+        else:
+            # 文本与混合类型列可能夹带日期对象或带时间的日期字符串，逐值转换
+            columns[str(col)] = [json_cell(v) for v in series.tolist()]
+    return columns
 
-    xls = pd.ExcelFile(EXCEL_PATH)
 
-    # 读取各个 sheet
-    sheets_needed = [
-        "风险图1-新高个股占比",
-        "资金图1",
-        "资金图2",
-        "因子图1",
-        "因子图2",
-    ]
+def encode_page_dates(data_by_sheet, chart_configs):
+    """Replace the date columns of time-series sheets with spans into one shared calendar.
 
-    data_by_sheet = {}
-    for name in sheets_needed:
-        if name not in xls.sheet_names:
+    Returns ``(page_data, calendar)``. Each encoded sheet is stored column-wise
+    and its x column becomes ``{"__dates__": [start, length, ...]}``: runs of
+    consecutive calendar positions.
+    """
+    columns_by_sheet = {}
+    for sheet, x_field in time_series_sheets(chart_configs).items():
+        data = data_by_sheet.get(sheet)
+        if isinstance(data, list) and data:
+            columns = {str(k): [rec.get(k) for rec in data] for k in data[0]}
+        elif isinstance(data, dict) and x_field in data:
+            columns = dict(data)
+        else:
             continue
-        df = pd.read_excel(EXCEL_PATH, sheet_name=name)
-        data_by_sheet[name] = sheet_to_records(df)
-    
-    # 读取PB-ROE数据
-    if PBROE_PATH.exists():
-        pb_roe_xls = pd.ExcelFile(PBROE_PATH)
-        if "PB-ROE" in pb_roe_xls.sheet_names:
-            pb_roe_df = pd.read_excel(PBROE_PATH, sheet_name="PB-ROE")
-            # 重命名列，使用Unnamed: 1作为名称
-            pb_roe_df = pb_roe_df.rename(columns={"Unnamed: 1": "名称"})
-            data_by_sheet["PB-ROE"] = sheet_to_records(pb_roe_df)
-        
-        # 读取资产配置净值数据
-        if "资产配置净值" in pb_roe_xls.sheet_names:
-            asset_df = pd.read_excel(PBROE_PATH, sheet_name="资产配置净值")
-            data_by_sheet["资产配置净值"] = sheet_to_records(asset_df)
-    
-    # 读取公募主动权益基金数据
-    if FUND_PATH.exists():
-        fund_xls = pd.ExcelFile(FUND_PATH)
-        # 读取"规模变化"和"份额变化"两个sheet
-        if "规模变化(单位 亿)" in fund_xls.sheet_names:
-            fund_df1 = pd.read_excel(FUND_PATH, sheet_name="规模变化(单位 亿)")
-            data_by_sheet["规模变化(单位 亿)"] = sheet_to_records(fund_df1)
-        if "份额变化(单位 亿)" in fund_xls.sheet_names:
-            fund_df2 = pd.read_excel(FUND_PATH, sheet_name="份额变化(单位 亿)")
-            data_by_sheet["份额变化(单位 亿)"] = sheet_to_records(fund_df2)
+        dates = columns.get(x_field)
+        # 只处理全部为 YYYY-MM-DD 的日期列
+        if dates and all(isinstance(d, str) and len(d) == 10 and d[4] == "-" for d in dates):
+            columns_by_sheet[sheet] = (x_field, columns)
+
+    calendar = sorted({d for x_field, columns in columns_by_sheet.values() for d in columns[x_field]})
+    position = {d: i for i, d in enumerate(calendar)}
+
+    page_data = dict(data_by_sheet)
+    for sheet, (x_field, columns) in columns_by_sheet.items():
+        spans = []
+        for d in columns[x_field]:
+            i = position[d]
+            if spans and spans[-2] + spans[-1] == i:
+                spans[-1] += 1
+            else:
+                spans += [i, 1]
+        columns[x_field] = {"__dates__": spans}
+        page_data[sheet] = columns
+    return page_data, calendar
+
+
+def overview_envelope(times, values, buckets=OVERVIEW_BUCKETS):
+    """Min/max of ``values`` over equal time slices, scaled to 0–100 (None for empty buckets)."""
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return None
+    t0, t1 = times[0], times[-1]
+    index = np.minimum(((times - t0) / max(t1 - t0, 1) * buckets).astype(np.int64), buckets - 1)
+    series = pd.Series(values[valid])
+    grouped = series.groupby(index[valid])
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    scale = 100 / (hi - lo) if hi > lo else 0
+
+    def scaled(agg):
+        out = [None] * buckets
+        for i, v in agg.items():
+            out[int(i)] = int(round((v - lo) * scale)) if scale else 50
+        return out
+
+    return {"min": scaled(grouped.min()), "max": scaled(grouped.max())}
+
+
+@traced("build_overviews")
+def build_overviews(data_by_sheet, chart_configs):
+    """``{chart id: {"start", "end", "lines": [envelope, ...]}}`` for every date-axis line chart."""
+    overviews = {}
+    frames = {}
+    for cfgs in chart_configs.values():
+        for cfg in cfgs:
+            data = data_by_sheet.get(cfg["sheet"])
+            if cfg.get("type") in ("scatter", "bar") or not data:
+                continue
+            # 分区发布的 sheet 在页面中只是索引，概览需由完整数据预先算好传入
+            if isinstance(data, dict) and PARTITION_KEY in data:
+                continue
+            df = frames.get(cfg["sheet"])
+            if df is None:
+                df = frames[cfg["sheet"]] = sheet_frame(data)
+            if cfg["x"] not in df.columns:
+                continue
+            x = pd.to_datetime(df[cfg["x"]], errors="coerce")
+            keep = x.notna().to_numpy()
+            if not keep.any():
+                continue
+            order = np.argsort(x[keep].to_numpy("datetime64[ms]").astype(np.int64), kind="stable")
+            times = x[keep].to_numpy("datetime64[ms]").astype(np.int64)[order].astype(np.float64)
+            lines = []
+            for line in cfg["lines"]:
+                if line["field"] not in df.columns:
+                    lines.append(None)
+                    continue
+                values = pd.to_numeric(df[line["field"]], errors="coerce").to_numpy(dtype=np.float64)[keep][order]
+                lines.append(overview_envelope(times, values))
+            overviews[cfg["id"]] = {"start": float(times[0]), "end": float(times[-1]), "lines": lines}
+    return overviews
+
+
+def path_fingerprint(path):
+    """Cheap change marker for a file or directory: (name, mtime_ns, size) entries."""
+    path = Path(path)
+    if path.is_dir():
+        return tuple(
+            (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+            for entry in sorted(os.scandir(path), key=lambda e: e.name)
+            # Excel 保存时产生的 ~$ 锁文件不影响内容
+            if entry.is_file() and not entry.name.startswith("~$")
+        )
+    if path.exists():
+        stat = path.stat()
+        return (path.name, stat.st_mtime_ns, stat.st_size)
+    return None
+
+
+def input_paths():
+    """Every input the build reads, plus the logo."""
+    return [
+        EXCEL_PATH,
+        PBROE_PATH,
+        FUND_PATH,
+        LOGO_PATH,
+        PBROE_STOCK_PATH,
+        ALLOCATION_PRICE_PATH,
+        ALLOCATION_PARAMS_PATH,
+        FACTOR_PANEL_DIR,
+        FLOW_TRADE_DIR,
+        INPUT_DIR,
+    ]
+
+
+def script_version():
+    """Content hash of the build scripts (every module next to this one, settings included)."""
+    digest = hashlib.sha1()
+    for path in sorted(ROOT.glob("*.py")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
 
+
+def build_fingerprint(partition=None, rum_endpoint=None):
+    """What a one-shot build depends on: inputs, scripts and the page options."""
+    fingerprint = {
+        "script": script_version(),
+        "options": {"partition": partition, "rum_endpoint": rum_endpoint},
+        "inputs": {str(path): path_fingerprint(path) for path in input_paths()},
+    }
+    # 与读回的 JSON 同构（元组变为列表），便于直接比较
+    return json.loads(json.dumps(fingerprint))
+
+
+def output_fingerprint(partition=None):
+    paths = [DASHBOARD_HTML, INDEX_HTML] + ([PARTITION_DIR] if partition else [])
+    return json.loads(json.dumps({str(path): path_fingerprint(path) for path in paths}))
+
+
+def build_is_current(fingerprint):
+    """True when the last build used the same inputs and its outputs are untouched since."""
+    try:
+        state = json.loads(BUILD_STATE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    return (
+        state.get("fingerprint") == fingerprint
+        and state.get("outputs") == output_fingerprint(fingerprint["options"]["partition"])
+    )
+
+
+def record_build(fingerprint):
+    """Remember ``fingerprint`` (taken before the build) together with the outputs just written."""
+    state = {"fingerprint": fingerprint, "outputs": output_fingerprint(fingerprint["options"]["partition"])}
+    BUILD_STATE_PATH.write_text(json.dumps(state, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+class WorkbookReader:
+    """Reads source sheets from the workbooks, or from same-named table files in ``input_dir``.
+
+    ``build_data_and_config`` goes through this interface so that long-running
+    modes (``--watch``) can substitute a reader that caches unchanged sheets.
+    ``engine`` picks the xlsx backend and ``columns`` restricts what is parsed
+    per sheet (see ``input_readers``); it defaults to the columns the standard
+    charts use (``chart_columns``) updated with ``SHEET_COLUMNS``.
+    """
+
+    def __init__(self, engine=None, input_dir=None, columns=None):
+        self.engine = pick_xlsx_engine(engine or XLSX_ENGINE)
+        self.input_dir = INPUT_DIR if input_dir is None else input_dir
+        if columns is None:
+            columns = {**chart_columns(default_chart_configs()), **SHEET_COLUMNS}
+        self.columns = columns
+
+    def source(self, sheet):
+        """Table file standing in for ``sheet``, or None to read it from its workbook."""
+        return table_files(self.input_dir).get(sheet)
+
+    def sheet_names(self, path):
+        names = list(pd.ExcelFile(path, engine=self.engine).sheet_names)
+        return names + [sheet for sheet in table_files(self.input_dir) if sheet not in names]
+
+    def read(self, path, sheet):
+        columns, dtypes = column_spec(self.columns.get(sheet))
+        source = self.source(sheet)
+        with span("read_table" if source else "read_excel", detail=sheet):
+            return read_table(source or path, sheet, self.engine, columns, dtypes)
+
+    def records(self, path, sheet, rename=None):
+        df = self.read(path, sheet)
+        if rename:
+            df = df.rename(columns=rename)
+        with span("sheet_to_records", detail=sheet):
+            return sheet_to_records(df)
+
+    def memo(self, key, fingerprint, compute):
+        """Result of a derived stage; caching readers reuse it while ``fingerprint`` holds."""
+        with span("derive", detail=key):
+            return compute()
+
+
+def chart_columns(chart_configs):
+    """``{sheet: {column: dtype}}`` read for the line charts: the x (date) column plus the fields of
+    every line and view line. Bar and scatter sheets are left out and read whole."""
+    columns = {}
+    for cfgs in chart_configs.values():
+        for cfg in cfgs:
+            if cfg.get("type") in ("scatter", "bar"):
+                continue
+            sheets = [(cfg["sheet"], cfg.get("lines", []))]
+            sheets += [(view["sheet"], view.get("lines", [])) for view in cfg.get("views", []) if view.get("sheet")]
+            for sheet, lines in sheets:
+                spec = columns.setdefault(sheet, {cfg["x"]: "datetime64[ns]"})
+                for line in lines:
+                    spec.setdefault(line["field"], None)
+    return columns
+
+
+def default_chart_configs():
+    """The standard charts by category; a fresh copy on every call, since builds extend it in place."""
     # 图表配置：说明每张图的 x 轴、y 轴字段及含义
-    chart_configs = {
+    return {
         "因子": [
             {
                 "id": "factor1",
                 "title": "外币资金占货币资金比",
                 "displayTitle": "外币资金占货币资金比因子 vs 基准",
                 "sheet": "因子图1",
+                "analytics": True,
+                # 净值序列平滑，能按定点小数无损表示时以差分内嵌
+                "encoding": "delta",
                 "x": "trade_dt",
                 "description": "• 外币资金占货币资金比因子：反映公司外币资金在货币资金中的占比情况，用于描述公司海外业务形成的资金结构特征\n• 基准：用于对比的基准线",
                 "lines": [
@@ -125,6 +415,9 @@ def build_data_and_config():
                 "title": "主要客户占比稳定性",
                 "displayTitle": "主要客户占比稳定性因子 vs 基准",
                 "sheet": "因子图2",
+                "analytics": True,
+                # 净值序列平滑，能按定点小数无损表示时以差分内嵌
+                "encoding": "delta",
                 "x": "trade_dt",
                 "description": "• 主要客户占比稳定性因子：衡量公司主要客户集中度的稳定性，反映公司客户结构的健康程度和业务风险\n• 基准：用于对比的基准线",
                 "lines": [
@@ -155,6 +448,7 @@ def build_data_and_config():
                         "name": "Wind全A收盘价（右轴）",
                         "field": "万得全A(右轴)",
                         "axis": "y2",
+                        "encoding": "delta",
                     },
                 ],
             },
@@ -185,6 +479,7 @@ def build_data_and_config():
                         "name": "Wind全A收盘价（右轴）",
                         "field": "wind全A收盘价(右)",
                         "axis": "y2",
+                        "encoding": "delta",
                     },
                 ],
             },
@@ -199,7 +494,7 @@ def build_data_and_config():
                 "description": "• 新高个股占比：反映市场创新高股票的比例，可用于判断市场情绪和趋势强度\n• 上证综指：上海证券交易所综合股价指数，显示在右轴",
                 "lines": [
                     {"name": "新高个股占比", "field": "占比", "axis": "y1"},
-                    {"name": "上证综指", "field": "上证综指(右)", "axis": "y2"},
+                    {"name": "上证综指", "field": "上证综指(右)", "axis": "y2", "encoding": "delta"},
                 ],
             },
             {
@@ -219,6 +514,9 @@ def build_data_and_config():
                 "title": "中低波组合净值",
                 "displayTitle": "中低波组合净值 vs 基准",
                 "sheet": "资产配置净值",
+                "analytics": True,
+                # 净值序列平滑，能按定点小数无损表示时以差分内嵌
+                "encoding": "delta",
                 "x": "date",
                 "description": "• 中波组合：中波动率组合的净值表现\n• 低波组合：低波动率组合的净值表现\n• 基准：资产风险平价基准，用于对比的基准线",
                 "lines": [
@@ -262,29 +560,415 @@ def build_data_and_config():
         ],
     }
 
+
+@traced("build_data_and_config")
+def build_data_and_config(reader=None):
+    if not EXCEL_PATH.exists():
+        raise FileNotFoundError(f"未找到文件: {EXCEL_PATH}")
+
+    reader = reader or WorkbookReader()
+    excel_sheets = reader.sheet_names(EXCEL_PATH)
+
+    # 读取各个 sheet
+    sheets_needed = [
+        "风险图1-新高个股占比",
+        "资金图1",
+        "资金图2",
+        "因子图1",
+        "因子图2",
+    ]
+
+    data_by_sheet = {}
+    fund1_df = None
+    for name in sheets_needed:
+        if name not in excel_sheets:
+            continue
+        if name == "资金图1" and FLOW_TRADE_DIR.is_dir():
+            # 主力累计列由逐笔成交接续，本 sheet 只解析一次，记录在下方生成
+            fund1_df = reader.read(EXCEL_PATH, name)
+            data_by_sheet[name] = None
+            continue
+        data_by_sheet[name] = reader.records(EXCEL_PATH, name)
+
+    # 由逐笔成交增量计算主力净买入，接续"资金图1"中的主力累计列
+    if FLOW_TRADE_DIR.is_dir():
+        update_flow(
+            FLOW_TRADE_DIR, FLOW_DAILY_PATH, FLOW_TOTAL_PATH, FLOW_STATE_PATH,
+            FLOW_MAIN_THRESHOLD,
+        )
+        if FLOW_TOTAL_PATH.exists():
+            data_by_sheet["资金图1"] = sheet_to_records(build_flow_sheet(fund1_df))
+        elif fund1_df is not None:
+            data_by_sheet["资金图1"] = sheet_to_records(fund1_df)
+    
+    # 读取PB-ROE数据
+    if PBROE_PATH.exists():
+        pb_roe_sheets = reader.sheet_names(PBROE_PATH)
+        if "PB-ROE" in pb_roe_sheets:
+            # 重命名列，使用Unnamed: 1作为名称
+            data_by_sheet["PB-ROE"] = reader.records(
+                PBROE_PATH, "PB-ROE", rename={"Unnamed: 1": "名称"}
+            )
+        
+        # 读取资产配置净值数据
+        if "资产配置净值" in pb_roe_sheets:
+            data_by_sheet["资产配置净值"] = reader.records(PBROE_PATH, "资产配置净值")
+
+    # 由大类资产价格回测重建资产配置净值（覆盖上游预先算好的净值）
+    if ALLOCATION_PRICE_PATH.exists():
+        strategies = asset_allocation.load_strategies(ALLOCATION_STRATEGIES, ALLOCATION_PARAMS_PATH)
+        data_by_sheet["资产配置净值"] = reader.memo(
+            "allocation",
+            (
+                path_fingerprint(ALLOCATION_PRICE_PATH),
+                json.dumps(strategies, ensure_ascii=False, sort_keys=True),
+            ),
+            lambda: sheet_to_records(
+                asset_allocation.build_allocation_frame(
+                    reader.read(ALLOCATION_PRICE_PATH, ALLOCATION_PRICE_SHEET), strategies
+                )
+            ),
+        )
+
+    # 由个股一致预期聚合各行业层级的 PB-ROE，并附带个股散点
+    pbroe_views = []
+    if PBROE_STOCK_PATH.exists():
+        views = reader.memo(
+            "pbroe_views",
+            path_fingerprint(PBROE_STOCK_PATH),
+            lambda: [
+                (label, sheet_to_records(view_df))
+                for label, view_df in build_pbroe_views(
+                    reader.read(PBROE_STOCK_PATH, PBROE_STOCK_SHEET), PBROE_SECTOR_LEVELS
+                ).items()
+            ],
+        )
+        for label, records in views:
+            sheet = f"PB-ROE-{label}"
+            data_by_sheet[sheet] = records
+            # 个股点数多，不显示文字标签，仅在悬停时显示名称
+            pbroe_views.append(
+                {"label": label, "sheet": sheet, "showText": label != STOCK_VIEW}
+            )
+    
+    # 读取公募主动权益基金数据
+    if FUND_PATH.exists():
+        fund_sheets = reader.sheet_names(FUND_PATH)
+        # 读取"规模变化"和"份额变化"两个sheet
+        if "规模变化(单位 亿)" in fund_sheets:
+            data_by_sheet["规模变化(单位 亿)"] = reader.records(FUND_PATH, "规模变化(单位 亿)")
+        if "份额变化(单位 亿)" in fund_sheets:
+            data_by_sheet["份额变化(单位 亿)"] = reader.records(FUND_PATH, "份额变化(单位 亿)")
+
+    chart_configs = default_chart_configs()
+
+    # 因子面板回测：与已有因子图同名的因子覆盖其数据，其余因子自动追加图表
+    if FACTOR_PANEL_DIR.is_dir():
+        add_factor_panel_charts(data_by_sheet, chart_configs["因子"], reader)
+
+    # 净值类图表附带回撤、滚动波动/夏普、超额收益视图和区间统计
+    with span("nav_analytics"):
+        add_nav_analytics(data_by_sheet, chart_configs)
+
+    # PB-ROE 图支持在板块/个股等粒度之间切换
+    if pbroe_views:
+        risk2 = next(c for c in chart_configs["风险"] if c["id"] == "risk2")
+        if "PB-ROE" in data_by_sheet:
+            pbroe_views.insert(0, {"label": "板块", "sheet": "PB-ROE", "showText": True})
+        else:
+            risk2["sheet"] = pbroe_views[0]["sheet"]
+        risk2["views"] = pbroe_views
+
     return data_by_sheet, chart_configs
 
 
-def build_html(data_by_sheet, chart_configs):
+def build_flow_sheet(base_df):
+    """Merge computed main-force flows with the 资金图1 sheet.
+
+    The workbook's columns are kept; its cumulative column is continued by the
+    computed flows from the first computed trading day on, starting from the
+    workbook's last cumulative level before that day.
+    """
+    flow = flow_series(FLOW_TOTAL_PATH)
+    if base_df is None:
+        out = flow
+    else:
+        base = base_df.set_index("Unnamed: 0")
+        if FLOW_CUM_COL in base.columns:
+            history = base.loc[pd.to_datetime(base.index) < flow.index[0], FLOW_CUM_COL]
+            seed = history.dropna()
+            # 累计值接在首个成交日之前工作簿的最后一个累计值之后
+            if len(seed):
+                flow[FLOW_CUM_COL] += seed.iloc[-1]
+            cum = flow[FLOW_CUM_COL].combine_first(history)
+            flow = flow.reindex(cum.index).assign(**{FLOW_CUM_COL: cum})
+            base = base.drop(columns=[FLOW_CUM_COL])
+        out = base.join(flow, how="outer")
+    out.index.name = "Unnamed: 0"
+    return out.reset_index()
+
+
+def add_nav_analytics(data_by_sheet, chart_configs):
+    """Attach drawdown / rolling vol & Sharpe / excess views to charts with ``analytics``.
+
+    Each chart is computed on its own date axis, its lines stacked into one
+    NAV matrix so every metric is a single vectorized call.
+    """
+    charts = [
+        cfg
+        for cfgs in chart_configs.values()
+        for cfg in cfgs
+        if cfg.get("analytics") and data_by_sheet.get(cfg["sheet"])
+    ]
+    for cfg in charts:
+        df = sheet_frame(data_by_sheet[cfg["sheet"]])
+        names = [line["name"] for line in cfg["lines"]]
+        values = np.column_stack([
+            pd.to_numeric(df[line["field"]], errors="coerce").to_numpy(dtype=float) for line in cfg["lines"]
+        ])
+        rows = ~np.isnan(values).all(axis=1)
+        values = values[rows]
+
+        metrics = {"回撤": drawdown(values) * 100}
+        vol, sharpe = rolling_vol_sharpe(values, ANALYTICS_WINDOW)
+        metrics["滚动波动"] = vol * 100
+        metrics["滚动夏普"] = sharpe
+        stats = summarize_nav(values)
+
+        out = {cfg["x"]: pd.to_datetime(df[cfg["x"]])[rows]}
+        # 百分比与夏普保留两位小数即可满足展示精度，控制内嵌数据体积
+        for metric, arr in metrics.items():
+            for col, name in enumerate(names):
+                out[f"{name}{metric}"] = arr[:, col].round(2)
+        views = [{"label": "净值"}]
+        sheet = f"{cfg['sheet']}-分析"
+        for metric, label, y_title in (
+            ("回撤", "回撤", "回撤(%)"),
+            ("滚动波动", "滚动波动", f"滚动{ANALYTICS_WINDOW}日年化波动(%)"),
+            ("滚动夏普", "滚动夏普", f"滚动{ANALYTICS_WINDOW}日夏普比率"),
+        ):
+            lines = [{"name": n, "field": f"{n}{metric}", "axis": "y1"} for n in names]
+            views.append({"label": label, "sheet": sheet, "lines": lines, "yTitle": y_title})
+
+        # 超额：各线条相对基准的净值比
+        if "基准" in names:
+            bench = names.index("基准")
+            excess = excess_nav(values, values[:, bench])
+            lines = []
+            for j, name in enumerate(names):
+                if j != bench:
+                    out[f"{name}超额"] = excess[:, j].round(4)
+                    lines.append({"name": name, "field": f"{name}超额", "axis": "y1"})
+            views.append({"label": "超额", "sheet": sheet, "lines": lines, "yTitle": "相对基准超额净值"})
+
+        data_by_sheet[sheet] = sheet_to_columns(pd.DataFrame(out))
+        cfg["views"] = views
+
+        summary_lines = [
+            f"{name}：年化收益 {stats['年化收益'][col]:.2%} · 年化波动 {stats['年化波动'][col]:.2%} · "
+            f"夏普 {stats['夏普比率'][col]:.2f} · 最大回撤 {stats['最大回撤'][col]:.2%}"
+            for col, name in enumerate(names)
+        ]
+        cfg["description"] = "\n".join([cfg.get("description", ""), *summary_lines])
+
+
+def factor_summary_text(summary):
+    """One-line IC / turnover summary appended to a factor chart description."""
+    return (
+        f"IC均值 {summary['IC均值']:.4f} · ICIR {summary['ICIR']:.2f} · "
+        f"IC胜率 {summary['IC胜率']:.1%} · 平均换手率 {summary['平均换手率']:.1%}"
+    )
+
+
+def add_factor_panel_charts(data_by_sheet, factor_configs, reader):
+    """Backtest every factor panel and publish it as a 因子 chart."""
+    returns_path = next(
+        (
+            p
+            for p in sorted(FACTOR_PANEL_DIR.iterdir())
+            if p.stem == FACTOR_RETURNS_NAME and p.suffix in factor_backtest.PANEL_SUFFIXES
+        ),
+        None,
+    )
+    if returns_path is None:
+        return
+
+    def run_panels():
+        returns = factor_backtest.read_panel(returns_path)
+        panels = factor_backtest.find_factor_panels(FACTOR_PANEL_DIR, FACTOR_RETURNS_NAME)
+        return [
+            (name, sheet_to_records(nav_df), summary)
+            for name, nav_df, summary in factor_backtest.run_factor_panels(
+                panels, returns, FACTOR_SETTINGS, processes=FACTOR_PROCESSES
+            )
+        ]
+
+    results = reader.memo(
+        "factor_panels",
+        (path_fingerprint(FACTOR_PANEL_DIR), json.dumps(FACTOR_SETTINGS, ensure_ascii=False, sort_keys=True)),
+        run_panels,
+    )
+    existing = {
+        line["field"]: cfg for cfg in factor_configs for line in cfg.get("lines", [])
+    }
+
+    for name, records, summary in results:
+        cfg = existing.get(name)
+        if cfg is None:
+            settings = FACTOR_SETTINGS.get(name, {})
+            cfg = {
+                "id": f"factor_{len(factor_configs) + 1}",
+                "title": name,
+                "displayTitle": f"{name}因子 vs 基准",
+                "sheet": f"因子-{name}",
+                "x": "trade_dt",
+                "xTitle": "日期",
+                "yTitle": "净值",
+                "normalize": True,
+                "analytics": True,
+                "description": settings.get(
+                    "description",
+                    f"• {name}因子：因子头部分组等权组合净值\n• 基准：全市场等权组合净值",
+                ),
+                "lines": [
+                    {"name": f"{name}因子", "field": name, "axis": "y1"},
+                    {"name": "基准", "field": "基准", "axis": "y1"},
+                ],
+            }
+            factor_configs.append(cfg)
+        data_by_sheet[cfg["sheet"]] = records
+        cfg["description"] = cfg["description"] + "\n" + factor_summary_text(summary)
+
+
+def json_chunks(value):
+    """``json.dumps(value, ensure_ascii=False)`` as a stream: long lists go out ``STREAM_BATCH`` items at a time."""
+    if isinstance(value, list) and len(value) > STREAM_BATCH:
+        yield "["
+        for start in range(0, len(value), STREAM_BATCH):
+            if start:
+                yield ", "
+            yield json.dumps(value[start:start + STREAM_BATCH], ensure_ascii=False)[1:-1]
+        yield "]"
+    elif isinstance(value, dict) and value and all(isinstance(k, str) for k in value):
+        yield "{"
+        for i, (key, item) in enumerate(value.items()):
+            yield f"{', ' if i else ''}{json.dumps(key, ensure_ascii=False)}: "
+            yield from json_chunks(item)
+        yield "}"
+    else:
+        yield json.dumps(value, ensure_ascii=False)
+
+
+def page_data_chunks(page_data):
+    """The embedded ``dataBySheet`` object, streamed; identical to ``page_payload``'s ``data_json``."""
+    return json_chunks(page_data)
+
+
+def build_hash(data_json, config_json):
+    """Short content hash identifying one build of the page data."""
+    return hashlib.sha1((data_json + config_json).encode("utf-8")).hexdigest()[:12]
+
+
+def encode_page(data_by_sheet, chart_configs):
+    """``(page_data, calendar)``: the sheet data as the page embeds it."""
+    # 各时间序列的日期列引用同一份交易日历
+    with span("encode_dates"):
+        page_data, calendar = encode_page_dates(data_by_sheet, chart_configs)
+    # 开启差分编码的平滑序列改为定点整数差分（无损）
+    with span("encode_numbers"):
+        page_data = encode_page_numbers(page_data, chart_configs)
+    return page_data, calendar
+
+
+def page_payload(data_by_sheet, chart_configs):
+    """JSON strings embedded in the page, plus the build hash identifying them."""
+    page_data, calendar = encode_page(data_by_sheet, chart_configs)
+    # 逐个 sheet 序列化再拼接（与整体 json.dumps 结果相同），以便分 sheet 计时
+    parts = []
+    for sheet, data in page_data.items():
+        with span("json_dumps", detail=sheet) as s:
+            text = json.dumps(data, ensure_ascii=False)
+            if profiling_enabled():
+                s.add_bytes(len(text.encode("utf-8")))
+        parts.append(f"{json.dumps(sheet, ensure_ascii=False)}: {text}")
+    data_json = "{" + ", ".join(parts) + "}"
+    with span("json_dumps", detail="chart_configs"):
+        config_json = json.dumps(chart_configs, ensure_ascii=False)
+    return data_json, config_json, json.dumps(calendar), build_hash(data_json, config_json)
+
+
+def telemetry_snippet(endpoint):
+    """Script tag enabling performance beacons to ``endpoint``; empty when no endpoint is set."""
+    if not endpoint:
+        return ""
+    return f"<script>enableTelemetry({json.dumps(endpoint)});</script>\n"
+
+
+def build_html(data_by_sheet, chart_configs, **options):
+    """The whole page as one string; see ``page_chunks`` for the options."""
+    return build_page(data_by_sheet, chart_configs, **options)[0]
+
+
+@traced("build_html")
+def build_page(data_by_sheet, chart_configs, **options):
+    """``(html, build)``: the whole page plus the build hash it embeds."""
+    chunks = page_chunks(data_by_sheet, chart_configs, **options)
+    parts = []
+    while True:
+        try:
+            parts.append(next(chunks))
+        except StopIteration as stop:
+            return "".join(parts), stop.value
+
+
+def page_chunks(
+    data_by_sheet, chart_configs, rum_endpoint=None, overviews=None, previews=None,
+    title=DASHBOARD_TITLE, subtitle=DASHBOARD_SUBTITLE, logo_path=None,
+):
+    """Render the page as a stream of text chunks, the sheet data serialized as it is written.
+
+    ``overviews`` (from ``build_overviews``) and ``previews`` (from ``build_previews``)
+    default to ones computed from ``data_by_sheet``. ``title``, ``subtitle`` and
+    ``logo_path`` (default ``LOGO_PATH``) brand the header. The generator returns
+    the build hash the page embeds.
+    """
     # 读取logo并转换为base64
     logo_base64 = ""
-    if LOGO_PATH.exists():
-        with open(LOGO_PATH, "rb") as f:
+    logo_path = Path(logo_path) if logo_path else LOGO_PATH
+    if logo_path.exists():
+        with open(logo_path, "rb") as f:
             logo_data = f.read()
             logo_base64 = base64.b64encode(logo_data).decode("utf-8")
     
-    # 嵌入到前端的 JSON 字符串
-    data_json = json.dumps(data_by_sheet, ensure_ascii=False)
-    config_json = json.dumps(chart_configs, ensure_ascii=False)
+    page_data, calendar = encode_page(data_by_sheet, chart_configs)
+    calendar_json = json.dumps(calendar)
+    if overviews is None:
+        overviews = build_overviews(data_by_sheet, chart_configs)
+    if previews is None:
+        previews = build_previews(data_by_sheet, chart_configs)
+    overview_json = json.dumps(overviews, ensure_ascii=False, separators=(",", ":"))
+    with span("prerender_shell"):
+        panels = description_panels(chart_configs)
+        nav_markup = nav_html(chart_configs)
+        sidebar_footer_markup = sidebar_footer_html()
+        sections_markup = sections_html(chart_configs, panels, previews)
+        # 首个板块的配置随页面加载，其余板块的配置与结构在首次显示时解析
+        chunks_markup = category_chunks_html(chart_configs, panels, previews)
+        first_category = next(iter(chart_configs.items()), None)
+        first_config_json = json.dumps(dict([first_category] if first_category else []), ensure_ascii=False)
+        nav_json = json.dumps(nav_index(chart_configs), ensure_ascii=False)
+        nav_icons_json = json.dumps(NAV_ICONS)
+    with span("search_index"):
+        search_json = json.dumps(build_search_index(chart_configs), ensure_ascii=False, separators=(",", ":"))
 
-    html = f"""<!DOCTYPE html>
+    yield f"""<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
   <meta charset="UTF-8" />
   <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=5.0, user-scalable=yes" />
-  <title>量化分析监控看板</title>
-  <script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script>
-  <script src="https://cdnjs.cloudflare.com/ajax/libs/xlsx/0.18.5/xlsx.full.min.js"></script>
+  <title>{escape(title)}</title>
+  <script src="https://cdn.plot.ly/plotly-2.35.2.min.js" defer></script>
+  <script src="https://cdnjs.cloudflare.com/ajax/libs/xlsx/0.18.5/xlsx.full.min.js" defer></script>
   <style>
     * {{
       box-sizing: border-box;
@@ -439,6 +1123,55 @@ def build_html(data_by_sheet, chart_configs):
       width: 100%;
       height: 100%;
     }}
+    /* 虚拟导航：行高固定，只渲染可见的行 */
+    .sidebar-content {{
+      position: relative;
+    }}
+    .nav-search {{
+      width: 100%;
+      padding: 6px 10px;
+      margin-bottom: 8px;
+      font-size: 14px;
+      color: #333333;
+      border: 1px solid #eaeaea;
+      border-radius: 4px;
+      outline: none;
+    }}
+    .nav-search:focus {{
+      border-color: #005bac;
+    }}
+    .nav-virtual {{
+      position: relative;
+    }}
+    .nav-window {{
+      position: absolute;
+      top: 0;
+      left: 0;
+      right: 0;
+      will-change: transform;
+    }}
+    .nav-virtual .nav-section-title,
+    .nav-virtual .nav-empty {{
+      height: {NAV_TITLE_HEIGHT}px;
+      margin: 0;
+      padding-top: 16px;
+      white-space: nowrap;
+      overflow: hidden;
+      text-overflow: ellipsis;
+    }}
+    .nav-virtual .nav-empty {{
+      font-size: 14px;
+      color: #999999;
+    }}
+    .nav-virtual .nav-item {{
+      height: {NAV_ITEM_HEIGHT}px;
+    }}
+    .nav-virtual .nav-item span {{
+      min-width: 0;
+      white-space: nowrap;
+      overflow: hidden;
+      text-overflow: ellipsis;
+    }}
     .sidebar-footer {{
       flex-shrink: 0;
       padding: 8px 16px;
@@ -579,16 +1312,32 @@ def build_html(data_by_sheet, chart_configs):
     .section-charts::-webkit-scrollbar-thumb:hover {{
       background: #b0b0b0;
     }}
-    /* 隐藏rangeslider中的折线图，只显示灰色控制条 */
-    .js-plotly-plot .rangeslider-container {{
-      height: 20px !important;
-      min-height: 20px !important;
+    /* 概览条：全时段缩略图，拖动选择主图的时间范围 */
+    .chart-overview {{
+      position: relative;
+      height: 28px;
+      margin: 6px 10px 0 10px;
+      background: #fafbfc;
+      border: 1px solid #ecf0f1;
+      border-radius: 3px;
+      cursor: crosshair;
+      user-select: none;
+      touch-action: none;
     }}
-    .js-plotly-plot .rangeslider-container svg {{
-      display: none !important;
+    .chart-overview canvas {{
+      display: block;
+      width: 100%;
+      height: 100%;
     }}
-    .js-plotly-plot .rangeslider-container .js-plotly-plot {{
-      display: none !important;
+    .chart-overview-window {{
+      position: absolute;
+      top: 0;
+      bottom: 0;
+      box-sizing: border-box;
+      background: rgba(0, 91, 172, 0.10);
+      border-left: 2px solid #005bac;
+      border-right: 2px solid #005bac;
+      cursor: grab;
     }}
     .chart-wrapper {{
       display: flex;
@@ -654,6 +1403,30 @@ def build_html(data_by_sheet, chart_configs):
       width: 100%;
       height: 100%;
     }}
+    .chart-view-switch {{
+      display: flex;
+      border: 1px solid #e9ecef;
+      border-radius: 4px;
+      overflow: hidden;
+      margin-right: 16px;
+    }}
+    .chart-view-option {{
+      padding: 2px 10px;
+      font-size: 13px;
+      color: #666666;
+      cursor: pointer;
+      transition: color 0.15s ease, background-color 0.15s ease;
+    }}
+    .chart-view-option + .chart-view-option {{
+      border-left: 1px solid #e9ecef;
+    }}
+    .chart-view-option:hover {{
+      color: #005bac;
+    }}
+    .chart-view-option.active {{
+      color: #ffffff;
+      background-color: #005bac;
+    }}
     .chart-info-panel {{
       display: none;
       background-color: #f8f9fa;
@@ -703,10 +1476,68 @@ def build_html(data_by_sheet, chart_configs):
       box-sizing: border-box;
     }}
     .chart {{
+      position: relative;
       width: 100%;
       height: 100%;
       min-width: 300px;
     }}
+    /* 构建时生成的静态预览，图表创建时移除 */
+    .chart-preview {{
+      position: absolute;
+      inset: 0;
+      pointer-events: none;
+      color: #666666;
+      font-size: 12px;
+    }}
+    .chart-preview-plot {{
+      position: absolute;
+    }}
+    .chart-preview-plot svg {{
+      display: block;
+      width: 100%;
+      height: 100%;
+    }}
+    .chart-preview-tick {{
+      position: absolute;
+      white-space: nowrap;
+    }}
+    .chart-preview-tick.y {{
+      right: 100%;
+      margin-right: 6px;
+      transform: translateY(-50%);
+    }}
+    .chart-preview-tick.y2 {{
+      left: 100%;
+      margin-left: 6px;
+      transform: translateY(-50%);
+    }}
+    .chart-preview-tick.x {{
+      top: 100%;
+      margin-top: 6px;
+      transform: translateX(-50%);
+    }}
+    .chart-preview-title {{
+      position: absolute;
+      font-size: 15px;
+      white-space: nowrap;
+    }}
+    .chart-preview-title.x {{
+      bottom: 30px;
+      left: 50%;
+      transform: translateX(-50%);
+    }}
+    .chart-preview-title.y {{
+      left: 12px;
+      top: 50%;
+      transform: translate(-50%, -50%) rotate(-90deg);
+      transform-origin: center;
+    }}
+    .chart-preview-title.y2 {{
+      right: 12px;
+      top: 50%;
+      transform: translate(50%, -50%) rotate(90deg);
+      transform-origin: center;
+    }}
     
     /* 响应式布局：窗口缩小时隐藏侧边栏 */
     @media (max-width: 900px) {{
@@ -815,6 +1646,36 @@ def build_html(data_by_sheet, chart_configs):
         display: none !important;
       }}
     }}
+    /* 性能浮层：URL 带 ?perf 时显示 */
+    .perf-overlay {{
+      position: fixed;
+      right: 12px;
+      bottom: 12px;
+      z-index: 10000;
+      max-height: 60vh;
+      overflow: auto;
+      padding: 8px 10px;
+      background: rgba(20, 24, 31, 0.92);
+      color: #e8edf3;
+      font: 11px/1.5 Menlo, Consolas, monospace;
+      border-radius: 6px;
+      box-shadow: 0 4px 16px rgba(0, 0, 0, 0.3);
+    }}
+    .perf-overlay table {{
+      border-collapse: collapse;
+    }}
+    .perf-overlay th, .perf-overlay td {{
+      padding: 1px 6px;
+      text-align: right;
+      white-space: nowrap;
+    }}
+    .perf-overlay th:first-child, .perf-overlay td:first-child,
+    .perf-overlay th:nth-child(2), .perf-overlay td:nth-child(2) {{
+      text-align: left;
+    }}
+    .perf-overlay .perf-over {{
+      color: #ff7b72;
+    }}
   </style>
 </head>
 <body>
@@ -822,36 +1683,707 @@ def build_html(data_by_sheet, chart_configs):
     <div class="header-left">
       <img src="data:image/png;base64,{logo_base64}" alt="NORTHEAST SECURITIES" class="header-logo">
       <div>
-        <div class="header-title-main">量化分析监控看板</div>
-        <div class="header-title-sub">Quant Analysis Dashboard</div>
+        <div class="header-title-main">{escape(title)}</div>
+        <div class="header-title-sub">{escape(subtitle)}</div>
       </div>
     </div>
   </div>
   <div class="layout">
   <div class="sidebar">
-    <div id="nav" class="sidebar-content"></div>
+    <div id="nav" class="sidebar-content">{nav_markup}</div>
+    {sidebar_footer_markup}
   </div>
   <div class="main">
-    <div class="sections-container" id="sections-container"></div>
+    <div class="sections-container" id="sections-container">{sections_markup}</div>
   </div>
   </div>
+{chunks_markup}
+
+  <script>
+    // 页面外壳的交互：导航、检索、板块切换与说明面板不依赖数据和图表脚本，
+    // 其余操作由图表脚本加载后注册到 shellActions
+    const shellActions = {{}};
+    // 已加载板块的图表配置；首个板块随页面加载，其余板块首次显示时从 category-chunk 解析
+    const chartConfigs = {first_config_json};
+    const navIndex = {nav_json};
+    const navIcons = {nav_icons_json};
+    // 标题与说明的倒排索引：词 -> 图表序号（按导航顺序）
+    const searchIndex = {search_json};
+    const NAV_ITEM_HEIGHT = {NAV_ITEM_HEIGHT};
+    const NAV_TITLE_HEIGHT = {NAV_TITLE_HEIGHT};
+    const NAV_OVERSCAN = 10;
+    const navState = {{ rows: [], offsets: [0], first: -1, last: -1, active: null, keys: null }};
+
+    function escapeHtml(text) {{
+      return String(text).replace(/[&<>"]/g, c => ({{ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;' }})[c]);
+    }}
+
+    function ensureCategory(category) {{
+      if (chartConfigs[category]) return chartConfigs[category];
+      const index = navIndex.findIndex(entry => entry[0] === category);
+      const chunk = index >= 0 ? document.getElementById(`category-chunk-${{index}}`) : null;
+      if (!chunk) return null;
+      const {{ configs, html }} = JSON.parse(chunk.textContent);
+      chunk.remove();
+      document.getElementById('sections-container').insertAdjacentHTML('beforeend', html);
+      chartConfigs[category] = configs;
+      if (shellActions.categoryLoaded) shellActions.categoryLoaded(category, configs);
+      return configs;
+    }}
+
+    function loadAllCategories() {{
+      navIndex.forEach(entry => ensureCategory(entry[0]));
+    }}
+
+    // 检索：与构建时相同的切分规则，汉字按相邻二字、字母数字按前缀匹配，各词命中取交集
+    const SEARCH_RUN = /[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[0-9a-z]+/g;
+
+    function queryTerms(query) {{
+      const terms = [];
+      (query.normalize('NFKC').toLowerCase().match(SEARCH_RUN) || []).forEach(run => {{
+        if (/^[0-9a-z]/.test(run)) {{
+          terms.push({{ term: run, prefix: true }});
+        }} else if (run.length === 1) {{
+          terms.push({{ term: run }});
+        }} else {{
+          for (let i = 0; i < run.length - 1; i++) terms.push({{ term: run.slice(i, i + 2) }});
+        }}
+      }});
+      return terms;
+    }}
+
+    function searchCharts(query) {{
+      const terms = queryTerms(query);
+      if (terms.length === 0) return null;
+      let hits = null;
+      for (const {{ term, prefix }} of terms) {{
+        const found = new Set();
+        if (prefix) {{
+          navState.keys = navState.keys || Object.keys(searchIndex);
+          navState.keys.forEach(key => {{
+            if (key.startsWith(term)) searchIndex[key].forEach(doc => found.add(doc));
+          }});
+        }} else {{
+          (searchIndex[term] || []).forEach(doc => found.add(doc));
+        }}
+        hits = hits === null ? found : new Set([...hits].filter(doc => found.has(doc)));
+        if (hits.size === 0) break;
+      }}
+      return hits;
+    }}
+
+    // 虚拟导航：行高固定，只渲染可见范围内的行，图表数量增加时 DOM 规模不变
+    function navRows(docs) {{
+      const rows = [];
+      let doc = 0;
+      navIndex.forEach(([category, charts]) => {{
+        let titled = false;
+        charts.forEach(([id, title, type], idx) => {{
+          if (!docs || docs.has(doc)) {{
+            if (!titled) {{
+              rows.push({{ category }});
+              titled = true;
+            }}
+            rows.push({{ category, idx, id, title, type }});
+          }}
+          doc++;
+        }});
+      }});
+      if (rows.length === 0) rows.push({{ empty: true }});
+      return rows;
+    }}
+
+    function navRowHtml(row) {{
+      if (row.empty) return '<div class="nav-empty">无匹配图表</div>';
+      const category = escapeHtml(row.category);
+      if (row.id === undefined) return `<div class="nav-section-title">${{category}}</div>`;
+      return `<div class="nav-item${{row.id === navState.active ? ' active' : ''}}" data-action="nav" ` +
+        `data-category="${{category}}" data-index="${{row.idx}}" data-chart-id="${{escapeHtml(row.id)}}">` +
+        `<div class="nav-icon">${{navIcons[row.type] || navIcons.line}}</div><span>${{escapeHtml(row.title)}}</span></div>`;
+    }}
+
+    function setNavRows(rows) {{
+      navState.rows = rows;
+      navState.offsets = [0];
+      rows.forEach(row => {{
+        const height = row.id === undefined ? NAV_TITLE_HEIGHT : NAV_ITEM_HEIGHT;
+        navState.offsets.push(navState.offsets[navState.offsets.length - 1] + height);
+      }});
+      document.querySelector('#nav .nav-virtual').style.height = `${{navState.offsets[rows.length]}}px`;
+      renderNav(true);
+    }}
+
+    function renderNav(force) {{
+      const nav = document.getElementById('nav');
+      const list = nav.querySelector('.nav-virtual');
+      const offsets = navState.offsets;
+      const top = nav.scrollTop - list.offsetTop;
+      const bottom = top + (nav.clientHeight || window.innerHeight);
+      // 二分查找第一行可见行
+      let lo = 0, hi = navState.rows.length;
+      while (lo < hi) {{
+        const mid = (lo + hi) >> 1;
+        if (offsets[mid + 1] <= top) lo = mid + 1; else hi = mid;
+      }}
+      let last = lo;
+      while (last < navState.rows.length && offsets[last] < bottom) last++;
+      const first = Math.max(0, lo - NAV_OVERSCAN);
+      last = Math.min(navState.rows.length, last + NAV_OVERSCAN);
+      if (!force && first === navState.first && last === navState.last) return;
+      navState.first = first;
+      navState.last = last;
+      const windowEl = list.firstElementChild;
+      windowEl.style.transform = `translateY(${{offsets[first]}}px)`;
+      windowEl.innerHTML = navState.rows.slice(first, last).map(navRowHtml).join('');
+    }}
+
+    function showSection(category, chartId) {{
+      navState.active = chartId;
+      document.querySelectorAll('.nav-item').forEach(el => {{
+        el.classList.toggle('active', el.dataset.chartId === chartId);
+      }});
+      ensureCategory(category);
+      document.querySelectorAll('.section').forEach(section => {{
+        section.classList.remove('active');
+      }});
+      const targetSection = document.getElementById(`section-${{category}}`);
+      if (!targetSection) return;
+      targetSection.classList.add('active');
+      if (shellActions.sectionShown) shellActions.sectionShown(category);
+
+      // 找到目标图表元素并滚动到它
+      setTimeout(() => {{
+        const targetChart = document.getElementById(`chart-${{chartId}}`);
+        const sectionCharts = targetSection.querySelector('.section-charts');
+        if (targetChart && sectionCharts) {{
+          const containerRect = sectionCharts.getBoundingClientRect();
+          const chartRect = targetChart.getBoundingClientRect();
+          const targetScrollTop = sectionCharts.scrollTop + chartRect.top - containerRect.top - 20;
+          sectionCharts.scrollTo({{
+            top: targetScrollTop,
+            behavior: 'smooth'
+          }});
+        }}
+      }}, 50);
+    }}
+
+    document.addEventListener('click', event => {{
+      const el = event.target.closest('[data-action]');
+      if (!el) return;
+      const action = el.dataset.action;
+      if (action === 'nav') {{
+        showSection(el.dataset.category, el.dataset.chartId);
+      }} else if (action === 'info') {{
+        const panel = document.getElementById(`chart-info-panel-${{el.dataset.chartId}}`);
+        if (panel) panel.classList.toggle('active');
+      }} else if (shellActions[action]) {{
+        event.preventDefault();
+        event.stopPropagation();
+        shellActions[action](el);
+      }}
+    }});
+
+    navState.active = navIndex.length && navIndex[0][1].length ? navIndex[0][1][0][0] : null;
+    setNavRows(navRows(null));
+    document.getElementById('nav').addEventListener('scroll', () => renderNav(false), {{ passive: true }});
+    window.addEventListener('resize', () => renderNav(false));
+    document.getElementById('nav-search').addEventListener('input', event => {{
+      setNavRows(navRows(searchCharts(event.target.value)));
+    }});
+  </script>
+
+  <script>
+    const dataBySheet = """
+
+    # 数据逐个 sheet、逐批写出，同时累计构建哈希与字节数，不生成完整的 JSON 字符串
+    digest = hashlib.sha1()
+    data_bytes = 0
+    for chunk in page_data_chunks(page_data):
+        encoded = chunk.encode("utf-8")
+        digest.update(encoded)
+        data_bytes += len(encoded)
+        yield chunk
+    digest.update(json.dumps(chart_configs, ensure_ascii=False).encode("utf-8"))
+    page_hash = digest.hexdigest()[:12]
+
+    yield f""";
+    // 各时间序列共用的交易日历：日期字符串只内嵌一次，时间戳只解析一次
+    const dateCalendar = {calendar_json};
+    const calendarTimes = new Float64Array(dateCalendar.length);
+    dateCalendar.forEach((d, i) => {{
+      calendarTimes[i] = Date.parse(d);
+    }});
+    // 当前数据版本，实时推送更新后随之变化
+    let currentBuild = '{page_hash}';
+    // 记录每个图是否已经创建，避免重复创建以及在隐藏状态下创建导致尺寸异常
+    const chartInstances = {{}};
+
+    // 页面性能埋点：数据解码、图表规格构建、绘制、resize 与归一化都以
+    // performance.mark/measure 记录（名称为 dashboard:阶段:图表），可在 DevTools
+    // 的 Performance 面板中查看，也可通过 window.__dashboardPerf 读取
+    const perfBudgets = {{ decode: 50, spec: 50, plot: 300, resize: 100, normalize: 50, sections: 100 }};
+    const perfChartBudgets = {{}};
+    const perfState = {{ entries: [], longTasks: [], seq: 0, warned: {{}}, firstPlot: null, overlay: null, redraw: null }};
+    const PERF_MAX_ENTRIES = 2000;
+
+    function perfBudget(name, chartId) {{
+      const own = chartId && perfChartBudgets[chartId];
+      return own && own[name] !== undefined ? own[name] : perfBudgets[name];
+    }}
+
+    function perfStart(name, chartId) {{
+      const mark = `dashboard:${{name}}:${{chartId || ''}}#${{perfState.seq++}}`;
+      try {{
+        performance.mark(mark);
+      }} catch (e) {{}}
+      return {{ name: name, chart: chartId || '', mark: mark, start: performance.now() }};
+    }}
+
+    // 结束一个 span；传入 Promise 时在其完成后结束（Plotly 的绘制与 resize 是异步的）
+    function perfEnd(token, pending) {{
+      if (pending && typeof pending.then === 'function') {{
+        pending.then(() => perfEnd(token), () => perfEnd(token));
+        return pending;
+      }}
+      const duration = performance.now() - token.start;
+      try {{
+        performance.measure(`dashboard:${{token.name}}:${{token.chart}}`, token.mark);
+        performance.clearMarks(token.mark);
+      }} catch (e) {{}}
+      const budget = perfBudget(token.name, token.chart);
+      const entry = {{
+        name: token.name,
+        chart: token.chart,
+        start: token.start,
+        duration: duration,
+        overBudget: budget !== undefined && duration > budget
+      }};
+      perfState.entries.push(entry);
+      if (perfState.entries.length > PERF_MAX_ENTRIES) perfState.entries.shift();
+      queueTelemetry(entry);
+      if (entry.overBudget) {{
+        const key = `${{token.name}}:${{token.chart}}`;
+        if (!perfState.warned[key]) {{
+          perfState.warned[key] = true;
+          console.warn(`[性能] ${{key}} 耗时 ${{duration.toFixed(1)}}ms，超出预算 ${{budget}}ms`);
+        }}
+      }}
+      if (token.name === 'plot' && perfState.firstPlot === null) {{
+        // 首个图表绘制完成的时间（相对页面导航开始）
+        perfState.firstPlot = performance.now();
+        try {{
+          performance.measure('dashboard:first-plot', {{ start: 0, end: perfState.firstPlot }});
+        }} catch (e) {{}}
+      }}
+      schedulePerfOverlay();
+      return pending;
+    }}
+
+    function perfSpan(name, chartId, fn) {{
+      const token = perfStart(name, chartId);
+      let result;
+      try {{
+        result = fn();
+      }} catch (e) {{
+        perfEnd(token);
+        throw e;
+      }}
+      return perfEnd(token, result) || result;
+    }}
+
+    function percentile(sorted, p) {{
+      if (sorted.length === 0) return NaN;
+      const i = Math.min(sorted.length - 1, Math.max(0, Math.ceil(p / 100 * sorted.length) - 1));
+      return sorted[i];
+    }}
+
+    // 按 (阶段, 图表) 汇总：次数、p50/p95/最大值与预算
+    function perfSummary() {{
+      const groups = {{}};
+      perfState.entries.forEach(e => {{
+        const key = `${{e.name}}:${{e.chart}}`;
+        (groups[key] = groups[key] || {{ name: e.name, chart: e.chart, durations: [] }}).durations.push(e.duration);
+      }});
+      return Object.values(groups).map(g => {{
+        const sorted = g.durations.slice().sort((a, b) => a - b);
+        const budget = perfBudget(g.name, g.chart);
+        const p95 = percentile(sorted, 95);
+        return {{
+          name: g.name,
+          chart: g.chart,
+          count: sorted.length,
+          p50: percentile(sorted, 50),
+          p95: p95,
+          max: sorted[sorted.length - 1],
+          budget: budget,
+          overBudget: budget !== undefined && p95 > budget
+        }};
+      }});
+    }}
+
+    function renderPerfOverlay() {{
+      perfState.redraw = null;
+      const overlay = perfState.overlay;
+      if (!overlay) return;
+      const fmt = v => (isNaN(v) ? '-' : v.toFixed(1));
+      const rows = perfSummary().map(r => `<tr class="${{r.overBudget ? 'perf-over' : ''}}">` +
+        `<td>${{r.name}}</td><td>${{r.chart}}</td><td>${{r.count}}</td><td>${{fmt(r.p50)}}</td>` +
+        `<td>${{fmt(r.p95)}}</td><td>${{fmt(r.max)}}</td><td>${{r.budget !== undefined ? r.budget : '-'}}</td></tr>`).join('');
+      const longTotal = perfState.longTasks.reduce((sum, t) => sum + t.duration, 0);
+      overlay.innerHTML =
+        `<div>首图 ${{perfState.firstPlot === null ? '-' : fmt(perfState.firstPlot)}}ms · ` +
+        `长任务 ${{perfState.longTasks.length}} 个 / ${{fmt(longTotal)}}ms</div>` +
+        '<table><tr><th>阶段</th><th>图表</th><th>次数</th><th>p50</th><th>p95</th><th>最大</th><th>预算</th></tr>' +
+        rows + '</table>';
+    }}
+
+    function schedulePerfOverlay() {{
+      if (perfState.overlay && !perfState.redraw) {{
+        perfState.redraw = setTimeout(renderPerfOverlay, 250);
+      }}
+    }}
+
+    function showPerfOverlay() {{
+      if (!perfState.overlay) {{
+        perfState.overlay = document.createElement('div');
+        perfState.overlay.className = 'perf-overlay';
+        document.body.appendChild(perfState.overlay);
+      }}
+      perfState.overlay.style.display = '';
+      renderPerfOverlay();
+    }}
+
+    function hidePerfOverlay() {{
+      if (perfState.overlay) perfState.overlay.style.display = 'none';
+    }}
+
+    // 长任务（主线程连续占用超过 50ms）检测
+    if (typeof PerformanceObserver !== 'undefined' &&
+        (PerformanceObserver.supportedEntryTypes || []).includes('longtask')) {{
+      new PerformanceObserver(list => {{
+        list.getEntries().forEach(t => {{
+          perfState.longTasks.push({{ start: t.startTime, duration: t.duration }});
+          if (telemetry.url) telemetry.longTasks.push([currentBuild, Math.round(t.startTime), Math.round(t.duration)]);
+        }});
+        if (perfState.longTasks.length > PERF_MAX_ENTRIES) {{
+          perfState.longTasks.splice(0, perfState.longTasks.length - PERF_MAX_ENTRIES);
+        }}
+        schedulePerfOverlay();
+      }}).observe({{ type: 'longtask', buffered: true }});
+    }}
+
+    // 真实用户性能数据：计时按批经 navigator.sendBeacon 发往采集端（enableTelemetry 开启），
+    // 页面隐藏/关闭时以及每 30 秒发送一次；每条记录带数据版本，便于按版本对比
+    const pageDataBytes = {data_bytes};
+    const TELEMETRY_BATCH = 400;
+    const telemetry = {{
+      url: null,
+      session: Math.random().toString(36).slice(2, 10),
+      queue: [],
+      longTasks: [],
+      meta: false
+    }};
+
+    function queueTelemetry(entry) {{
+      if (telemetry.url) {{
+        telemetry.queue.push([currentBuild, entry.name, entry.chart, Math.round(entry.duration * 10) / 10]);
+      }}
+    }}
+
+    function telemetryContext() {{
+      const nav = (performance.getEntriesByType ? performance.getEntriesByType('navigation') : [])[0] || {{}};
+      const connection = navigator.connection || {{}};
+      return {{
+        page: window.location.pathname,
+        device: {{
+          memory: navigator.deviceMemory || null,
+          cores: navigator.hardwareConcurrency || null,
+          connection: connection.effectiveType || null,
+          viewport: [window.innerWidth, window.innerHeight],
+          ua: navigator.userAgent
+        }},
+        payload: {{
+          data: pageDataBytes,
+          html: nav.decodedBodySize || null,
+          transfer: nav.transferSize || null
+        }},
+        firstPlot: perfState.firstPlot
+      }};
+    }}
+
+    function flushTelemetry() {{
+      if (!telemetry.url || !navigator.sendBeacon) return;
+      if (telemetry.queue.length === 0 && telemetry.longTasks.length === 0) return;
+      // 实时更新后数据版本会变化：每个版本单独成批
+      const builds = new Set(telemetry.queue.map(e => e[0]).concat(telemetry.longTasks.map(t => t[0])));
+      builds.forEach(build => {{
+        const entries = telemetry.queue.filter(e => e[0] === build).map(e => e.slice(1));
+        const longTasks = telemetry.longTasks.filter(t => t[0] === build).map(t => t.slice(1));
+        // sendBeacon 单次负载有上限（约 64KB），条目多时分批
+        for (let i = 0; i === 0 || i < entries.length; i += TELEMETRY_BATCH) {{
+          const beacon = {{
+            v: 1,
+            build: build,
+            session: telemetry.session,
+            time: Date.now(),
+            entries: entries.slice(i, i + TELEMETRY_BATCH),
+            longTasks: i === 0 ? longTasks : []
+          }};
+          // 页面与设备信息每个会话只发送一次
+          if (!telemetry.meta) {{
+            Object.assign(beacon, telemetryContext());
+            telemetry.meta = true;
+          }}
+          // text/plain 不触发跨域预检
+          navigator.sendBeacon(telemetry.url, new Blob([JSON.stringify(beacon)], {{ type: 'text/plain;charset=UTF-8' }}));
+        }}
+      }});
+      telemetry.queue = [];
+      telemetry.longTasks = [];
+    }}
+
+    function enableTelemetry(url) {{
+      if (telemetry.url || !navigator.sendBeacon) return;
+      telemetry.url = url;
+      // 开启前已记录的计时一并发送
+      perfState.entries.forEach(queueTelemetry);
+      perfState.longTasks.forEach(t => telemetry.longTasks.push([currentBuild, Math.round(t.start), Math.round(t.duration)]));
+      document.addEventListener('visibilitychange', () => {{
+        if (document.visibilityState === 'hidden') flushTelemetry();
+      }});
+      window.addEventListener('pagehide', flushTelemetry);
+      setInterval(flushTelemetry, 30000);
+    }}
+
+    window.__dashboardPerf = {{
+      entries: filter => perfState.entries.filter(e =>
+        !filter || ((!filter.name || e.name === filter.name) && (!filter.chart || e.chart === filter.chart))),
+      summary: perfSummary,
+      longTasks: () => perfState.longTasks.slice(),
+      firstPlot: () => perfState.firstPlot,
+      budgets: perfBudgets,
+      // 设置预算（毫秒）；指定 chartId 时只作用于该图表
+      setBudget(name, ms, chartId) {{
+        if (chartId) {{
+          (perfChartBudgets[chartId] = perfChartBudgets[chartId] || {{}})[name] = ms;
+        }} else {{
+          perfBudgets[name] = ms;
+        }}
+        perfState.warned = {{}};
+        schedulePerfOverlay();
+      }},
+      // 超出预算的 (阶段, 图表)，按 p95 判断
+      violations: () => perfSummary().filter(r => r.overBudget),
+      clear() {{
+        perfState.entries = [];
+        perfState.longTasks = [];
+        perfState.warned = {{}};
+        schedulePerfOverlay();
+      }},
+      showOverlay: showPerfOverlay,
+      hideOverlay: hidePerfOverlay,
+      flush: flushTelemetry
+    }};
+
+    // 定点差分列 [小数位, 首值, 差分, ...]：逐项累加整数后除以 10 的幂，
+    // 与编码前的浮点数逐位相同；null 为缺失值，不参与累加
+    function decodeDeltaColumn(encoded) {{
+      const scale = Math.pow(10, encoded[0]);
+      const out = new Float64Array(encoded.length - 1);
+      let acc = 0;
+      for (let i = 1; i < encoded.length; i++) {{
+        const d = encoded[i];
+        if (d === null) {{
+          out[i - 1] = NaN;
+        }} else {{
+          acc += d;
+          out[i - 1] = acc / scale;
+        }}
+      }}
+      return out;
+    }}
+
+    // 页面内的列存：每个 sheet 的每列只保留一份，数值列为 Float64Array（缺失为 NaN），
+    // 日期列与共享日历共用字符串和时间戳；图表、归一化与导出都直接读取这些列
+    function buildColumnStore(data) {{
+      const names = Array.isArray(data) ? Object.keys(data[0] || {{}}) : Object.keys(data);
+      const store = {{ __store__: true, names: names, columns: {{}}, times: {{}}, length: 0 }};
+      names.forEach(name => {{
+        const raw = (Array.isArray(data) ? data.map(r => r[name]) : data[name]) || [];
+        if (raw && raw.__dates__) {{
+          const spans = raw.__dates__;
+          const index = resolveDateSpans(spans);
+          store.columns[name] = Array.from(index, i => dateCalendar[i]);
+          // 连续区间直接取日历时间戳的视图，不复制
+          store.times[name] = spans.length === 2
+            ? calendarTimes.subarray(spans[0], spans[0] + spans[1])
+            : Float64Array.from(index, i => calendarTimes[i]);
+        }} else if (raw && raw.__delta__) {{
+          store.columns[name] = decodeDeltaColumn(raw.__delta__);
+        }} else if (raw.length > 0 && raw.every(v => v === null || v === undefined || typeof v === 'number')) {{
+          store.columns[name] = Float64Array.from(raw, v => (typeof v === 'number' ? v : NaN));
+        }} else {{
+          store.columns[name] = raw;
+        }}
+        store.length = store.columns[name].length;
+      }});
+      return store;
+    }}
+
+    // 取 sheet 的列存，首次使用时由内嵌数据构建并替换之（原始数据随即释放）
+    function getSheetColumns(sheet) {{
+      const data = dataBySheet[sheet];
+      if (!data || isPartitioned(sheet)) return null;
+      if (data.__store__) return data;
+      const store = perfSpan('decode', sheet, () => buildColumnStore(data));
+      dataBySheet[sheet] = store;
+      return store;
+    }}
+
+    // 某列的时间戳（毫秒），解析结果缓存在列存上
+    function getColumnTimes(store, name) {{
+      if (!store.times[name]) {{
+        const column = store.columns[name] || [];
+        store.times[name] = Float64Array.from(column, v => (typeof v === 'string' ? Date.parse(v) : NaN));
+      }}
+      return store.times[name];
+    }}
+
+    function cellValue(store, name, i) {{
+      const v = store.columns[name][i];
+      return typeof v === 'number' && isNaN(v) ? null : v;
+    }}
+
+    // 逐行访问列存：复用同一个行对象，不生成整表的行记录副本
+    function forEachRow(store, fn) {{
+      const row = {{}};
+      for (let i = 0; i < store.length; i++) {{
+        store.names.forEach(name => {{
+          row[name] = cellValue(store, name, i);
+        }});
+        fn(row, i);
+      }}
+    }}
+
+    // 行记录形式（散点图、柱状图等小表使用），每次调用临时生成
+    function storeToRecords(store) {{
+      const records = new Array(store.length);
+      for (let i = 0; i < store.length; i++) {{
+        const rec = {{}};
+        store.names.forEach(name => {{
+          rec[name] = cellValue(store, name, i);
+        }});
+        records[i] = rec;
+      }}
+      return records;
+    }}
+
+    // [起点, 长度, 起点, 长度, ...] -> 每行在日历中的位置
+    function resolveDateSpans(spans) {{
+      let n = 0;
+      for (let i = 1; i < spans.length; i += 2) n += spans[i];
+      const index = new Int32Array(n);
+      let pos = 0;
+      for (let i = 0; i < spans.length; i += 2) {{
+        for (let j = 0; j < spans[i + 1]; j++) index[pos++] = spans[i] + j;
+      }}
+      return index;
+    }}
+
+    // 分区发布的时间序列：页面只含分区索引。图表首次显示只加载初始时间范围（最近一年）
+    // 覆盖的分区，缩放、平移或点“全部”后再补齐；下载时加载全部分区
+    const PARTITION_INITIAL_DAYS = 365;
+    const DAY_MS = 86400000;
+    const partitionRequests = {{}};
+    const partitionData = {{}};
+    function isPartitioned(sheet) {{
+      const data = dataBySheet[sheet];
+      return !!(data && !Array.isArray(data) && data.__partitions__);
+    }}
+
+    // 与 [start, end] 相交的分区；range 为 null 时为全部分区。两端各放宽一天，
+    // 避免日期字符串按本地时间与 UTC 解析的差异漏掉边界上的分区
+    function partitionsInRange(parts, range) {{
+      if (!range) return parts;
+      const lo = new Date(range[0]).getTime() - DAY_MS;
+      const hi = new Date(range[1]).getTime() + DAY_MS;
+      return parts.filter(part => Date.parse(part.end) >= lo && Date.parse(part.start) <= hi);
+    }}
+
+    // 首次显示的时间范围：最新一期往前一年；数据本就不足一年时为 null（全部）
+    function initialPartitionRange(sheet) {{
+      const parts = dataBySheet[sheet].__partitions__;
+      const end = parts[parts.length - 1].end;
+      const start = Date.parse(end) - PARTITION_INITIAL_DAYS * DAY_MS;
+      if (!(start > Date.parse(parts[0].start))) return null;
+      return [new Date(start).toISOString().slice(0, 10), end];
+    }}
+
+    function partitionsLoaded(sheet, range) {{
+      return partitionsInRange(dataBySheet[sheet].__partitions__, range).every(part => partitionData[part.url]);
+    }}
+
+    function fetchPartition(part) {{
+      // 分区文件名含内容哈希，同一文件只请求一次；失败的请求不缓存，下次重试
+      if (!partitionRequests[part.url]) {{
+        partitionRequests[part.url] = fetch(encodeURI(part.url)).then(resp => {{
+          if (!resp.ok) throw new Error(`分区加载失败: ${{part.url}}`);
+          return resp.json();
+        }}).then(columns => {{
+          partitionData[part.url] = columns;
+        }}).catch(e => {{
+          delete partitionRequests[part.url];
+          throw e;
+        }});
+      }}
+      return partitionRequests[part.url];
+    }}
+
+    // 加载 range 覆盖的分区（range 为 null 时全部）。已加载的分区按时间顺序合并成列存；
+    // 全部加载后 sheet 换成合并后的完整数据
+    function loadSheet(sheet, range = null) {{
+      if (!isPartitioned(sheet)) return Promise.resolve();
+      const data = dataBySheet[sheet];
+      return Promise.all(partitionsInRange(data.__partitions__, range).map(fetchPartition)).then(() => {{
+        // 加载期间数据可能已被实时推送替换
+        if (dataBySheet[sheet] !== data) return;
+        const loaded = data.__partitions__.filter(part => partitionData[part.url]);
+        const merged = {{}};
+        loaded.forEach(part => {{
+          const columns = partitionData[part.url];
+          Object.keys(columns).forEach(k => {{
+            merged[k] = merged[k] ? merged[k].concat(columns[k]) : columns[k];
+          }});
+        }});
+        if (loaded.length === data.__partitions__.length) {{
+          dataBySheet[sheet] = merged;
+        }} else {{
+          data.__loaded__ = perfSpan('decode', sheet, () => buildColumnStore(merged));
+        }}
+      }});
+    }}
 
-  <script>
-    const dataBySheet = {data_json};
-    const chartConfigs = {config_json};
-    // 记录每个图是否已经创建，避免重复创建以及在隐藏状态下创建导致尺寸异常
-    const chartInstances = {{}};
+    // 只加载了部分分区的 sheet：已加载部分的列存
+    function loadedColumns(sheet) {{
+      return isPartitioned(sheet) ? dataBySheet[sheet].__loaded__ || null : null;
+    }}
 
     // 下载图表数据为CSV（原始Excel表格数据）
     function downloadChartData(cfg) {{
-      const records = dataBySheet[cfg.sheet] || [];
-      if (records.length === 0) {{
+      if (isPartitioned(cfg.activeSheet || cfg.sheet)) {{
+        loadSheet(cfg.activeSheet || cfg.sheet)
+          .then(() => downloadChartData(cfg))
+          .catch(e => alert(e.message));
+        return;
+      }}
+      const store = getSheetColumns(cfg.activeSheet || cfg.sheet);
+      if (!store || store.length === 0) {{
         alert('没有可下载的数据');
         return;
       }}
 
-      // 获取所有列名（从第一条记录中获取所有键）
-      const headers = Object.keys(records[0] || {{}});
+      // 获取所有列名
+      const headers = store.names;
       if (headers.length === 0) {{
         alert('没有可下载的数据');
         return;
@@ -861,7 +2393,7 @@ def build_html(data_by_sheet, chart_configs):
       let csvContent = '';
       csvContent += headers.join(',') + '\\n';
       
-      records.forEach(record => {{
+      forEachRow(store, record => {{
         const row = headers.map(header => {{
           const value = record[header];
           // 处理包含逗号、引号或换行符的值
@@ -921,100 +2453,6 @@ def build_html(data_by_sheet, chart_configs):
       }}
     }}
 
-    // 解析说明文本并生成带颜色标识的HTML
-    function parseDescription(cfg, description) {{
-      if (!description) return '';
-      
-      const lines = description.split('\\n');
-      let html = '';
-      
-      for (let line of lines) {{
-        if (line.trim() === '') {{
-          html += '<br>';
-          continue;
-        }}
-        
-        // 检查是否是线条说明行（以•开头）
-        if (line.trim().startsWith('•')) {{
-          const text = line.trim().substring(1).trim();
-          
-          // 尝试匹配线条名称（去掉颜色文字说明）
-          let lineName = text;
-          let color = null;
-          
-          // 查找对应的线条名称
-          // 先尝试精确匹配：提取冒号前的部分
-          const colonIndex = text.indexOf('：');
-          const beforeColon = colonIndex > 0 ? text.substring(0, colonIndex).trim() : text.trim();
-          
-          if (cfg.lines) {{
-            // 优先精确匹配
-            for (let lineCfg of cfg.lines) {{
-              if (beforeColon === lineCfg.name) {{
-                lineName = lineCfg.name;
-                color = getLineColor(cfg, lineName);
-                break;
-              }}
-            }}
-            
-            // 如果精确匹配失败，尝试包含匹配
-            if (!color) {{
-              for (let lineCfg of cfg.lines) {{
-                // 检查文本开头是否包含线条名称，或者线条名称是否包含在冒号前的文本中
-                if (beforeColon.includes(lineCfg.name) || text.includes(lineCfg.name)) {{
-                  lineName = lineCfg.name;
-                  color = getLineColor(cfg, lineName);
-                  break;
-                }}
-              }}
-            }}
-            
-            // 如果还没找到，尝试双向包含匹配
-            if (!color) {{
-              for (let lineCfg of cfg.lines) {{
-                if (lineCfg.name.includes(beforeColon) || beforeColon.includes(lineCfg.name)) {{
-                  lineName = lineCfg.name;
-                  color = getLineColor(cfg, lineName);
-                  break;
-                }}
-              }}
-            }}
-          }} else if (cfg.type === 'bar') {{
-            // 对于柱状图，直接使用冒号前的部分作为字段名称
-            lineName = beforeColon;
-            color = getLineColor(cfg, lineName);
-          }}
-          
-          // 如果找到了颜色，生成带颜色标识的HTML
-          if (color) {{
-            // 去掉文本中的颜色说明（蓝色）、（黄色）等
-            const cleanText = text.replace(/（[^）]+）|\\([^)]+\\)/g, '').trim();
-            html += `<div class="info-line"><span class="color-indicator" style="background-color: ${{color}}"></span><span class="info-text">${{cleanText}}</span></div>`;
-          }} else {{
-            html += `<div class="info-line"><span class="info-text">${{text}}</span></div>`;
-          }}
-        }} else {{
-          // 非线条说明行，直接显示
-          html += `<div class="info-line"><span class="info-text">${{line}}</span></div>`;
-        }}
-      }}
-      
-      return html;
-    }}
-
-    // 显示/隐藏图表数据说明
-    function showChartInfo(cfg) {{
-      if (!cfg.description) return;
-      
-      const panelId = `chart-info-panel-${{cfg.id}}`;
-      const panel = document.getElementById(panelId);
-      
-      if (panel) {{
-        // 切换显示/隐藏
-        panel.classList.toggle('active');
-      }}
-    }}
-
     // 下载所有数据
     // 清理 Excel sheet 名称中的非法字符
     function sanitizeSheetName(name) {{
@@ -1035,6 +2473,19 @@ def build_html(data_by_sheet, chart_configs):
     }}
 
     function downloadAllData() {{
+      loadAllCategories();
+      const pending = [];
+      Object.keys(chartConfigs).forEach(category => {{
+        chartConfigs[category].forEach(cfg => {{
+          if (isPartitioned(cfg.sheet)) pending.push(loadSheet(cfg.sheet));
+        }});
+      }});
+      if (pending.length > 0) {{
+        Promise.all(pending)
+          .then(() => downloadAllData())
+          .catch(e => alert(e.message));
+        return;
+      }}
       try {{
         // 检查xlsx库是否加载
         if (typeof XLSX === 'undefined') {{
@@ -1054,12 +2505,12 @@ def build_html(data_by_sheet, chart_configs):
         
         Object.keys(chartConfigs).forEach(category => {{
           chartConfigs[category].forEach((cfg, idx) => {{
-            const records = dataBySheet[cfg.sheet] || [];
-            if (records.length > 0) {{
+            const store = getSheetColumns(cfg.sheet);
+            if (store && store.length > 0) {{
               hasData = true;
               
               // 获取所有列名
-              const headers = Object.keys(records[0] || {{}});
+              const headers = store.names;
               if (headers.length > 0) {{
                 // 准备数据：第一行是表头，后面是数据行
                 const sheetData = [headers];
@@ -1075,7 +2526,7 @@ def build_html(data_by_sheet, chart_configs):
                   }}
                 }});
                 
-                records.forEach(record => {{
+                forEachRow(store, record => {{
                   const row = headers.map(header => {{
                     let value = record[header];
                     
@@ -1302,8 +2753,430 @@ def build_html(data_by_sheet, chart_configs):
       }}, 100);
     }}
 
-    function createChart(cfg, containerId) {{
-      const records = dataBySheet[cfg.sheet] || [];
+    // 切换图表视图（如PB-ROE的板块/个股粒度、净值图的回撤/滚动夏普/超额），重新绘制该图表
+    function setChartView(cfg, index) {{
+      const option = cfg.views[index];
+      cfg.activeView = index;
+      cfg.activeSheet = option.sheet || null;
+      cfg.activeLines = option.lines || null;
+      cfg.activeYTitle = option.yTitle || null;
+      cfg.showText = option.showText !== false;
+      const group = document.getElementById(`chart-views-${{cfg.id}}`);
+      if (group) {{
+        group.querySelectorAll('.chart-view-option').forEach(el => {{
+          el.classList.toggle('active', Number(el.dataset.index) === index);
+        }});
+      }}
+      // 先清除旧图的事件监听（如归一化处理），再按新视图重绘
+      Plotly.purge(`plot-${{cfg.id}}`);
+      const plotDiv = document.getElementById(`plot-${{cfg.id}}`);
+      if (plotDiv) {{
+        delete plotDiv._normalizer;
+        delete plotDiv._rangeQuery;
+        delete plotDiv._partitionLoad;
+        delete plotDiv._overviewBound;
+      }}
+      createChart(cfg, `plot-${{cfg.id}}`);
+    }}
+
+    // 由 --serve 模式注入：缩放后按可见范围向服务端请求抽稀后的数据
+    let rangeQueryUrl = null;
+    function enableRangeQueries(url) {{
+      rangeQueryUrl = url;
+    }}
+
+    // plotly_relayout 事件中的新时间范围：[起点, 终点]；自动范围（“全部”、双击）为 null；
+    // 未改变时间轴时为 undefined
+    function relayoutRange(eventData) {{
+      if (eventData['xaxis.range[0]'] !== undefined && eventData['xaxis.range[1]'] !== undefined) {{
+        return [eventData['xaxis.range[0]'], eventData['xaxis.range[1]']];
+      }}
+      if (Array.isArray(eventData['xaxis.range'])) return eventData['xaxis.range'].slice();
+      return eventData['xaxis.autorange'] === true ? null : undefined;
+    }}
+
+    function bindRangeQueries(cfg, containerId) {{
+      const plotDiv = document.getElementById(containerId);
+      if (!rangeQueryUrl || !plotDiv || plotDiv._rangeQuery) return;
+      plotDiv._rangeQuery = true;
+      // 只采用最后一次请求的结果，快速连续缩放时丢弃过期响应
+      let seq = 0;
+      plotDiv.on('plotly_relayout', eventData => {{
+        const range = relayoutRange(eventData);
+        if (range === undefined) return;
+        const sheet = cfg.activeSheet || cfg.sheet;
+        const params = new URLSearchParams({{
+          sheet: sheet,
+          max_points: String(Math.max(200, Math.round((plotDiv.offsetWidth || 800) * 2)))
+        }});
+        if (range) {{
+          params.set('start', range[0]);
+          params.set('end', range[1]);
+        }}
+        const current = ++seq;
+        fetch(`${{rangeQueryUrl}}?${{params.toString()}}`)
+          .then(resp => (resp.ok ? resp.json() : null))
+          .then(result => {{
+            if (!result || current !== seq || sheet !== (cfg.activeSheet || cfg.sheet)) return;
+            createChart(cfg, containerId, {{
+              react: true,
+              xRange: range,
+              columns: buildColumnStore(result.columns)
+            }});
+          }})
+          .catch(e => console.error('Error loading range:', e));
+      }});
+    }}
+
+    // 只加载了部分分区的图表：缩放、平移到未加载的时间段后补齐分区，按当时的范围重绘。
+    // --serve 模式下由服务端按范围返回数据，不在此加载
+    function bindPartitionLoads(cfg, containerId) {{
+      const plotDiv = document.getElementById(containerId);
+      if (rangeQueryUrl || !plotDiv || plotDiv._partitionLoad) return;
+      plotDiv._partitionLoad = true;
+      plotDiv.on('plotly_relayout', eventData => {{
+        const range = relayoutRange(eventData);
+        const sheet = cfg.activeSheet || cfg.sheet;
+        if (range === undefined || !isPartitioned(sheet) || partitionsLoaded(sheet, range)) return;
+        loadSheet(sheet, range)
+          .then(() => refreshChart(cfg))
+          .catch(e => console.error('Error loading partitions:', e));
+      }});
+    }}
+
+    // 实时推送：按新数据重绘已创建的图表，保留当前的时间范围（及其归一化）
+    function refreshChart(cfg) {{
+      const plotDiv = document.getElementById(`plot-${{cfg.id}}`);
+      const xaxis = plotDiv && plotDiv.layout && plotDiv.layout.xaxis;
+      const xRange = xaxis && !xaxis.autorange && Array.isArray(xaxis.range) ? xaxis.range.slice() : null;
+      createChart(cfg, `plot-${{cfg.id}}`, {{ react: true, xRange: xRange }});
+    }}
+
+    function findChartConfig(id) {{
+      for (const category of Object.keys(chartConfigs)) {{
+        const cfg = chartConfigs[category].find(c => c.id === id);
+        if (cfg) return cfg;
+      }}
+      return null;
+    }}
+
+    // 应用服务端推送的增量：替换变化的 sheet 与图表配置，只重绘受影响的图表
+    function applyLiveUpdate(update) {{
+      const sheets = update.sheets || {{}};
+      const configs = update.configs || {{}};
+      // 说明面板由服务端按新配置渲染好
+      const panels = update.panels || {{}};
+      Object.keys(sheets).forEach(sheet => {{
+        updatedSheets.add(sheet);
+        if (sheets[sheet] === null) {{
+          delete dataBySheet[sheet];
+        }} else {{
+          dataBySheet[sheet] = sheets[sheet];
+        }}
+      }});
+      Object.keys(configs).forEach(id => {{
+        const cfg = findChartConfig(id);
+        if (!cfg) {{
+          pendingConfigUpdates[id] = {{ config: configs[id], panel: panels[id] }};
+          return;
+        }}
+        // 只覆盖服务端字段，保留页面上的视图选择等状态
+        Object.assign(cfg, configs[id]);
+        const infoPanel = document.getElementById(`chart-info-panel-${{id}}`);
+        if (infoPanel && panels[id] !== undefined) {{
+          infoPanel.innerHTML = panels[id];
+        }}
+      }});
+      currentBuild = update.build || currentBuild;
+
+      Object.keys(chartConfigs).forEach(category => {{
+        chartConfigs[category].forEach(cfg => {{
+          // 概览按新数据在页面内重算
+          if (configs[cfg.id] || cfg.sheet in sheets) {{
+            delete chartOverviews[cfg.id];
+            // 尚未创建的图表，构建时的预览已过期
+            if (!chartInstances[cfg.id]) removePreview(`plot-${{cfg.id}}`);
+          }}
+          if (!chartInstances[cfg.id]) return;
+          if (configs[cfg.id] || (cfg.activeSheet || cfg.sheet) in sheets) {{
+            refreshChart(cfg);
+          }}
+        }});
+      }});
+    }}
+
+    // 由 --serve 模式注入调用；静态发布的页面不会连接
+    function connectLiveUpdates(url) {{
+      if (!window.EventSource) return;
+      // 断线重连时浏览器会带上最后收到的事件 id（即数据版本），服务端据此判断是否需要整页刷新
+      const source = new EventSource(`${{url}}?build=${{encodeURIComponent(currentBuild)}}`);
+      source.addEventListener('update', event => {{
+        try {{
+          applyLiveUpdate(JSON.parse(event.data));
+        }} catch (e) {{
+          console.error('Error applying live update:', e);
+        }}
+      }});
+      source.addEventListener('reload', () => {{
+        source.close();
+        window.location.reload();
+      }});
+    }}
+
+    // 等待分区加载的图表，避免重复触发
+    const pendingCharts = {{}};
+
+    // 概览条：由构建时预计算的各线最小/最大值包络绘制（实时更新后在页面内按新数据重算），
+    // 拖动或点选设置主图的时间范围，与范围按钮、归一化共用 plotly_relayout 事件
+    const chartOverviews = {overview_json};
+    const OVERVIEW_BUCKETS = {OVERVIEW_BUCKETS};
+    const OVERVIEW_EDGE = 6;
+
+    function computeOverview(cfg) {{
+      const store = getSheetColumns(cfg.sheet);
+      if (!store || store.length === 0) return null;
+      const times = getColumnTimes(store, cfg.x);
+      let start = Infinity;
+      let end = -Infinity;
+      times.forEach(t => {{
+        if (t < start) start = t;
+        if (t > end) end = t;
+      }});
+      if (!(end >= start)) return null;
+      const lines = cfg.lines.map(line => {{
+        const values = store.columns[line.field];
+        if (!values) return null;
+        const min = new Array(OVERVIEW_BUCKETS).fill(null);
+        const max = new Array(OVERVIEW_BUCKETS).fill(null);
+        let lo = Infinity;
+        let hi = -Infinity;
+        for (let i = 0; i < store.length; i++) {{
+          const v = values[i];
+          if (typeof v !== 'number' || isNaN(v) || isNaN(times[i])) continue;
+          const b = Math.min(OVERVIEW_BUCKETS - 1, Math.floor((times[i] - start) / Math.max(end - start, 1) * OVERVIEW_BUCKETS));
+          if (min[b] === null || v < min[b]) min[b] = v;
+          if (max[b] === null || v > max[b]) max[b] = v;
+          if (v < lo) lo = v;
+          if (v > hi) hi = v;
+        }}
+        if (hi < lo) return null;
+        const scale = v => (v === null ? null : (hi > lo ? Math.round((v - lo) * 100 / (hi - lo)) : 50));
+        return {{ min: min.map(scale), max: max.map(scale) }};
+      }});
+      return {{ start: start, end: end, lines: lines }};
+    }}
+
+    function getOverview(cfg) {{
+      if (!chartOverviews[cfg.id]) chartOverviews[cfg.id] = computeOverview(cfg);
+      return chartOverviews[cfg.id];
+    }}
+
+    // Plotly 的日期范围是不带时区的字符串，按 UTC 解析，与日历时间戳一致
+    function parseAxisDate(value) {{
+      if (typeof value === 'number') return value;
+      const text = String(value);
+      return Date.parse(text.length > 10 ? text.replace(' ', 'T') + 'Z' : text);
+    }}
+
+    function formatAxisDate(ms) {{
+      return new Date(ms).toISOString().slice(0, 10);
+    }}
+
+    function drawOverview(strip) {{
+      const canvas = strip.canvas;
+      const ctx = canvas.getContext && canvas.getContext('2d');
+      const overview = strip.overview;
+      if (!ctx || !overview) return;
+      const ratio = window.devicePixelRatio || 1;
+      const width = Math.max(1, Math.round((strip.el.clientWidth || 300) * ratio));
+      const height = Math.max(1, Math.round((strip.el.clientHeight || 28) * ratio));
+      canvas.width = width;
+      canvas.height = height;
+      ctx.clearRect(0, 0, width, height);
+      const step = width / OVERVIEW_BUCKETS;
+      const pad = 2 * ratio;
+      const y = v => height - pad - v / 100 * (height - 2 * pad);
+      overview.lines.forEach((env, j) => {{
+        if (!env) return;
+        ctx.fillStyle = getLineColor(strip.cfg, strip.cfg.lines[j].name);
+        ctx.globalAlpha = 0.55;
+        for (let i = 0; i < OVERVIEW_BUCKETS; i++) {{
+          if (env.min[i] === null) continue;
+          const top = y(env.max[i]);
+          ctx.fillRect(i * step, top, Math.max(step, 1), Math.max(y(env.min[i]) - top, ratio));
+        }}
+      }});
+      ctx.globalAlpha = 1;
+    }}
+
+    function placeOverviewWindow(strip) {{
+      const overview = strip.overview;
+      if (!overview) return;
+      const span = Math.max(overview.end - overview.start, 1);
+      const a = Math.max(0, Math.min(1, (strip.range[0] - overview.start) / span));
+      const b = Math.max(a, Math.min(1, (strip.range[1] - overview.start) / span));
+      strip.window.style.left = `${{a * 100}}%`;
+      strip.window.style.width = `${{(b - a) * 100}}%`;
+    }}
+
+    // 主图范围变化（缩放、范围按钮、概览条拖动）后同步概览条上的选框
+    function syncOverview(strip, plotDiv) {{
+      const xaxis = plotDiv.layout && plotDiv.layout.xaxis;
+      const overview = strip.overview;
+      if (!overview) return;
+      if (xaxis && !xaxis.autorange && Array.isArray(xaxis.range)) {{
+        const a = parseAxisDate(xaxis.range[0]);
+        const b = parseAxisDate(xaxis.range[1]);
+        strip.range = isNaN(a) || isNaN(b) ? [overview.start, overview.end] : [a, b];
+      }} else {{
+        strip.range = [overview.start, overview.end];
+      }}
+      placeOverviewWindow(strip);
+    }}
+
+    function commitOverviewRange(strip, containerId) {{
+      const overview = strip.overview;
+      const [a, b] = strip.range;
+      const day = 86400000;
+      // 选框覆盖全部数据时回到自动范围（归一化随之恢复原始数据）
+      if (a <= overview.start + day && b >= overview.end - day) {{
+        Plotly.relayout(containerId, {{ 'xaxis.autorange': true }});
+      }} else {{
+        Plotly.relayout(containerId, {{
+          'xaxis.range[0]': formatAxisDate(a),
+          'xaxis.range[1]': formatAxisDate(b)
+        }});
+      }}
+    }}
+
+    function bindOverviewPointer(strip, containerId) {{
+      const el = strip.el;
+      let drag = null;
+      const timeAt = clientX => {{
+        const rect = el.getBoundingClientRect();
+        const f = Math.max(0, Math.min(1, (clientX - rect.left) / Math.max(rect.width, 1)));
+        return strip.overview.start + f * (strip.overview.end - strip.overview.start);
+      }};
+      el.addEventListener('pointerdown', e => {{
+        if (!strip.overview) return;
+        const rect = strip.window.getBoundingClientRect();
+        const t = timeAt(e.clientX);
+        if (Math.abs(e.clientX - rect.left) <= OVERVIEW_EDGE) {{
+          drag = {{ mode: 'left' }};
+        }} else if (Math.abs(e.clientX - rect.right) <= OVERVIEW_EDGE) {{
+          drag = {{ mode: 'right' }};
+        }} else if (e.clientX > rect.left && e.clientX < rect.right) {{
+          drag = {{ mode: 'move', origin: t, range: strip.range.slice() }};
+        }} else {{
+          drag = {{ mode: 'new', origin: t }};
+          strip.range = [t, t];
+        }}
+        if (el.setPointerCapture && e.pointerId !== undefined) el.setPointerCapture(e.pointerId);
+        e.preventDefault();
+      }});
+      el.addEventListener('pointermove', e => {{
+        if (!drag) return;
+        const t = timeAt(e.clientX);
+        const {{ start, end }} = strip.overview;
+        if (drag.mode === 'left') {{
+          strip.range = [Math.min(t, strip.range[1]), strip.range[1]];
+        }} else if (drag.mode === 'right') {{
+          strip.range = [strip.range[0], Math.max(t, strip.range[0])];
+        }} else if (drag.mode === 'move') {{
+          const width = drag.range[1] - drag.range[0];
+          const shift = Math.max(start - drag.range[0], Math.min(end - drag.range[1], t - drag.origin));
+          strip.range = [drag.range[0] + shift, drag.range[0] + shift + width];
+        }} else {{
+          strip.range = [Math.min(drag.origin, t), Math.max(drag.origin, t)];
+        }}
+        placeOverviewWindow(strip);
+      }});
+      const finish = () => {{
+        if (!drag) return;
+        const {{ mode, origin }} = drag;
+        drag = null;
+        if (mode === 'new' && strip.range[1] - strip.range[0] < 86400000) {{
+          // 单击未拖动：选框以点击处为中心，保持当前宽度
+          syncOverview(strip, document.getElementById(containerId));
+          const {{ start, end }} = strip.overview;
+          const width = strip.range[1] - strip.range[0];
+          if (width >= end - start) return;
+          const a = Math.max(start, Math.min(end - width, origin - width / 2));
+          strip.range = [a, a + width];
+          placeOverviewWindow(strip);
+        }}
+        commitOverviewRange(strip, containerId);
+      }};
+      el.addEventListener('pointerup', finish);
+      el.addEventListener('pointercancel', finish);
+      el.addEventListener('dblclick', () => {{
+        Plotly.relayout(containerId, {{ 'xaxis.autorange': true }});
+      }});
+    }}
+
+    function attachOverview(cfg, containerId) {{
+      const plotDiv = document.getElementById(containerId);
+      const overview = getOverview(cfg);
+      if (!plotDiv || !overview || !plotDiv.parentNode) return;
+      const container = plotDiv.parentNode;
+      let strip = container._overview;
+      if (!strip) {{
+        const el = document.createElement('div');
+        el.className = 'chart-overview';
+        const canvas = document.createElement('canvas');
+        const win = document.createElement('div');
+        win.className = 'chart-overview-window';
+        el.appendChild(canvas);
+        el.appendChild(win);
+        container.parentNode.insertBefore(el, container.nextSibling);
+        strip = {{ el: el, canvas: canvas, window: win, cfg: cfg, overview: overview, range: [overview.start, overview.end] }};
+        container._overview = strip;
+        bindOverviewPointer(strip, containerId);
+        if (typeof ResizeObserver !== 'undefined') {{
+          new ResizeObserver(() => drawOverview(strip)).observe(el);
+        }}
+      }}
+      strip.overview = overview;
+      drawOverview(strip);
+      // Plotly.purge（切换视图）会移除事件，重新绑定
+      if (!plotDiv._overviewBound) {{
+        plotDiv._overviewBound = true;
+        plotDiv.on('plotly_relayout', () => syncOverview(strip, plotDiv));
+      }}
+      syncOverview(strip, plotDiv);
+    }}
+
+    function removePreview(containerId) {{
+      const container = document.getElementById(containerId);
+      const preview = container && container.querySelector('.chart-preview');
+      if (preview) preview.remove();
+    }}
+
+    function createChart(cfg, containerId, options = {{}}) {{
+      const sheetName = cfg.activeSheet || cfg.sheet;
+      if (!options.columns && isPartitioned(sheetName)) {{
+        // 首次显示（未指定范围）只需初始范围内的分区；xRange 为 null 表示全部
+        const range = options.xRange === undefined ? initialPartitionRange(sheetName) : options.xRange;
+        if (!partitionsLoaded(sheetName, range)) {{
+          if (pendingCharts[cfg.id]) return;
+          pendingCharts[cfg.id] = true;
+          loadSheet(sheetName, range)
+            .then(() => {{
+              delete pendingCharts[cfg.id];
+              createChart(cfg, containerId, Object.assign({{}}, options, {{ xRange: range }}));
+            }})
+            .catch(e => {{
+              delete pendingCharts[cfg.id];
+              console.error('Error loading partitions:', e);
+            }});
+          return;
+        }}
+        options = Object.assign({{}}, options, {{ xRange: range }});
+      }}
+      const specToken = perfStart('spec', cfg.id);
+      const store = options.columns || getSheetColumns(sheetName) || loadedColumns(sheetName) || buildColumnStore([]);
+      // 折线图直接使用列存；散点图、柱状图数据量小，使用临时行记录
+      const records = cfg.type === 'scatter' || cfg.type === 'bar' ? storeToRecords(store) : null;
       
       let traces, layout;
       let hasY2 = false; // 默认值，避免作用域问题
@@ -1314,6 +3187,9 @@ def build_html(data_by_sheet, chart_configs):
         const x = records.map(r => parseFloat(r[cfg.x]) || 0);
         const y = records.map(r => parseFloat(r[cfg.y]) || 0);
         const text = cfg.text ? records.map(r => r[cfg.text] || '') : [];
+        // 个股粒度点数较多：缩小点、不显示文字标签，名称只在悬停时显示
+        const showText = cfg.showText !== false;
+        const markerSize = showText ? 8 : 5;
         
         // 创建外环和内圈，颜色相同，中间有间隙
         traces = [
@@ -1324,7 +3200,7 @@ def build_html(data_by_sheet, chart_configs):
             mode: 'markers',
             type: 'scatter',
             marker: {{
-              size: 12,
+              size: markerSize + 4,
               color: '#005bac',
               line: {{
                 color: '#005bac',
@@ -1341,7 +3217,7 @@ def build_html(data_by_sheet, chart_configs):
           {{
             x: x,
             y: y,
-            mode: 'markers+text',
+            mode: showText ? 'markers+text' : 'markers',
             type: 'scatter',
             text: text,
             textposition: 'top center',
@@ -1350,7 +3226,7 @@ def build_html(data_by_sheet, chart_configs):
               color: '#2f3640'
             }},
             marker: {{
-              size: 8,
+              size: markerSize,
               color: '#005bac',
               line: {{
                 color: 'transparent',
@@ -1364,6 +3240,10 @@ def build_html(data_by_sheet, chart_configs):
                           '%{{xaxis.title.text}}: %{{x:,.4f}}, %{{yaxis.title.text}}: %{{y:,.4f}}<extra></extra>'
           }}
         ];
+        // 个股粒度去掉外环，避免点数翻倍
+        if (!showText) {{
+          traces.shift();
+        }}
         
         layout = {{
           margin: {{ t: 20, r: 15, b: 60, l: 60 }},
@@ -1606,10 +3486,11 @@ def build_html(data_by_sheet, chart_configs):
           barmode: 'stack'  // 堆叠柱状图
         }};
       }} else {{
-        // 折线图模式（原有逻辑）
-        const x = records.map(r => r[cfg.x]);
-        traces = cfg.lines.map(lineCfg => {{
-          const y = records.map(r => r[lineCfg.field]);
+        // 折线图模式（原有逻辑）；切换到分析视图时使用该视图的线条
+        const x = store.columns[cfg.x] || [];
+        const lines = cfg.activeLines || cfg.lines;
+        traces = lines.map(lineCfg => {{
+          const y = store.columns[lineCfg.field] || [];
           const axisName = lineCfg.axis === 'y2' ? 'y2' : 'y';
           const trace = {{
             x,
@@ -1641,7 +3522,7 @@ def build_html(data_by_sheet, chart_configs):
           return trace;
         }});
 
-        const hasY2 = cfg.lines.some(l => l.axis === 'y2');
+        const hasY2 = lines.some(l => l.axis === 'y2');
         
         // 针对"外币资金占货币资金比"和"主要客户占比稳定性"图表的特殊配置（坐标轴标题）
         const isFactor1Chart = cfg.id === 'factor1';
@@ -1666,7 +3547,7 @@ def build_html(data_by_sheet, chart_configs):
             font: {{ color: '#666666' }}
           }},
           xaxis: {{
-            title: (isFactorChart || isFund1Chart || isFund2Chart || isRisk1Chart || isAsset1Chart) ? '日期' : cfg.x,
+            title: cfg.xTitle || ((isFactorChart || isFund1Chart || isFund2Chart || isRisk1Chart || isAsset1Chart) ? '日期' : cfg.x),
             showgrid: true,
             gridcolor: '#ecf0f1',
             type: 'date',
@@ -1678,9 +3559,6 @@ def build_html(data_by_sheet, chart_configs):
             tickfont: {{ color: '#666666' }},
             zeroline: false,
             hoverformat: '%Y-%m-%d',
-            rangeslider: {{
-              visible: false
-            }},
             rangeselector: {{
               buttons: [
                 {{ count: 1, label: '1M', step: 'month', stepmode: 'backward' }},
@@ -1694,7 +3572,7 @@ def build_html(data_by_sheet, chart_configs):
           }},
           yaxis: {{
             title: {{
-              text: isFactorChart ? '净值' : (isFund1Chart ? '主力累计净买入(亿元)' : (isFund2Chart ? '博弈/存量' : (isRisk1Chart ? '新高个股占比' : (isAsset1Chart ? '净值' : '')))),
+              text: cfg.activeYTitle || cfg.yTitle || (isFactorChart ? '净值' : (isFund1Chart ? '主力累计净买入(亿元)' : (isFund2Chart ? '博弈/存量' : (isRisk1Chart ? '新高个股占比' : (isAsset1Chart ? '净值' : ''))))),
               standoff: 30
             }},
             showgrid: true,
@@ -1730,16 +3608,27 @@ def build_html(data_by_sheet, chart_configs):
         }}
       }}
 
-      Plotly.newPlot(containerId, traces, layout, {{
+      // 实时更新时沿用用户当前查看的时间范围
+      if (options.xRange && layout.xaxis) {{
+        layout.xaxis.range = options.xRange;
+        layout.xaxis.autorange = false;
+      }}
+
+      perfEnd(specToken);
+
+      // 实时更新用 Plotly.react 原地更新，已绑定的事件保持不变
+      const render = options.react ? Plotly.react : Plotly.newPlot;
+      removePreview(containerId);
+      perfSpan('plot', cfg.id, () => render(containerId, traces, layout, {{
         responsive: true,
         displaylogo: false,
         modeBarButtonsToRemove: ['toImage']
-      }}).then(() => {{
+      }})).then(() => {{
         // 标记该图表已创建
         chartInstances[cfg.id] = true;
 
         // 对于柱状图，隐藏合计值的颜色方块，并更新说明面板添加颜色指示
-        if (cfg.type === 'bar') {{
+        if (cfg.type === 'bar' && !options.react) {{
           const plotDiv = document.getElementById(containerId);
           if (plotDiv) {{
             // 使用MutationObserver监听hover的变化
@@ -1773,6 +3662,12 @@ def build_html(data_by_sheet, chart_configs):
           }}
         }}
 
+        if (cfg.type !== 'scatter' && cfg.type !== 'bar') {{
+          bindRangeQueries(cfg, containerId);
+          bindPartitionLoads(cfg, containerId);
+          attachOverview(cfg, containerId);
+        }}
+
         // 对于有双坐标轴的图表，手动触发resize以确保正确布局
         if (hasY2) {{
           setTimeout(() => {{
@@ -1780,81 +3675,63 @@ def build_html(data_by_sheet, chart_configs):
           }}, 100);
         }}
         
-        // 隐藏rangeslider中的折线图，只显示灰色控制条
-        if (cfg.type !== 'scatter') {{
-          setTimeout(() => {{
-            const plotDiv = document.getElementById(containerId);
-            if (plotDiv) {{
-              // 查找rangeslider容器
-              const rangesliderContainer = plotDiv.querySelector('.rangeslider-container');
-              if (rangesliderContainer) {{
-                // 隐藏所有svg图表
-                const svgs = rangesliderContainer.querySelectorAll('svg');
-                svgs.forEach(svg => svg.style.display = 'none');
-                // 设置容器高度为20px（所有图表统一）
-                rangesliderContainer.style.height = '20px';
-                rangesliderContainer.style.minHeight = '20px';
-              }}
-              // 再次触发resize以确保布局正确
-              if (hasY2) {{
-                Plotly.Plots.resize(containerId);
-              }}
-            }}
-          }}, 300);
-        }}
-
         // 对于有基准线的折线图（因子图和量化资产配置图），添加时间范围选择时的归一化处理
         const hasBenchmark = cfg.lines && cfg.lines.some(l => l.name === '基准');
-        const isBenchmarkChart = (cfg.id === 'factor1' || cfg.id === 'factor2' || cfg.id === 'asset1');
-        if (hasBenchmark && isBenchmarkChart && cfg.type !== 'scatter') {{
+        const isBenchmarkChart = (cfg.id === 'factor1' || cfg.id === 'factor2' || cfg.id === 'asset1' || cfg.normalize === true);
+        const boundDiv = document.getElementById(containerId);
+        if (options.react && boundDiv && boundDiv._normalizer) {{
+          // 事件已绑定：换成新数据，并对保留的时间范围重新归一化
+          boundDiv._normalizer.setColumns(store);
+          if (options.xRange) {{
+            boundDiv._normalizer.applyRange(new Date(options.xRange[0]), new Date(options.xRange[1]));
+          }}
+        }} else if (hasBenchmark && isBenchmarkChart && cfg.type !== 'scatter' && !cfg.activeLines) {{
           // 延迟绑定事件，确保图表完全加载
           setTimeout(() => {{
             const plotDiv = document.getElementById(containerId);
-            if (!plotDiv) return;
+            if (!plotDiv || plotDiv._normalizer) return;
 
-            // 保存原始数据
-            const originalData = {{
-              x: records.map(r => r[cfg.x]),
+            // 原始数据直接引用列存中的列（实时更新时替换），不另存副本
+            const toOriginalData = cols => ({{
+              x: cols.columns[cfg.x] || [],
+              t: getColumnTimes(cols, cfg.x),
               traces: cfg.lines.map(lineCfg => ({{
                 name: lineCfg.name,
                 field: lineCfg.field,
-                y: records.map(r => {{
-                  const val = r[lineCfg.field];
-                  return val !== null && val !== undefined ? parseFloat(val) : null;
-                }})
+                y: cols.columns[lineCfg.field] || new Float64Array(cols.length).fill(NaN)
               }}))
-            }};
+            }});
+            let originalData = toOriginalData(options.columns || getSheetColumns(cfg.activeSheet || cfg.sheet) || store);
+            // 归一化结果写入每条线复用的缓冲区
+            const scratch = {{}};
 
             // 标记是否已归一化
             let isNormalized = false;
 
             // 归一化函数
             function normalizeData(rangeStart, rangeEnd) {{
+              const perfToken = perfStart('normalize', cfg.id);
+              let restyled = null;
               // 找到起始点索引：优先找范围内的第一个点，否则找最接近的点
               let startIndex = -1;
               let minDiff = Infinity;
               let closestIndex = -1;
               
-              for (let i = 0; i < originalData.x.length; i++) {{
-                const dateStr = originalData.x[i];
-                let date = null;
-                
-                // 尝试解析日期
-                if (typeof dateStr === 'string') {{
-                  date = new Date(dateStr);
-                }} else if (dateStr instanceof Date) {{
-                  date = dateStr;
-                }}
+              const startTime = rangeStart.getTime();
+              const endTime = rangeEnd.getTime();
+              for (let i = 0; i < originalData.t.length; i++) {{
+                // 时间戳已预先解析（内嵌数据直接取自共享日历）
+                const time = originalData.t[i];
                 
-                if (date && !isNaN(date.getTime())) {{
+                if (!isNaN(time)) {{
                   // 优先找范围内的第一个点
-                  if (date >= rangeStart && date <= rangeEnd) {{
+                  if (time >= startTime && time <= endTime) {{
                     startIndex = i;
                     break;
                   }}
                   
                   // 同时记录最接近的点
-                  const diff = Math.abs(date.getTime() - rangeStart.getTime());
+                  const diff = Math.abs(time - startTime);
                   if (diff < minDiff) {{
                     minDiff = diff;
                     closestIndex = i;
@@ -1875,8 +3752,17 @@ def build_html(data_by_sheet, chart_configs):
                 cfg.lines.forEach((lineCfg, idx) => {{
                   const originalTrace = originalData.traces.find(t => t.name === lineCfg.name);
                   if (originalTrace) {{
-                    // 初始化数组，复制原始值
-                    const normalizedY = originalTrace.y.slice();
+                    // 初始化数组，复制原始值（数值列复用缓冲区）
+                    let normalizedY;
+                    if (originalTrace.y instanceof Float64Array) {{
+                      if (!scratch[idx] || scratch[idx].length !== originalTrace.y.length) {{
+                        scratch[idx] = new Float64Array(originalTrace.y.length);
+                      }}
+                      normalizedY = scratch[idx];
+                      normalizedY.set(originalTrace.y);
+                    }} else {{
+                      normalizedY = originalTrace.y.slice();
+                    }}
                     
                     // 从起始点开始，逐日计算归一化值
                     // 起始点：所有净值都取1
@@ -1933,10 +3819,11 @@ def build_html(data_by_sheet, chart_configs):
                 
                 // 批量更新所有 traces，使用正确的格式
                 if (yArrays.length > 0) {{
-                  Plotly.restyle(containerId, {{ y: yArrays }}, indices);
+                  restyled = Plotly.restyle(containerId, {{ y: yArrays }}, indices);
                   isNormalized = true;
                 }}
               }}
+              perfEnd(perfToken, restyled);
             }}
 
             // 恢复原始数据函数
@@ -1962,8 +3849,23 @@ def build_html(data_by_sheet, chart_configs):
             }}
 
             // 保存原始数据的完整范围
-            const originalXMin = originalData.x.length > 0 ? new Date(originalData.x[0]) : null;
-            const originalXMax = originalData.x.length > 0 ? new Date(originalData.x[originalData.x.length - 1]) : null;
+            let originalXMin = originalData.x.length > 0 ? new Date(originalData.x[0]) : null;
+            let originalXMax = originalData.x.length > 0 ? new Date(originalData.x[originalData.x.length - 1]) : null;
+
+            plotDiv._normalizer = {{
+              setColumns(cols) {{
+                originalData = toOriginalData(cols);
+                originalXMin = originalData.x.length > 0 ? new Date(originalData.x[0]) : null;
+                originalXMax = originalData.x.length > 0 ? new Date(originalData.x[originalData.x.length - 1]) : null;
+                // Plotly.react 已画出原始数据
+                isNormalized = false;
+              }},
+              applyRange(rangeStart, rangeEnd) {{
+                if (!isNaN(rangeStart.getTime()) && !isNaN(rangeEnd.getTime())) {{
+                  normalizeData(rangeStart, rangeEnd);
+                }}
+              }}
+            }};
 
             // 监听布局变化事件
             plotDiv.on('plotly_relayout', function(eventData) {{
@@ -2060,305 +3962,98 @@ def build_html(data_by_sheet, chart_configs):
       }});
     }}
 
-    function buildSections() {{
-      const container = document.getElementById('sections-container');
-      container.innerHTML = '';
-
-      let firstCategory = null;
-
-      Object.keys(chartConfigs).forEach((category, catIdx) => {{
-        const section = document.createElement('div');
-        section.className = 'section';
-        section.id = `section-${{category}}`;
-        
-        // 第一个板块默认显示
-        if (catIdx === 0) {{
-          section.classList.add('active');
-          firstCategory = category;
-        }}
-
-        const sectionTitle = document.createElement('div');
-        sectionTitle.className = 'section-title';
-        sectionTitle.textContent = category;
-        section.appendChild(sectionTitle);
-
-        const chartsContainer = document.createElement('div');
-        chartsContainer.className = 'section-charts';
-
-        chartConfigs[category].forEach((cfg, idx) => {{
-          const chartWrapper = document.createElement('div');
-          chartWrapper.className = 'chart-wrapper';
-          chartWrapper.id = `chart-${{cfg.id}}`;
-
-          const chartHeader = document.createElement('div');
-          chartHeader.className = 'chart-header';
-
-          const chartTitle = document.createElement('div');
-          chartTitle.className = 'chart-title';
-          chartTitle.textContent = cfg.displayTitle || cfg.title;
-          chartHeader.appendChild(chartTitle);
-
-          // 创建右侧操作区域容器
-          const chartActions = document.createElement('div');
-          chartActions.style.display = 'flex';
-          chartActions.style.alignItems = 'center';
-          chartActions.style.gap = '16px';
-
-          // 添加数据说明图标和文字
-          if (cfg.description) {{
-            const infoIcon = document.createElement('div');
-            infoIcon.className = 'chart-info';
-            infoIcon.onclick = () => showChartInfo(cfg);
-            infoIcon.title = '说明';
-            
-            const infoIconSvg = document.createElement('div');
-            infoIconSvg.className = 'chart-info-icon';
-            infoIconSvg.innerHTML = '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="12" cy="12" r="10"></circle><line x1="12" y1="16" x2="12" y2="12"></line><line x1="12" y1="8" x2="12.01" y2="8"></line></svg>';
-            infoIcon.appendChild(infoIconSvg);
-            
-            const infoText = document.createElement('span');
-            infoText.textContent = '说明';
-            infoIcon.appendChild(infoText);
-            
-            chartActions.appendChild(infoIcon);
-          }}
-
-          // 添加下载图标和文字
-          const downloadIcon = document.createElement('div');
-          downloadIcon.className = 'chart-download';
-          downloadIcon.onclick = () => downloadChartData(cfg);
-          downloadIcon.title = '下载数据';
-          
-          const iconSvg = document.createElement('div');
-          iconSvg.className = 'chart-download-icon';
-          iconSvg.innerHTML = '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"></path><polyline points="7 10 12 15 17 10"></polyline><line x1="12" y1="15" x2="12" y2="3"></line></svg>';
-          downloadIcon.appendChild(iconSvg);
-          
-          const downloadText = document.createElement('span');
-          downloadText.textContent = '下载';
-          downloadIcon.appendChild(downloadText);
-          
-          chartActions.appendChild(downloadIcon);
-          chartHeader.appendChild(chartActions);
-
-          chartWrapper.appendChild(chartHeader);
-
-          // 添加数据说明面板
-          if (cfg.description) {{
-            const infoPanel = document.createElement('div');
-            infoPanel.id = `chart-info-panel-${{cfg.id}}`;
-            infoPanel.className = 'chart-info-panel';
-            infoPanel.innerHTML = parseDescription(cfg, cfg.description);
-            chartWrapper.appendChild(infoPanel);
-          }}
-
-          const chartContainer = document.createElement('div');
-          chartContainer.className = 'chart-container';
-          const chartDiv = document.createElement('div');
-          chartDiv.className = 'chart';
-          chartDiv.id = `plot-${{cfg.id}}`;
-          chartContainer.appendChild(chartDiv);
-          chartWrapper.appendChild(chartContainer);
+    // 当前板块的所有图表在可见状态下一次性创建，避免逐个点击才渲染；
+    // 隐藏板块在首次显示时再创建，避免在隐藏状态下绘制导致初始尺寸过小
+    // 图表在接近可视区域时才创建，板块内图表再多也只绘制看得到的部分
+    let chartMountObserver = null;
 
-          chartsContainer.appendChild(chartWrapper);
-        }});
-
-        section.appendChild(chartsContainer);
-        container.appendChild(section);
-      }});
+    function mountChart(cfg) {{
+      if (cfg && !chartInstances[cfg.id]) {{
+        createChart(cfg, `plot-${{cfg.id}}`);
+      }}
+    }}
 
-      // 仅为第一个板块创建图表，其余板块在首次点击导航时再创建，避免在隐藏状态下绘制导致初始尺寸过小
-      if (firstCategory && chartConfigs[firstCategory].length > 0) {{
-        chartConfigs[firstCategory].forEach(cfg => {{
-          createChart(cfg, `plot-${{cfg.id}}`);
-        }});
+    function observeSectionCharts(category) {{
+      const cfgs = chartConfigs[category] || [];
+      if (!window.IntersectionObserver) {{
+        cfgs.forEach(mountChart);
+        return;
       }}
-      
-      // 默认激活第一个图表的导航项
-      if (firstCategory && chartConfigs[firstCategory].length > 0) {{
-        const firstChartId = chartConfigs[firstCategory][0].id;
-        const firstNavItem = document.querySelector(`[data-chart-id="${{firstChartId}}"]`);
-        if (firstNavItem) {{
-          firstNavItem.classList.add('active');
-        }}
+      if (!chartMountObserver) {{
+        chartMountObserver = new IntersectionObserver(entries => {{
+          entries.forEach(entry => {{
+            if (!entry.isIntersecting) return;
+            chartMountObserver.unobserve(entry.target);
+            mountChart(findChartConfig(entry.target.id.slice('chart-'.length)));
+          }});
+        }}, {{ rootMargin: '600px 0px' }});
       }}
+      cfgs.forEach(cfg => {{
+        const wrapper = document.getElementById(`chart-${{cfg.id}}`);
+        if (wrapper && !chartInstances[cfg.id]) chartMountObserver.observe(wrapper);
+      }});
     }}
 
-    function buildNav() {{
-      const navRoot = document.getElementById('nav');
-      navRoot.innerHTML = '';
-
-      // 添加"浏览"标题
-      const browseTitle = document.createElement('div');
-      browseTitle.className = 'nav-browse-title';
-      browseTitle.textContent = '浏览';
-      navRoot.appendChild(browseTitle);
-
-      Object.keys(chartConfigs).forEach(category => {{
-        const sectionTitle = document.createElement('div');
-        sectionTitle.className = 'nav-section-title';
-        sectionTitle.textContent = category;
-        navRoot.appendChild(sectionTitle);
-
-        const ul = document.createElement('ul');
-        ul.className = 'nav-list';
-
-        chartConfigs[category].forEach((cfg, idx) => {{
-          const li = document.createElement('li');
-          li.className = 'nav-item';
-          li.dataset.category = category;
-          li.dataset.index = idx;
-          li.dataset.chartId = cfg.id;
-          li.onclick = () => scrollToChart(category, cfg.id);
-          
-          // 添加图标
-          const icon = document.createElement('div');
-          icon.className = 'nav-icon';
-          if (cfg.type === 'scatter') {{
-            // 散点图图标 - 分散排列，不是斜线
-            icon.innerHTML = '<svg viewBox="0 0 16 16" fill="currentColor"><circle cx="3" cy="4" r="1.5"/><circle cx="10" cy="8" r="1.5"/><circle cx="6" cy="13" r="1.5"/></svg>';
-          }} else if (cfg.type === 'bar') {{
-            // 柱状图图标（3个柱）
-            icon.innerHTML = '<svg viewBox="0 0 16 16" fill="currentColor"><rect x="3" y="8" width="2" height="6"/><rect x="7" y="3" width="2" height="11"/><rect x="11" y="6" width="2" height="8"/></svg>';
-          }} else {{
-            // 折线图图标
-            icon.innerHTML = '<svg viewBox="0 0 16 16" fill="none" stroke="currentColor" stroke-width="1.5" stroke-linecap="round" stroke-linejoin="round"><polyline points="2,12 5,8 8,10 12,4 14,6"/></svg>';
-          }}
-          li.appendChild(icon);
-          
-          // 添加文字
-          const text = document.createElement('span');
-          text.textContent = cfg.title;
-          li.appendChild(text);
-          
-          ul.appendChild(li);
-        }});
-
-        navRoot.appendChild(ul);
-      }});
+    function initSections() {{
+      const active = document.querySelector('.section.active');
+      if (active) observeSectionCharts(active.id.slice('section-'.length));
+    }}
 
-      // 添加底部操作区域
-      const footer = document.createElement('div');
-      footer.className = 'sidebar-footer';
+    // 未加载板块收到的实时更新，在板块加载时补上
+    const pendingConfigUpdates = {{}};
+    const updatedSheets = new Set();
 
-      // 下载按钮
-      const downloadBtn = document.createElement('div');
-      downloadBtn.className = 'sidebar-action';
-      downloadBtn.onclick = function(e) {{
-        e.preventDefault();
-        e.stopPropagation();
-        downloadAllData();
-      }};
-      const downloadIcon = document.createElement('div');
-      downloadIcon.className = 'sidebar-action-icon';
-      downloadIcon.innerHTML = '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"></path><polyline points="7 10 12 15 17 10"></polyline><line x1="12" y1="15" x2="12" y2="3"></line></svg>';
-      downloadIcon.style.pointerEvents = 'none';
-      downloadBtn.appendChild(downloadIcon);
-      const downloadText = document.createElement('span');
-      downloadText.textContent = '下载';
-      downloadText.style.pointerEvents = 'none';
-      downloadBtn.appendChild(downloadText);
-      footer.appendChild(downloadBtn);
-
-      // 分享按钮
-      const shareBtn = document.createElement('div');
-      shareBtn.className = 'sidebar-action';
-      shareBtn.id = 'share-button';
-      shareBtn.onclick = showShareModal;
-      const shareIcon = document.createElement('div');
-      shareIcon.className = 'sidebar-action-icon';
-      shareIcon.innerHTML = '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="18" cy="5" r="3"></circle><circle cx="6" cy="12" r="3"></circle><circle cx="18" cy="19" r="3"></circle><line x1="8.59" y1="13.51" x2="15.42" y2="17.49"></line><line x1="15.41" y1="6.51" x2="8.59" y2="10.49"></line></svg>';
-      shareBtn.appendChild(shareIcon);
-      const shareText = document.createElement('span');
-      shareText.textContent = '分享';
-      shareBtn.appendChild(shareText);
-      footer.appendChild(shareBtn);
-
-      // 将footer添加到sidebar，而不是navRoot
-      const sidebar = document.querySelector('.sidebar');
-      // 如果footer已存在，先移除
-      const existingFooter = sidebar.querySelector('.sidebar-footer');
-      if (existingFooter) {{
-        existingFooter.remove();
-      }}
-      sidebar.appendChild(footer);
-    }}
-
-    function scrollToChart(category, chartId) {{
-      // 激活状态样式
-      document.querySelectorAll('.nav-item').forEach(el => {{
-        el.classList.remove('active');
-      }});
-      document.querySelectorAll('.nav-item').forEach(el => {{
-        if (el.dataset.chartId === chartId) {{
-          el.classList.add('active');
+    shellActions.categoryLoaded = (category, cfgs) => {{
+      cfgs.forEach(cfg => {{
+        const pending = pendingConfigUpdates[cfg.id];
+        if (pending) {{
+          Object.assign(cfg, pending.config);
+          const infoPanel = document.getElementById(`chart-info-panel-${{cfg.id}}`);
+          if (infoPanel && pending.panel !== undefined) infoPanel.innerHTML = pending.panel;
+          delete pendingConfigUpdates[cfg.id];
         }}
+        if (pending || updatedSheets.has(cfg.sheet)) removePreview(`plot-${{cfg.id}}`);
       }});
+    }};
 
-      // 隐藏所有板块，只显示当前板块
-      document.querySelectorAll('.section').forEach(section => {{
-        section.classList.remove('active');
-      }});
-      
-      const targetSection = document.getElementById(`section-${{category}}`);
-      if (targetSection) {{
-        targetSection.classList.add('active');
-
-        // 当前板块的所有图表在可见状态下一次性创建，避免逐个点击才渲染
-        if (chartConfigs[category]) {{
-          chartConfigs[category].forEach(cfg => {{
-            if (!chartInstances[cfg.id]) {{
-              createChart(cfg, `plot-${{cfg.id}}`);
-            }}
-          }});
-        }}
-        
-        // 找到目标图表元素并滚动到它
-        setTimeout(() => {{
-          const targetChart = document.getElementById(`chart-${{chartId}}`);
-          const sectionCharts = targetSection.querySelector('.section-charts');
-          
-          if (targetChart && sectionCharts) {{
-            const containerRect = sectionCharts.getBoundingClientRect();
-            const chartRect = targetChart.getBoundingClientRect();
-            const scrollTop = sectionCharts.scrollTop;
-            const targetScrollTop = scrollTop + chartRect.top - containerRect.top - 20;
-            
-            sectionCharts.scrollTo({{
-              top: targetScrollTop,
-              behavior: 'smooth'
-            }});
-            
-            // 触发该板块内所有图表的resize，确保所有图表都能正确调整大小
-            if (chartConfigs[category]) {{
-              chartConfigs[category].forEach(cfg => {{
-                const chartDiv = document.getElementById(`plot-${{cfg.id}}`);
-                if (chartDiv && chartInstances[cfg.id]) {{
-                  setTimeout(() => {{
-                    Plotly.Plots.resize(`plot-${{cfg.id}}`);
-                  }}, 100);
-                }}
-              }});
-            }}
+    shellActions.sectionShown = category => {{
+      observeSectionCharts(category);
+      // 触发该板块内所有图表的resize，确保所有图表都能正确调整大小
+      setTimeout(() => {{
+        (chartConfigs[category] || []).forEach(cfg => {{
+          if (chartInstances[cfg.id]) {{
+            Plotly.Plots.resize(`plot-${{cfg.id}}`);
           }}
-        }}, 50);
-      }}
-    }}
+        }});
+      }}, 150);
+    }};
+    shellActions.view = el => {{
+      const cfg = findChartConfig(el.dataset.chartId);
+      if (cfg) setChartView(cfg, Number(el.dataset.index));
+    }};
+    shellActions.download = el => {{
+      const cfg = findChartConfig(el.dataset.chartId);
+      if (cfg) downloadChartData(cfg);
+    }};
+    shellActions['download-all'] = () => downloadAllData();
+    shellActions.share = () => showShareModal();
 
     window.addEventListener('resize', () => {{
       Object.keys(chartConfigs).forEach(category => {{
         chartConfigs[category].forEach(cfg => {{
           const chartDiv = document.getElementById(`plot-${{cfg.id}}`);
           if (chartDiv && chartInstances[cfg.id]) {{
-            Plotly.Plots.resize(`plot-${{cfg.id}}`);
+            perfSpan('resize', cfg.id, () => Plotly.Plots.resize(`plot-${{cfg.id}}`));
           }}
         }});
       }});
     }});
 
     document.addEventListener('DOMContentLoaded', () => {{
-      buildNav();
-      buildSections();
+      perfSpan('sections', null, initSections);
+      if (new URLSearchParams(window.location.search).has('perf')) {{
+        showPerfOverlay();
+      }}
       
       // 页面加载完成后，对所有图表进行一次resize，确保双坐标轴图表正确布局
       setTimeout(() => {{
@@ -2373,19 +4068,156 @@ def build_html(data_by_sheet, chart_configs):
       }}, 500);
     }});
   </script>
-</body>
+{telemetry_snippet(rum_endpoint)}</body>
 </html>
 """
-    return html
+    return page_hash
+
+
+def publish_partitions(data_by_sheet, chart_configs, freq):
+    """Write the partition files and return the page data that references them."""
+    with span("write_partitions"):
+        page_data, report = write_partitions(data_by_sheet, chart_configs, PARTITION_DIR, freq)
+    counts = {mode: sum(1 for m in report.values() if m == mode) for mode in ("unchanged", "append", "rewrite")}
+    print(
+        f"分区数据: 未变化 {counts['unchanged']} 个，追加 {counts['append']} 个，"
+        f"全量重写 {counts['rewrite']} 个 sheet"
+    )
+    return page_data
+
+
+def clone_file(src, dst):
+    """Copy-on-write clone of ``src`` at ``dst`` (Linux ``FICLONE``: btrfs, XFS); raises OSError when unsupported."""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("不支持写时复制")
+    with open(src, "rb") as source, open(dst, "wb") as target:
+        fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+
+
+def link_output(src, dst):
+    """Publish ``src`` under ``dst`` as a hard link, else a copy-on-write clone, else a plain copy."""
+    tmp = dst.with_name(dst.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        try:
+            clone_file(src, tmp)
+        except OSError:
+            shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def write_outputs(page, paths=(DASHBOARD_HTML, INDEX_HTML)):
+    """Write the page (a string or ``page_chunks``) once under the first name through a buffered
+    writer; the other names (by default index.html) share that file via ``link_output``."""
+    # dashboard.html 和 index.html 内容完全一致，只写一次；先写临时文件再原子替换，
+    # 旧的硬链接随之断开，打开中的页面不会读到写了一半的文件
+    first, *others = [Path(p) for p in paths]
+    tmp = first.with_name(first.name + ".tmp")
+    with span("write_outputs", detail=first.name) as s:
+        with open(tmp, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+            if isinstance(page, str):
+                f.write(page)
+            else:
+                for chunk in page:
+                    f.write(chunk)
+        os.replace(tmp, first)
+        if profiling_enabled():
+            s.add_bytes(first.stat().st_size)
+    for path in others:
+        with span("write_outputs", detail=path.name):
+            link_output(first, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成量化分析监控看板")
+    parser.add_argument(
+        "--watch", action="store_true", help="常驻运行：监视输入文件变化并增量重建"
+    )
+    parser.add_argument(
+        "--serve", action="store_true",
+        help="启动本地看板服务：监视输入并把变化的数据实时推送到已打开的页面",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="服务监听地址（--serve）")
+    parser.add_argument("--port", type=int, default=8000, help="服务端口（--serve）")
+    parser.add_argument(
+        "--partition", choices=["Y", "M"], default=None,
+        help="时间序列按年（Y）或月（M）分区单独发布，页面按需加载",
+    )
+    parser.add_argument(
+        "--manifest", type=Path, default=None, metavar="PATH",
+        help="按清单一次构建多个看板（各自的图表子集、标题、logo 与输出路径，见 dashboard_manifest.py）",
+    )
+    parser.add_argument(
+        "--processes", type=int, default=None,
+        help="--manifest 渲染看板使用的进程数（默认 CPU 核数，1 为单进程）",
+    )
+    parser.add_argument(
+        "--rum-endpoint", default=None, metavar="URL",
+        help="页面把渲染与交互耗时以 sendBeacon 批量发送到该地址（见 rum_collector.py）",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="即使输入、logo 与脚本都未变化也重新构建",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="记录各阶段、各 sheet 的墙钟时间、CPU 时间、峰值 RSS 与输出字节数，结束时打印汇总",
+    )
+    parser.add_argument(
+        "--trace", type=Path, default=None, metavar="PATH",
+        help="把各阶段的计时写成 Chrome trace-event JSON（隐含 --profile）",
+    )
+    parser.add_argument(
+        "--cprofile", type=Path, default=None, metavar="PATH",
+        help="同时用 cProfile 采样并写出 pstats 文件（隐含 --profile）",
+    )
+    args = parser.parse_args(argv)
+
+    if args.profile or args.trace or args.cprofile:
+        with profiling(args.trace, args.cprofile):
+            run(args)
+    else:
+        run(args)
+
+
+def run(args):
+    """Dispatch a parsed command line: serve, watch, a manifest build, or a one-shot build."""
+    if args.serve:
+        from dashboard_server import serve
+
+        serve(args.host, args.port, partition=args.partition, rum_endpoint=args.rum_endpoint)
+        return
+
+    if args.watch:
+        from dashboard_watch import watch
+
+        watch(partition=args.partition, rum_endpoint=args.rum_endpoint)
+        return
+
+    if args.manifest:
+        from dashboard_manifest import build_manifest
+
+        build_manifest(
+            args.manifest, processes=args.processes, partition=args.partition, rum_endpoint=args.rum_endpoint
+        )
+        return
 
+    # 输入、logo、脚本与输出都与上次构建一致时直接退出：此前不导入 pandas
+    started = time.perf_counter()
+    fingerprint = build_fingerprint(args.partition, args.rum_endpoint)
+    if not args.force and build_is_current(fingerprint):
+        print(f"输入未变化，跳过构建（检查耗时 {(time.perf_counter() - started) * 1000:.0f} ms）")
+        return
 
-def main():
-    data_by_sheet, chart_configs = build_data_and_config()
-    html = build_html(data_by_sheet, chart_configs)
+    from dashboard_builder import DashboardBuilder
 
-    # 同时生成 dashboard.html 和 index.html，内容完全一致
-    DASHBOARD_HTML.write_text(html, encoding="utf-8")
-    INDEX_HTML.write_text(html, encoding="utf-8")
+    DashboardBuilder.from_data(*build_data_and_config()).write(
+        partition=args.partition, rum_endpoint=args.rum_endpoint
+    )
+    record_build(fingerprint)
     print(f"已生成网页文件: {DASHBOARD_HTML}")
     print(f"已生成首页文件: {INDEX_HTML}")
 
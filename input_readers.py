@@ -0,0 +1,169 @@
+"""输入表格的读取后端：xlsx 引擎选择、按 sheet 名匹配的列式文件、列与类型裁剪。
+
+``WorkbookReader`` 通过本模块读取每个 sheet：
+
+* xlsx 按 ``XLSX_ENGINES`` 的顺序选用已安装的最快引擎（``calamine`` 需要
+  ``python-calamine``，否则退回 ``openpyxl``），也可在 ``XLSX_ENGINE`` 中指定；
+* ``INPUT_DIR`` 下与 sheet 同名的 ``.parquet`` / ``.feather`` / ``.csv`` 文件
+  优先于工作簿中的同名 sheet。把数据量大的 sheet 改为列式格式只需把文件放入
+  该目录，工作簿中的旧 sheet 可以保留也可以删除；
+* 折线图的 sheet 默认只读取日期列与图中用到的列（``chart_columns`` 由图表
+  配置推导），``SHEET_COLUMNS`` 可按 sheet 覆盖：只读取的列（列表），或列及
+  类型（``{列名: dtype}``，日期列写 ``"datetime64[ns]"``），``None`` 为读取全部
+  列。表中没有的列直接跳过，其余列不解析。CSV 中的日期列未指定类型时按原文本
+  读入。
+
+命令行用法（把工作簿中的 sheet 导出为列式文件）::
+
+    python input_readers.py export 资金图2 因子图1 --format parquet
+
+各读取后端在真实输入上的耗时对比见 ``python benchmark.py --readers``。
+"""
+from pathlib import Path
+import argparse
+import importlib.util
+
+import pandas as pd
+
+
+# xlsx 引擎按速度从快到慢排列，选用第一个已安装的
+XLSX_ENGINES = {"calamine": "python_calamine", "openpyxl": "openpyxl"}
+# 与 sheet 同名的列式 / 文本文件，按此顺序优先
+TABLE_SUFFIXES = (".parquet", ".feather", ".csv")
+# 各格式依赖的可选包
+FORMAT_MODULES = {".parquet": "pyarrow", ".feather": "pyarrow", ".csv": None}
+
+
+def installed(module):
+    """True when the optional ``module`` can be imported (None means no dependency)."""
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def available_xlsx_engines():
+    """Installed xlsx engines, fastest first."""
+    return [engine for engine, module in XLSX_ENGINES.items() if installed(module)]
+
+
+def pick_xlsx_engine(preferred=None):
+    """``preferred`` when it is installed, else the fastest installed engine."""
+    engines = available_xlsx_engines()
+    if preferred in engines:
+        return preferred
+    if preferred is not None:
+        print(f"xlsx 引擎 {preferred} 未安装，改用 {engines[0]}")
+    return engines[0]
+
+
+def table_files(input_dir):
+    """``{sheet: path}`` of the table files in ``input_dir``, by the suffix priority."""
+    files = {}
+    if input_dir is None or not Path(input_dir).is_dir():
+        return files
+    for suffix in TABLE_SUFFIXES:
+        for path in sorted(Path(input_dir).glob(f"*{suffix}")):
+            files.setdefault(path.stem, path)
+    return files
+
+
+def column_spec(spec):
+    """``(columns, dtypes)`` of one ``SHEET_COLUMNS`` entry: a column list or ``{column: dtype}``."""
+    if spec is None:
+        return None, {}
+    if isinstance(spec, dict):
+        return list(spec), {k: v for k, v in spec.items() if v is not None}
+    return list(spec), {}
+
+
+def apply_dtypes(df, dtypes):
+    for column, dtype in dtypes.items():
+        if column not in df.columns:
+            continue
+        if str(dtype).startswith("datetime64"):
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def read_table(path, sheet=None, engine=None, columns=None, dtypes=None):
+    """One table as a DataFrame: a workbook sheet, or a parquet / feather / csv file.
+
+    Only ``columns`` (when given) are parsed, those missing from the table are
+    skipped; ``dtypes`` are applied afterwards so every format yields the same
+    column types.
+    """
+    path = Path(path)
+    dtypes = dtypes or {}
+    wanted = None if columns is None else set(columns)
+    if path.suffix in (".parquet", ".feather"):
+        if wanted is not None:
+            # 只读文件头中的 schema，不读数据
+            import pyarrow.ipc
+            import pyarrow.parquet
+
+            schema = pyarrow.parquet.read_schema(path) if path.suffix == ".parquet" else pyarrow.ipc.open_file(path).schema
+            columns = [c for c in schema.names if c in wanted]
+        if path.suffix == ".parquet":
+            df = pd.read_parquet(path, columns=columns)
+        else:
+            df = pd.read_feather(path, columns=columns)
+    elif path.suffix == ".csv":
+        header = pd.read_csv(path, nrows=0).columns
+        if wanted is not None:
+            header = [c for c in header if c in wanted]
+        dates = [c for c, t in dtypes.items() if str(t).startswith("datetime64") and c in header]
+        plain = {c: t for c, t in dtypes.items() if c not in dates and c in header}
+        df = pd.read_csv(
+            path, usecols=None if wanted is None else header, dtype=plain or None, parse_dates=dates or False,
+        )
+    else:
+        # 列名在 usecols 中按名称匹配，表头为空的列名为 "Unnamed: N"
+        df = pd.read_excel(
+            path, sheet_name=sheet, engine=engine, usecols=None if wanted is None else wanted.__contains__,
+        )
+    return apply_dtypes(df, dtypes)
+
+
+def export_sheets(path, sheets, input_dir, fmt="parquet", engine=None):
+    """Write ``sheets`` of the workbook at ``path`` as ``<input_dir>/<sheet>.<fmt>``; returns the files."""
+    input_dir = Path(input_dir)
+    input_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for sheet in sheets:
+        df = read_table(path, sheet, pick_xlsx_engine(engine))
+        # 列式格式要求列名为字符串
+        df.columns = [str(c) for c in df.columns]
+        target = input_dir / f"{sheet}.{fmt}"
+        if fmt == "parquet":
+            df.to_parquet(target, index=False)
+        elif fmt == "feather":
+            df.to_feather(target)
+        else:
+            df.to_csv(target, index=False)
+        written.append(target)
+    return written
+
+
+def main(argv=None):
+    import generate_dashboard as gd
+
+    parser = argparse.ArgumentParser(description="看板输入表格的读取后端")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_cmd = commands.add_parser("export", help="把工作簿中的 sheet 导出到输入目录，之后优先读取导出的文件")
+    export_cmd.add_argument("sheets", nargs="+", help="sheet 名称")
+    export_cmd.add_argument("--format", choices=["parquet", "feather", "csv"], default="parquet")
+    export_cmd.add_argument("--input-dir", type=Path, default=gd.INPUT_DIR)
+    args = parser.parse_args(argv)
+
+    books = [gd.EXCEL_PATH, gd.PBROE_PATH, gd.FUND_PATH, gd.PBROE_STOCK_PATH, gd.ALLOCATION_PRICE_PATH]
+    names = {path: pd.ExcelFile(path).sheet_names for path in books if path.exists()}
+    for sheet in args.sheets:
+        path = next((p for p, sheets in names.items() if sheet in sheets), None)
+        if path is None:
+            raise SystemExit(f"输入工作簿中没有 sheet: {sheet}")
+        for target in export_sheets(path, [sheet], args.input_dir, args.format, gd.XLSX_ENGINE):
+            print(f"已导出 {path.name}/{sheet} -> {target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""延迟导入：模块在首次访问其属性时才真正加载。
+
+pandas / numpy 的导入本身就要数百毫秒；输入未变化时构建直接退出，不应为此
+付出导入开销。``lazy_import`` 先在 ``sys.modules`` 中登记一个占位模块，之后
+各模块的 ``import pandas as pd`` 拿到的都是它，直到第一次使用属性时才执行真正
+的导入，占位模块随即换成真实模块（已持有占位模块的引用照常可用）。
+
+不使用 ``importlib.util.LazyLoader``：``import`` 语句会检查模块的
+``__spec__``，LazyLoader 在这一步就会触发加载。
+"""
+import importlib
+import importlib.util
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Placeholder that imports the real module on first attribute access."""
+
+    def __init__(self, name, spec):
+        super().__init__(name)
+        self.__spec__ = spec
+
+    def __getattr__(self, attr):
+        module = self.__dict__.get("_lazy_target")
+        if module is None:
+            name = self.__name__
+            if sys.modules.get(name) is self:
+                del sys.modules[name]
+            module = importlib.import_module(name)
+            self.__dict__.update(module.__dict__)
+            self._lazy_target = module
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """``name`` as a module imported on first attribute access (the real one if already loaded)."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    module = sys.modules[name] = LazyModule(name, spec)
+    return module
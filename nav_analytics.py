@@ -0,0 +1,100 @@
+"""净值分析：回撤、滚动波动率 / 夏普、相对基准超额与区间统计。
+
+所有函数都接受 (T, K) 的净值矩阵，一次向量化计算全部序列；缺失值
+（各序列起止日期不同）按 NaN 处理，不会影响其他列。
+"""
+import numpy as np
+import pandas as pd
+
+
+PERIODS_PER_YEAR = 252
+
+
+def _as_matrix(nav):
+    values = np.asarray(nav, dtype=float)
+    return values[:, None] if values.ndim == 1 else values
+
+
+def period_returns(nav):
+    """Simple returns per period; the first row and gaps are NaN."""
+    values = _as_matrix(nav)
+    rets = np.full(values.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rets[1:] = values[1:] / values[:-1] - 1.0
+    return rets
+
+
+def drawdown(nav):
+    """Drawdown from the running peak (0 at new highs, positive below)."""
+    values = _as_matrix(nav)
+    filled = pd.DataFrame(values).ffill().to_numpy()
+    peak = np.fmax.accumulate(filled, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dd = 1.0 - filled / peak
+    dd[np.isnan(values)] = np.nan
+    return dd
+
+
+def rolling_mean_std(values, window):
+    """NaN-aware rolling mean and sample std; NaN until a full window of data."""
+    values = _as_matrix(values)
+    valid = np.isfinite(values)
+    x = np.where(valid, values, 0.0)
+
+    def window_sum(a):
+        c = np.zeros((a.shape[0] + 1, a.shape[1]))
+        np.cumsum(a, axis=0, out=c[1:])
+        out = np.full(a.shape, np.nan)
+        out[window - 1:] = c[window:] - c[:-window]
+        return out
+
+    n = window_sum(valid.astype(float))
+    s1 = window_sum(x)
+    s2 = window_sum(x * x)
+    full = n >= window
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(full, s1 / n, np.nan)
+        var = np.where(full, (s2 - n * mean * mean) / (n - 1), np.nan)
+    return mean, np.sqrt(np.clip(var, 0.0, None))
+
+
+def rolling_vol_sharpe(nav, window, periods=PERIODS_PER_YEAR):
+    """Annualized rolling volatility and Sharpe ratio (zero risk-free rate)."""
+    mean, std = rolling_mean_std(period_returns(nav), window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = mean / std * np.sqrt(periods)
+    return std * np.sqrt(periods), sharpe
+
+
+def excess_nav(nav, benchmark):
+    """Relative NAV of every column against ``benchmark``, rebased to 1 at its first valid row."""
+    values = _as_matrix(nav)
+    bench = np.asarray(benchmark, dtype=float).reshape(-1, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = values / bench
+    first = pd.DataFrame(ratio).bfill().to_numpy()[0]
+    return ratio / first
+
+
+def summarize_nav(nav, periods=PERIODS_PER_YEAR):
+    """Annualized return / volatility / Sharpe and max drawdown.
+
+    Returns scalars for a 1-D NAV and arrays (one entry per column) for a matrix.
+    """
+    values = _as_matrix(nav)
+    rets = period_returns(values)
+    count = np.sum(np.isfinite(rets), axis=0)
+
+    frame = pd.DataFrame(values)
+    first = frame.bfill().to_numpy()[0]
+    last = frame.ffill().to_numpy()[-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ann_ret = (last / first) ** (periods / count) - 1.0
+        ann_vol = np.nanstd(rets, axis=0, ddof=1) * np.sqrt(periods)
+        sharpe = ann_ret / ann_vol
+    max_dd = np.nanmax(drawdown(values), axis=0)
+
+    stats = {"年化收益": ann_ret, "年化波动": ann_vol, "夏普比率": sharpe, "最大回撤": max_dd}
+    if np.ndim(nav) == 1:
+        return {k: v[0] for k, v in stats.items()}
+    return stats
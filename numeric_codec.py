@@ -0,0 +1,112 @@
+"""页面内嵌数值的差分编码。
+
+净值、指数收盘价等平滑序列按完整的浮点 repr 序列化（``1.0234567891234``）。
+``chart_configs`` 中图表或线条上设置 ``"encoding": "delta"`` 的数值列在内嵌前
+编码为定点整数的差分 ``{"__delta__": [小数位, 首值, 差分, ...]}``（缺失值为
+null，不参与累加）：平滑序列的相邻差分只有几位数字，页面逐项累加后除以 10
+的幂即得与编码前完全相同的浮点数。
+
+编码是无损的：只有原值能按不超过 ``MAX_PRECISION`` 位小数精确表示的列才
+编码，否则保持原样。页面内的数据同时用于绘图与 CSV / xlsx 下载，因此不做
+任何舍入。
+"""
+import math
+
+from lazy_modules import lazy_import
+from partition_store import PAGE_KEY as PARTITION_KEY
+
+np = lazy_import("numpy")
+
+
+MAX_PRECISION = 12
+# 定点整数需在 JS 安全整数范围内
+MAX_SAFE_INTEGER = 2 ** 53 - 1
+DELTA_KEY = "__delta__"
+
+
+def delta_columns(chart_configs):
+    """``{(sheet, field)}`` of every plotted field whose chart or line sets ``"encoding": "delta"``."""
+    columns = set()
+    for cfgs in chart_configs.values():
+        for cfg in cfgs:
+            if cfg.get("type") in ("scatter", "bar"):
+                continue
+            for line in cfg.get("lines", []):
+                if line.get("encoding", cfg.get("encoding")) == "delta":
+                    columns.add((cfg["sheet"], line["field"]))
+            # 分析视图（回撤、滚动指标等）不继承图表级设置，只看视图与线条自身
+            for view in cfg.get("views") or []:
+                for line in view.get("lines") or []:
+                    if line.get("encoding", view.get("encoding")) == "delta":
+                        columns.add((view.get("sheet") or cfg["sheet"], line["field"]))
+    return columns
+
+
+def _numeric(values):
+    """Float array of a column (NaN for missing) or None when it holds anything but numbers."""
+    for v in values:
+        if v is not None and (isinstance(v, bool) or not isinstance(v, (int, float))):
+            return None
+    if all(v is None or isinstance(v, int) for v in values):
+        # 整数列本就紧凑
+        return None
+    return np.array([math.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def scaled_integers(values):
+    """``(digits, ints)``: the column as exact fixed-point integers with the fewest digits, or None."""
+    arr = _numeric(values)
+    if arr is None:
+        return None
+    valid = ~np.isnan(arr)
+    if not valid.any():
+        return None
+    values = arr[valid]
+    for digits in range(MAX_PRECISION + 1):
+        scale = 10.0 ** digits
+        ints = np.rint(values * scale)
+        if np.abs(ints).max() > MAX_SAFE_INTEGER:
+            return None
+        if np.array_equal(ints / scale, values):
+            return digits, ints
+    return None
+
+
+def encode_column(values):
+    """The column as ``{"__delta__": [...]}``; unchanged when it is not exactly representable."""
+    scaled = scaled_integers(values)
+    if scaled is None:
+        return values
+    digits, ints = scaled
+    valid = [v is not None and not (isinstance(v, float) and math.isnan(v)) for v in values]
+    deltas = iter(np.diff(ints.astype(np.int64), prepend=0).tolist())
+    return {DELTA_KEY: [digits] + [next(deltas) if ok else None for ok in valid]}
+
+
+def encode_page_numbers(page_data, chart_configs):
+    """``page_data`` with the plotted numeric columns that opt in delta encoded; records sheets that
+    have such columns become column-wise. Sheets already replaced by partition indexes are left alone."""
+    by_sheet = {}
+    for sheet, field in delta_columns(chart_configs):
+        by_sheet.setdefault(sheet, []).append(field)
+    out = dict(page_data)
+    for sheet, fields in by_sheet.items():
+        data = page_data.get(sheet)
+        if isinstance(data, list) and data:
+            columns = {str(k): [rec.get(k) for rec in data] for k in data[0]}
+        elif isinstance(data, dict) and data and PARTITION_KEY not in data:
+            columns = dict(data)
+        else:
+            continue
+        changed = False
+        for field in fields:
+            values = columns.get(field)
+            if not isinstance(values, list):
+                continue
+            encoded = encode_column(values)
+            if encoded is not values:
+                columns[field] = encoded
+                changed = True
+        if changed:
+            out[sheet] = columns
+    return out
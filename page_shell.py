@@ -0,0 +1,271 @@
+"""页面外壳的服务端预渲染：侧边导航、各板块图表框架与数据说明面板。
+
+这些结构只取决于图表配置，构建时一次生成静态 HTML，页面无需在加载时逐个
+``createElement``；说明文字中各线条对应的颜色也在构建时确定。页面端只用一个
+委托的点击监听处理 ``data-action`` 元素，导航与板块切换在图表脚本运行前即可使用。
+
+图表数量很多时页面规模保持不变：导航是固定行高的虚拟列表，只预渲染首屏的行；
+只有首个板块的结构随页面加载，其余板块的配置与结构放在惰性的 JSON 块中，
+首次显示时才解析插入。
+"""
+from html import escape
+import json
+import re
+
+
+INFO_ICON = (
+    '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" '
+    'stroke-linejoin="round"><circle cx="12" cy="12" r="10"></circle><line x1="12" y1="16" x2="12" y2="12">'
+    '</line><line x1="12" y1="8" x2="12.01" y2="8"></line></svg>'
+)
+DOWNLOAD_ICON = (
+    '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" '
+    'stroke-linejoin="round"><path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"></path>'
+    '<polyline points="7 10 12 15 17 10"></polyline><line x1="12" y1="15" x2="12" y2="3"></line></svg>'
+)
+SHARE_ICON = (
+    '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" '
+    'stroke-linejoin="round"><circle cx="18" cy="5" r="3"></circle><circle cx="6" cy="12" r="3"></circle>'
+    '<circle cx="18" cy="19" r="3"></circle><line x1="8.59" y1="13.51" x2="15.42" y2="17.49"></line>'
+    '<line x1="15.41" y1="6.51" x2="8.59" y2="10.49"></line></svg>'
+)
+NAV_ICONS = {
+    # 散点图图标 - 分散排列，不是斜线
+    "scatter": (
+        '<svg viewBox="0 0 16 16" fill="currentColor"><circle cx="3" cy="4" r="1.5"/>'
+        '<circle cx="10" cy="8" r="1.5"/><circle cx="6" cy="13" r="1.5"/></svg>'
+    ),
+    # 柱状图图标（3个柱）
+    "bar": (
+        '<svg viewBox="0 0 16 16" fill="currentColor"><rect x="3" y="8" width="2" height="6"/>'
+        '<rect x="7" y="3" width="2" height="11"/><rect x="11" y="6" width="2" height="8"/></svg>'
+    ),
+    # 折线图图标
+    "line": (
+        '<svg viewBox="0 0 16 16" fill="none" stroke="currentColor" stroke-width="1.5" stroke-linecap="round" '
+        'stroke-linejoin="round"><polyline points="2,12 5,8 8,10 12,4 14,6"/></svg>'
+    ),
+}
+
+# 虚拟导航列表的固定行高（像素），页面按此计算可见行
+NAV_ITEM_HEIGHT = 38
+NAV_TITLE_HEIGHT = 44
+# 构建时预渲染的导航行数，覆盖首屏
+NAV_PRERENDER_ROWS = 40
+
+DEFAULT_COLOR = "#005bac"
+BENCHMARK_COLOR = "#FFCB05"
+BAR_COLORS = {
+    "普通股票型": "#005bac",
+    "偏股混合型": "#FFCB05",
+    "灵活配置型": "#B6E880",
+    "指数增强型": "#FFABAB",
+}
+CHART_LINE_COLORS = {
+    ("fund2", "上轨80分位数"): "#FFABAB",
+    ("fund2", "下轨20分位数"): "#B6E880",
+    ("asset1", "低波组合"): "#B6E880",
+    ("asset1", "中波组合"): "#005bac",
+}
+BENCHMARK_NAMES = {"基准", "Wind全A收盘价（右轴）", "Wind全A收盘价", "上证综指"}
+# 说明文字中的颜色提示，如（蓝色）、(右轴)
+COLOR_HINT = re.compile(r"（[^）]+）|\([^)]+\)")
+
+
+def line_color(cfg, name):
+    """Legend color of one line (or bar category) of a chart, as drawn by the page."""
+    if cfg.get("type") == "bar" and cfg.get("id") in ("fund_market1", "fund_market2"):
+        return BAR_COLORS.get(name, DEFAULT_COLOR)
+    color = CHART_LINE_COLORS.get((cfg.get("id"), name))
+    if color:
+        return color
+    return BENCHMARK_COLOR if name in BENCHMARK_NAMES else DEFAULT_COLOR
+
+
+def _described_line(lines, text, label):
+    """Line a description bullet refers to: exact label, then contained name, then either-way containment."""
+    names = [line["name"] for line in lines]
+    for name in names:
+        if label == name:
+            return name
+    for name in names:
+        if name in label or name in text:
+            return name
+    for name in names:
+        if label in name or name in label:
+            return name
+    return None
+
+
+def description_html(cfg):
+    """Info panel markup for ``cfg["description"]``; bullet lines get the matching line's color swatch."""
+    description = cfg.get("description")
+    if not description:
+        return ""
+    parts = []
+    for line in description.split("\n"):
+        stripped = line.strip()
+        if not stripped:
+            parts.append("<br>")
+            continue
+        if not stripped.startswith("•"):
+            parts.append(f'<div class="info-line"><span class="info-text">{escape(line, quote=False)}</span></div>')
+            continue
+        text = stripped[1:].strip()
+        colon = text.find("：")
+        label = text[:colon].strip() if colon > 0 else text
+        color = None
+        if cfg.get("lines") is not None:
+            name = _described_line(cfg["lines"], text, label)
+            if name is not None:
+                color = line_color(cfg, name)
+        elif cfg.get("type") == "bar":
+            color = line_color(cfg, label)
+        if color:
+            clean = escape(COLOR_HINT.sub("", text).strip(), quote=False)
+            parts.append(
+                f'<div class="info-line"><span class="color-indicator" style="background-color: {color}"></span>'
+                f'<span class="info-text">{clean}</span></div>'
+            )
+        else:
+            parts.append(f'<div class="info-line"><span class="info-text">{escape(text, quote=False)}</span></div>')
+    return "".join(parts)
+
+
+def description_panels(chart_configs):
+    """``{chart id: info panel markup}`` for every chart with a description."""
+    return {
+        cfg["id"]: description_html(cfg)
+        for cfgs in chart_configs.values()
+        for cfg in cfgs
+        if cfg.get("description")
+    }
+
+
+def nav_index(chart_configs):
+    """Compact navigation data for the page: ``[[category, [[id, title, type], ...]], ...]``."""
+    return [
+        [category, [[cfg["id"], cfg["title"], cfg.get("type") or "line"] for cfg in cfgs]]
+        for category, cfgs in chart_configs.items()
+    ]
+
+
+def nav_row_html(category, idx=None, cfg_id=None, title=None, kind=None, active=False):
+    """One row of the virtual navigation list: a category title, or a chart item when ``cfg_id`` is set."""
+    cat = escape(category)
+    if cfg_id is None:
+        return f'<div class="nav-section-title">{cat}</div>'
+    return (
+        f'<div class="nav-item{" active" if active else ""}" data-action="nav" data-category="{cat}" '
+        f'data-index="{idx}" data-chart-id="{escape(cfg_id)}">'
+        f'<div class="nav-icon">{NAV_ICONS.get(kind, NAV_ICONS["line"])}</div><span>{escape(title)}</span></div>'
+    )
+
+
+def nav_html(chart_configs):
+    """Sidebar navigation: browse title, search box and the virtual list with its first rows prerendered.
+
+    Rows have fixed heights (``NAV_TITLE_HEIGHT`` / ``NAV_ITEM_HEIGHT``) so the page can size the list
+    and render only the rows in view; the first chart starts active.
+    """
+    rows, height = [], 0
+    for category, charts in nav_index(chart_configs):
+        rows.append((category,))
+        height += NAV_TITLE_HEIGHT
+        for idx, (cfg_id, title, kind) in enumerate(charts):
+            rows.append((category, idx, cfg_id, title, kind, len(rows) == 1))
+            height += NAV_ITEM_HEIGHT
+    window = "".join(nav_row_html(*row) for row in rows[:NAV_PRERENDER_ROWS])
+    return (
+        '<div class="nav-browse-title">浏览</div>'
+        '<input class="nav-search" id="nav-search" type="search" placeholder="搜索图表" autocomplete="off">'
+        f'<div class="nav-virtual" style="height: {height}px"><div class="nav-window">{window}</div></div>'
+    )
+
+
+def sidebar_footer_html():
+    """Download-all and share buttons under the navigation."""
+    return (
+        '<div class="sidebar-footer">'
+        '<div class="sidebar-action" data-action="download-all">'
+        f'<div class="sidebar-action-icon" style="pointer-events: none;">{DOWNLOAD_ICON}</div>'
+        '<span style="pointer-events: none;">下载</span></div>'
+        '<div class="sidebar-action" id="share-button" data-action="share">'
+        f'<div class="sidebar-action-icon">{SHARE_ICON}</div><span>分享</span></div>'
+        "</div>"
+    )
+
+
+def _chart_html(cfg, panels, previews):
+    chart_id = escape(cfg["id"])
+    actions = []
+    views = cfg.get("views") or []
+    if len(views) > 1:
+        active_view = cfg.get("activeView") or 0
+        options = "".join(
+            f'<div class="chart-view-option{" active" if index == active_view else ""}" data-action="view" '
+            f'data-chart-id="{chart_id}" data-index="{index}">{escape(view["label"])}</div>'
+            for index, view in enumerate(views)
+        )
+        actions.append(f'<div class="chart-view-switch" id="chart-views-{chart_id}">{options}</div>')
+    if cfg.get("description"):
+        actions.append(
+            f'<div class="chart-info" title="说明" data-action="info" data-chart-id="{chart_id}">'
+            f'<div class="chart-info-icon">{INFO_ICON}</div><span>说明</span></div>'
+        )
+    actions.append(
+        f'<div class="chart-download" title="下载数据" data-action="download" data-chart-id="{chart_id}">'
+        f'<div class="chart-download-icon">{DOWNLOAD_ICON}</div><span>下载</span></div>'
+    )
+    panel = ""
+    if cfg.get("description"):
+        panel = f'<div id="chart-info-panel-{chart_id}" class="chart-info-panel">{panels[cfg["id"]]}</div>'
+    return (
+        f'<div class="chart-wrapper" id="chart-{chart_id}"><div class="chart-header">'
+        f'<div class="chart-title">{escape(cfg.get("displayTitle") or cfg["title"])}</div>'
+        f'<div style="display: flex; align-items: center; gap: 16px;">{"".join(actions)}</div></div>'
+        f'{panel}<div class="chart-container"><div class="chart" id="plot-{chart_id}">{previews.get(cfg["id"], "")}</div></div></div>'
+    )
+
+
+def section_html(category, cfgs, panels, previews=None, active=False):
+    """One category's section: every chart's header, info panel and plot container.
+
+    ``previews`` (``{chart id: markup}``) fills the plot containers until the charts are created.
+    """
+    cat = escape(category)
+    charts = "".join(_chart_html(cfg, panels, previews or {}) for cfg in cfgs)
+    return (
+        f'<div class="section{" active" if active else ""}" id="section-{cat}"><div class="section-title">{cat}</div>'
+        f'<div class="section-charts">{charts}</div></div>'
+    )
+
+
+def sections_html(chart_configs, panels=None, previews=None):
+    """Markup of the first (initially shown) section; the others ship in ``category_chunks_html``."""
+    if panels is None:
+        panels = description_panels(chart_configs)
+    for category, cfgs in chart_configs.items():
+        return section_html(category, cfgs, panels, previews, active=True)
+    return ""
+
+
+def _script_json(value):
+    # 内嵌在 <script> 中，避免 "</script>" 提前结束标签
+    return json.dumps(value, ensure_ascii=False).replace("</", "<\\/")
+
+
+def category_chunks_html(chart_configs, panels=None, previews=None):
+    """Inert JSON blocks ``#category-chunk-<n>`` holding the configs and section markup of every
+    category after the first; the page parses one only when its category is first shown."""
+    if panels is None:
+        panels = description_panels(chart_configs)
+    chunks = []
+    for index, (category, cfgs) in enumerate(chart_configs.items()):
+        if index == 0:
+            continue
+        chunk = {"configs": cfgs, "html": section_html(category, cfgs, panels, previews)}
+        chunks.append(
+            f'<script type="application/json" id="category-chunk-{index}">{_script_json(chunk)}</script>'
+        )
+    return "\n".join(chunks)
@@ -0,0 +1,141 @@
+"""按时间分区发布时间序列：历史按年（或月）切成不可变分区，最新一期为"热"分区。
+
+每个分区是一个列式 JSON 文件，文件名含内容哈希，浏览器可以长期缓存；页面
+只内嵌分区索引，绘图时再按需加载。每日追加数据时只有最新一期（以及跨期时
+刚封存的上一期）需要重写；若已封存的历史分区内容发生变化（数据修订），则
+整张 sheet 全量重写，并清理不再引用的旧文件。
+
+目录结构::
+
+    分区数据/
+        manifest.json               # {sheet: {"folder", "columns", "partitions": [{key, hash, rows, ...}]}}
+        <folder>/2019-<hash>.json   # {列名: [值, ...]}
+"""
+from pathlib import Path
+import hashlib
+import json
+import math
+
+from column_store import time_series_sheets
+
+
+MANIFEST = "manifest.json"
+# 页面中分区 sheet 的占位结构使用的键
+PAGE_KEY = "__partitions__"
+KEY_LENGTH = {"Y": 4, "M": 7}
+
+
+def _json_value(v):
+    # 分区文件由 JSON.parse 解析，不接受 NaN / Infinity
+    return None if isinstance(v, float) and not math.isfinite(v) else v
+
+
+def sheet_columns(data):
+    """Column-oriented ``{name: list}`` view of a records or columnar sheet."""
+    if isinstance(data, dict):
+        return {str(k): [_json_value(v) for v in values] for k, values in data.items()}
+    names = list(data[0]) if data else []
+    return {str(k): [_json_value(rec.get(k)) for rec in data] for k in names}
+
+
+def split_partitions(columns, x_field, freq):
+    """Split sorted columns into per-period chunks; None if the dates are not ascending."""
+    x = [str(v) for v in columns[x_field]]
+    if any(b < a for a, b in zip(x, x[1:])):
+        return None
+    keys = [v[:KEY_LENGTH[freq]] for v in x]
+    bounds = [0] + [i for i in range(1, len(keys)) if keys[i] != keys[i - 1]] + [len(keys)]
+    parts = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        text = json.dumps(
+            {name: values[lo:hi] for name, values in columns.items()},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        parts.append({
+            "key": keys[lo],
+            "hash": hashlib.sha1(text.encode("utf-8")).hexdigest()[:10],
+            "rows": hi - lo,
+            "start": x[lo],
+            "end": x[hi - 1],
+            "text": text,
+        })
+    return parts
+
+
+def is_append_only(previous, columns, parts):
+    """True when every sealed (non-tail) partition of the previous build is unchanged."""
+    if previous is None or previous["columns"] != list(columns):
+        return False
+    sealed = previous["partitions"][:-1]
+    if len(parts) < len(previous["partitions"]):
+        return False
+    return all(
+        old["key"] == new["key"] and old["hash"] == new["hash"]
+        for old, new in zip(sealed, parts)
+    )
+
+
+def write_partitions(data_by_sheet, chart_configs, root, freq="Y"):
+    """Publish time-series sheets as partition files under ``root``.
+
+    Returns ``(page_data, report)``: ``page_data`` is ``data_by_sheet`` with each
+    partitioned sheet replaced by its partition index, ``report`` maps each
+    sheet to "unchanged", "append" or "rewrite".
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    manifest_path = root / MANIFEST
+    old_manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
+
+    page_data = dict(data_by_sheet)
+    manifest = {}
+    report = {}
+    for sheet, x_field in time_series_sheets(chart_configs).items():
+        if sheet not in data_by_sheet:
+            continue
+        columns = sheet_columns(data_by_sheet[sheet])
+        if x_field not in columns or not columns[x_field]:
+            continue
+        parts = split_partitions(columns, x_field, freq)
+        if parts is None:
+            continue
+
+        folder_name = hashlib.sha1(sheet.encode("utf-8")).hexdigest()[:8]
+        folder = root / folder_name
+        folder.mkdir(exist_ok=True)
+        previous = old_manifest.get(sheet)
+        if previous is not None and [p["hash"] for p in previous["partitions"]] == [p["hash"] for p in parts]:
+            report[sheet] = "unchanged"
+        elif is_append_only(previous, columns, parts):
+            report[sheet] = "append"
+        else:
+            report[sheet] = "rewrite"
+
+        # 文件名即内容哈希：追加时只有热分区（跨期时还有刚封存的上一期）是新文件；
+        # 历史被修订时整张 sheet 全部重写
+        for part in parts:
+            path = folder / f"{part['key']}-{part['hash']}.json"
+            if report[sheet] == "rewrite" or not path.exists():
+                path.write_text(part["text"], encoding="utf-8")
+        files = {f"{part['key']}-{part['hash']}.json" for part in parts}
+        for path in folder.glob("*.json"):
+            if path.name not in files:
+                path.unlink()
+
+        index = [{k: v for k, v in part.items() if k != "text"} for part in parts]
+        manifest[sheet] = {"folder": folder_name, "columns": list(columns), "partitions": index}
+        page_data[sheet] = {
+            PAGE_KEY: [
+                {
+                    "url": f"{root.name}/{folder_name}/{part['key']}-{part['hash']}.json",
+                    "start": part["start"],
+                    "end": part["end"],
+                    "rows": part["rows"],
+                }
+                for part in index
+            ]
+        }
+
+    manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+    return page_data, report
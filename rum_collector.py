@@ -0,0 +1,174 @@
+"""真实用户性能数据的采集与汇总。
+
+页面以 ``--rum-endpoint`` 构建后，会把各图表的解码、构建、绘制、resize、
+归一化耗时和长任务按批通过 ``navigator.sendBeacon`` 发送到该地址。本模块提供：
+
+* ``serve``：本地采集服务，收到的每个 beacon 追加为 JSONL 文件中的一行；
+* ``report``：按数据版本（构建哈希）与图表汇总各阶段耗时的 p50 / p95 / p99。
+
+命令行用法::
+
+    python rum_collector.py serve --port 8010 --out 性能数据.jsonl
+    python generate_dashboard.py --rum-endpoint http://127.0.0.1:8010/rum
+    python rum_collector.py report 性能数据.jsonl [--build <哈希>] [--json]
+"""
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import argparse
+import json
+import math
+import threading
+
+
+RUM_PATH = "/rum"
+DEFAULT_LOG = Path(__file__).resolve().parent / "性能数据.jsonl"
+# 单个 beacon 的大小上限；浏览器的 sendBeacon 上限约 64KB
+MAX_BEACON_BYTES = 256 * 1024
+
+
+def make_handler(log_path, lock):
+    class CollectorHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _cors(self):
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
+            self.send_header("Access-Control-Allow-Headers", "Content-Type")
+
+        def do_OPTIONS(self):
+            self.send_response(204)
+            self._cors()
+            self.end_headers()
+
+        def do_POST(self):
+            if self.path.split("?", 1)[0] != RUM_PATH:
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length <= 0 or length > MAX_BEACON_BYTES:
+                self.send_error(413 if length > 0 else 400, "Bad beacon size")
+                return
+            try:
+                beacon = json.loads(self.rfile.read(length).decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                self.send_error(400, "Bad beacon")
+                return
+            if not isinstance(beacon, dict) or not isinstance(beacon.get("entries"), list):
+                self.send_error(400, "Bad beacon")
+                return
+            beacon["received"] = datetime.now().isoformat(timespec="seconds")
+            line = json.dumps(beacon, ensure_ascii=False) + "\n"
+            with lock:
+                with open(log_path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            self.send_response(204)
+            self._cors()
+            self.end_headers()
+
+    return CollectorHandler
+
+
+def serve(host="127.0.0.1", port=8010, log_path=DEFAULT_LOG):
+    """Accept beacons on ``RUM_PATH`` and append each as one JSON line to ``log_path``."""
+    server = ThreadingHTTPServer((host, port), make_handler(Path(log_path), threading.Lock()))
+    server.daemon_threads = True
+    print(f"性能数据采集已启动: http://{host}:{port}{RUM_PATH} -> {log_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def read_beacons(log_path):
+    """Beacons from a JSONL log; lines that fail to parse (e.g. a torn last write) are skipped."""
+    beacons = []
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                beacons.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return beacons
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile, matching the page's own summary."""
+    if not sorted_values:
+        return math.nan
+    i = min(len(sorted_values) - 1, max(0, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[i]
+
+
+def summarize(beacons, build=None):
+    """Rows of ``{build, chart, stage, count, sessions, p50, p95, p99, max}`` sorted by build, chart, stage."""
+    groups = {}
+    for beacon in beacons:
+        if build and beacon.get("build") != build:
+            continue
+        for entry in beacon.get("entries", []):
+            try:
+                stage, chart, duration = entry
+            except (TypeError, ValueError):
+                continue
+            group = groups.setdefault((beacon.get("build"), chart or "", stage), ([], set()))
+            group[0].append(float(duration))
+            group[1].add(beacon.get("session"))
+    rows = []
+    for (build_hash, chart, stage), (durations, sessions) in sorted(groups.items(), key=lambda g: tuple(map(str, g[0]))):
+        durations.sort()
+        rows.append({
+            "build": build_hash,
+            "chart": chart,
+            "stage": stage,
+            "count": len(durations),
+            "sessions": len(sessions),
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+            "p99": percentile(durations, 99),
+            "max": durations[-1],
+        })
+    return rows
+
+
+def print_report(rows):
+    print(f"{'版本':<14} {'图表':<16} {'阶段':<10} {'次数':>6} {'会话':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'最大':>9}")
+    for row in rows:
+        print(
+            f"{str(row['build']):<14} {row['chart'] or '-':<16} {row['stage']:<10} "
+            f"{row['count']:>6} {row['sessions']:>5} {row['p50']:>9.1f} {row['p95']:>9.1f} "
+            f"{row['p99']:>9.1f} {row['max']:>9.1f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="看板真实用户性能数据采集与汇总")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_cmd = commands.add_parser("serve", help="启动本地采集服务")
+    serve_cmd.add_argument("--host", default="127.0.0.1")
+    serve_cmd.add_argument("--port", type=int, default=8010)
+    serve_cmd.add_argument("--out", type=Path, default=DEFAULT_LOG, help="追加写入的 JSONL 文件")
+
+    report_cmd = commands.add_parser("report", help="按版本与图表汇总 p50/p95/p99（毫秒）")
+    report_cmd.add_argument("log", type=Path, nargs="?", default=DEFAULT_LOG)
+    report_cmd.add_argument("--build", default=None, help="只看某个数据版本（构建哈希）")
+    report_cmd.add_argument("--json", action="store_true", help="输出 JSON")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        serve(args.host, args.port, args.out)
+        return
+
+    rows = summarize(read_beacons(args.log), args.build)
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=1))
+    else:
+        print_report(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""图表检索的倒排索引：构建时生成，页面内即时过滤导航。
+
+索引覆盖图表标题、完整标题、板块名、线条名称、视图名称与数据说明。中文没有
+空格分隔，按连续汉字的单字与相邻二字切分（二元组切分），无需词典；查询同样
+切成相邻二字，包含全部二字的图表即为命中。字母数字按连续片段切分，查询时按
+前缀匹配。页面中的
+``queryTerms`` 以相同规则切分查询，各查询词的命中集合取交集。
+"""
+import re
+import unicodedata
+
+
+CJK_RANGES = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+RUN = re.compile(f"[{CJK_RANGES}]+|[0-9a-z]+")
+CJK_CHAR = re.compile(f"[{CJK_RANGES}]")
+
+
+def normalize(text):
+    """Full-width to half-width and lower case, matching ``normalize('NFKC').toLowerCase()`` in the page."""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def index_terms(text):
+    """Terms a document is indexed under: CJK unigrams and bigrams, whole alphanumeric runs."""
+    terms = set()
+    for run in RUN.findall(normalize(text)):
+        if CJK_CHAR.match(run):
+            terms.update(run)
+            terms.update(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            terms.add(run)
+    return terms
+
+
+def query_terms(text):
+    """Terms a query must all match: CJK bigrams (a lone character as itself), alphanumeric prefixes."""
+    terms = []
+    for run in RUN.findall(normalize(text)):
+        if CJK_CHAR.match(run) and len(run) > 1:
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            terms.append(run)
+    return terms
+
+
+def chart_text(category, cfg):
+    """Searchable text of one chart."""
+    parts = [category, cfg.get("title", ""), cfg.get("displayTitle", ""), cfg.get("description", "")]
+    parts += [line["name"] for line in cfg.get("lines", [])]
+    parts += [view["label"] for view in cfg.get("views", [])]
+    return "\n".join(p for p in parts if p)
+
+
+def build_search_index(chart_configs):
+    """``{term: [doc, ...]}``; charts are numbered in navigation order across categories."""
+    postings = {}
+    doc = 0
+    for category, cfgs in chart_configs.items():
+        for cfg in cfgs:
+            for term in index_terms(chart_text(category, cfg)):
+                postings.setdefault(term, []).append(doc)
+            doc += 1
+    return dict(sorted(postings.items()))
+
+
+def search(index, query):
+    """Docs matching every query term, in navigation order (the page's search, for checking)."""
+    hits = None
+    for term in query_terms(query):
+        if CJK_CHAR.match(term):
+            found = set(index.get(term, ()))
+        else:
+            found = {d for key, docs in index.items() if key.startswith(term) for d in docs}
+        hits = found if hits is None else hits & found
+        if not hits:
+            break
+    return sorted(hits or ())
@@ -0,0 +1,94 @@
+"""个股一致预期 -> 板块 PB-ROE 聚合。
+
+板块 PB、ROE 采用整体法（按市值加权）：
+    板块PB  = Σ市值 / Σ净资产，其中 净资产 = 市值 / PB
+    板块ROE = Σ(净资产 × ROE) / Σ净资产
+同时给出板块内个股 PB、ROE 的中位数，便于和整体法对照。
+"""
+import numpy as np
+import pandas as pd
+
+
+CODE_COL = "代码"
+NAME_COL = "名称"
+CAP_COL = "总市值"
+PB_COL = "预测PB"
+ROE_COL = "预测ROE"
+# 个股散点视图的名称，与各行业分类层级并列作为一种"粒度"
+STOCK_VIEW = "个股"
+
+
+def prepare_stock_frame(stocks, levels):
+    """Coerce stock-level forecasts to numeric arrays and drop unusable rows."""
+    missing = [c for c in (NAME_COL, CAP_COL, PB_COL, ROE_COL) if c not in stocks.columns]
+    if missing:
+        raise KeyError(f"个股一致预期缺少列: {missing}")
+
+    cap = pd.to_numeric(stocks[CAP_COL], errors="coerce").to_numpy(dtype=float)
+    pb = pd.to_numeric(stocks[PB_COL], errors="coerce").to_numpy(dtype=float)
+    roe = pd.to_numeric(stocks[ROE_COL], errors="coerce").to_numpy(dtype=float)
+
+    # PB<=0 对应净资产为负或缺失，整体法无法纳入，直接剔除
+    valid = np.isfinite(cap) & (cap > 0) & np.isfinite(pb) & (pb > 0) & np.isfinite(roe)
+
+    frame = pd.DataFrame(
+        {
+            NAME_COL: stocks[NAME_COL].to_numpy()[valid],
+            CAP_COL: cap[valid],
+            PB_COL: pb[valid],
+            ROE_COL: roe[valid],
+        }
+    )
+    if CODE_COL in stocks.columns:
+        frame.insert(0, CODE_COL, stocks[CODE_COL].to_numpy()[valid])
+    for level in levels:
+        if level in stocks.columns:
+            frame[level] = stocks[level].to_numpy()[valid]
+
+    frame["_book"] = frame[CAP_COL] / frame[PB_COL]
+    frame["_earn"] = frame["_book"] * frame[ROE_COL]
+    return frame
+
+
+def aggregate_sector_pbroe(frame, level, digits=4):
+    """Aggregate a prepared stock frame into one row per sector of ``level``."""
+    grouped = frame[frame[level].notna()].groupby(level, sort=True)
+    sums = grouped[[CAP_COL, "_book", "_earn"]].sum()
+    medians = grouped[[PB_COL, ROE_COL]].median()
+
+    out = pd.DataFrame(
+        {
+            NAME_COL: sums.index.astype(str),
+            PB_COL: (sums[CAP_COL] / sums["_book"]).to_numpy(),
+            ROE_COL: (sums["_earn"] / sums["_book"]).to_numpy(),
+            f"{PB_COL}中位数": medians[PB_COL].to_numpy(),
+            f"{ROE_COL}中位数": medians[ROE_COL].to_numpy(),
+            CAP_COL: sums[CAP_COL].to_numpy(),
+            "成分股数": grouped.size().to_numpy(),
+        }
+    )
+    return out.round(digits)
+
+
+def build_pbroe_views(stocks, levels, include_stocks=True, digits=4):
+    """Build sector views for every available level plus an optional stock scatter.
+
+    Returns an ordered dict ``{粒度名称: DataFrame}``; levels missing from the
+    input are skipped silently so one config can serve several data vendors.
+    """
+    present = [level for level in levels if level in stocks.columns]
+    frame = prepare_stock_frame(stocks, present)
+
+    views = {}
+    for level in present:
+        views[level] = aggregate_sector_pbroe(frame, level, digits=digits)
+
+    if include_stocks:
+        cols = [c for c in (CODE_COL, NAME_COL) if c in frame.columns]
+        # 个股视图附带第一层行业，便于悬停时识别所属板块
+        if present:
+            cols.append(present[0])
+        cols += [CAP_COL, PB_COL, ROE_COL]
+        views[STOCK_VIEW] = frame[cols].round(digits).reset_index(drop=True)
+
+    return views